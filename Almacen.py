@@ -0,0 +1,712 @@
+"""
+Almacén columnar binario para los datos de referencia de resources/.
+
+Cada tabla es una carpeta <nombre>.tabla con un esquema.json y un archivo
+.npy por columna (se pueden abrir con mmap):
+- columnas numéricas (enteros, decimales, booleanos): el arreglo tal cual
+- fechas: enteros int64 (nanosegundos)
+- texto: códigos int32 por fila + diccionario de valores en UTF-8 (datos.npy con los bytes y
+  offsets.npy con las posiciones). Normalmente cada valor distinto se guarda una vez; el texto
+  libre escrito por bloques (EscritorTabla) guarda un valor por fila, sin diccionario en memoria.
+
+Al leer se aplica el esquema tipado (Esquema): EAN/ITEM int64, las enumeraciones como category
+directamente desde los códigos del diccionario (sin un objeto de Python por fila) y el resto del
+texto como string. Las llaves se normalizan al importar, no en cada carga.
+
+Los JSON y Excel de siempre se convierten automáticamente la primera vez
+que se cargan (o cuando son más nuevos que el almacén). JSON queda solo
+como formato de exportación. Los Excel se leen fila por fila en modo de solo
+lectura y se escriben por bloques (EscritorTabla), así que la memoria no
+depende del tamaño del catálogo. Se guardan todas sus columnas (para exportarlo completo), pero
+cargar_tabla solo lee las que usa el motor.
+"""
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+import Esquema
+import Traza
+
+
+def ruta_base():
+    """Carpeta base de la aplicación, tanto en Python normal como en .exe de PyInstaller."""
+    if getattr(sys, "frozen", False):
+        # Cuando se ejecuta como .exe
+        return sys._MEIPASS
+    # Cuando se ejecuta como script normal
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+NOMBRE_APLICACION = "Tipos de procesos"
+VARIABLE_DATOS = "TIPOS_DATOS"
+
+# resources/ que viene con la aplicación (en el .exe es la carpeta temporal que se extrae en cada inicio)
+RUTA_PAQUETE = os.path.join(ruta_base(), "resources")
+
+
+def carpeta_datos():
+    """
+    Carpeta escribible y persistente de los datos de referencia, la base de datos y las tablas.
+    Como script es el mismo resources/ del repositorio; en el .exe, una carpeta del usuario
+    (%LOCALAPPDATA%\\Tipos de procesos\\resources en Windows), para que las actualizaciones del
+    catálogo y de codigos_cumple no se pierdan al cerrar. TIPOS_DATOS la cambia.
+    """
+    if os.environ.get(VARIABLE_DATOS):
+        return os.environ[VARIABLE_DATOS]
+    if not getattr(sys, "frozen", False):
+        return RUTA_PAQUETE
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), "AppData", "Local")
+    elif sys.platform == "darwin":
+        base = os.path.join(os.path.expanduser("~"), "Library", "Application Support")
+    else:
+        base = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, NOMBRE_APLICACION, "resources")
+
+
+RUTA_RECURSOS = carpeta_datos()
+
+EXTENSION = ".tabla"
+ESQUEMA = "esquema.json"
+
+# Excel de archivos/ de los que se generan los datos de referencia
+FUENTES_EXCEL = {
+    "base_general": "BASE DECATHLON GENERAL ADVANCE II.xlsx",
+}
+
+# Columnas que usa el motor de cada tabla: son obligatorias y son las únicas que lee cargar_tabla.
+# Las demás se guardan como texto para exportar la tabla completa (leer_tabla_completa).
+COLUMNAS_REFERENCIA = {
+    "base_general": ["EAN", "CODIGO FORMATO"],
+}
+
+# Filas por bloque al importar un Excel
+BLOQUE_FILAS = 50_000
+
+
+# Tablas ya leídas durante la vida del proceso: nombre -> (firma, DataFrame)
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def ruta_tabla(nombre):
+    return os.path.join(RUTA_RECURSOS, nombre + EXTENSION)
+
+
+def _llaves(nombre):
+    """Llaves de una tabla: las de Esquema.LLAVES que usa el motor (las demás columnas son informativas)."""
+    columnas = COLUMNAS_REFERENCIA.get(nombre)
+    return Esquema.LLAVES if columnas is None else [c for c in Esquema.LLAVES if c in columnas]
+
+
+# --- Escritura ---
+def _codificar_texto(serie):
+    """Codifica una columna de texto como diccionario (códigos + valores distintos en UTF-8)."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos, valores = serie.cat.codes.to_numpy(), serie.cat.categories
+    else:
+        codigos, valores = pd.factorize(serie.map(lambda v: v if v is None or isinstance(v, str) else str(v))
+                                        .where(serie.notna(), None))
+    datos = [str(v).encode("utf-8") for v in valores]
+    offsets = np.zeros(len(datos) + 1, dtype=np.int64)
+    if datos:
+        offsets[1:] = np.cumsum([len(d) for d in datos])
+    return codigos.astype(np.int32), np.frombuffer(b"".join(datos), dtype=np.uint8), offsets
+
+
+def _arreglo_numerico(serie):
+    """Arreglo numpy nativo (sin objetos) de una columna numérica."""
+    if isinstance(serie.dtype, pd.api.extensions.ExtensionDtype):
+        # Enteros/booleanos con nulos de pandas (Int64, boolean): los nulos pasan a NaN
+        if serie.hasnans:
+            return serie.to_numpy(dtype="float64", na_value=np.nan)
+        return serie.to_numpy(dtype=serie.dtype.numpy_dtype)
+    arreglo = serie.to_numpy()
+    if arreglo.dtype == object:
+        arreglo = arreglo.astype(np.int64)
+    return arreglo
+
+
+def _tipo_columna(serie):
+    if pd.api.types.is_bool_dtype(serie) or pd.api.types.is_numeric_dtype(serie):
+        return "numero"
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return "fecha"
+    # Columnas object que en realidad son enteros (por ejemplo ITEM leído de JSON)
+    if pd.api.types.infer_dtype(serie, skipna=False) == "integer":
+        return "numero"
+    return "texto"
+
+
+def _carpeta_temporal(ruta):
+    """Carpeta temporal propia junto a la tabla (otro proceso puede estar escribiendo la misma tabla)."""
+    carpeta = os.path.dirname(ruta)
+    os.makedirs(carpeta, exist_ok=True)
+    return tempfile.mkdtemp(prefix=os.path.basename(ruta) + ".", suffix=".tmp", dir=carpeta)
+
+
+def _publicar(temporal, ruta):
+    """
+    Pone la carpeta temporal ya escrita en lugar de la tabla con os.replace. La tabla anterior se
+    aparta antes con otro rename, así la tabla solo falta entre los dos. Si otro proceso escribió
+    la misma tabla y la suya quedó primero, se toma como buena y la temporal se descarta.
+    """
+    anterior = None
+    if os.path.exists(ruta):
+        anterior = _carpeta_temporal(ruta)
+        try:
+            os.replace(ruta, os.path.join(anterior, "tabla"))
+        except FileNotFoundError:
+            pass  # otro proceso ya la apartó
+    try:
+        os.replace(temporal, ruta)
+    except OSError:
+        if not os.path.exists(os.path.join(ruta, ESQUEMA)):
+            raise
+        shutil.rmtree(temporal, ignore_errors=True)
+    finally:
+        if anterior:
+            shutil.rmtree(anterior, ignore_errors=True)
+
+
+def guardar_tabla(df, ruta):
+    """Guarda un DataFrame en el formato columnar. La escritura es atómica (carpeta temporal + rename)."""
+    temporal = _carpeta_temporal(ruta)
+    try:
+        _escribir_columnas(df, temporal)
+    except BaseException:
+        shutil.rmtree(temporal, ignore_errors=True)
+        raise
+    _publicar(temporal, ruta)
+
+
+def _escribir_columnas(df, temporal):
+    columnas = []
+    for i, col in enumerate(df.columns):
+        serie = df[col]
+        tipo = _tipo_columna(serie)
+        archivo = f"c{i}"
+        if tipo == "numero":
+            np.save(os.path.join(temporal, archivo + ".npy"), _arreglo_numerico(serie))
+        elif tipo == "fecha":
+            np.save(os.path.join(temporal, archivo + ".npy"), serie.to_numpy().astype("datetime64[ns]").view(np.int64))
+        else:
+            codigos, datos, offsets = _codificar_texto(serie)
+            np.save(os.path.join(temporal, archivo + ".npy"), codigos)
+            np.save(os.path.join(temporal, archivo + ".datos.npy"), datos)
+            np.save(os.path.join(temporal, archivo + ".offsets.npy"), offsets)
+        columnas.append({"nombre": str(col), "tipo": tipo, "archivo": archivo})
+
+    with open(os.path.join(temporal, ESQUEMA), "w", encoding="utf-8") as f:
+        json.dump({"filas": len(df), "columnas": columnas}, f, ensure_ascii=False, indent=2)
+
+
+class EscritorTabla:
+    """
+    Escribe una tabla en el formato columnar por bloques de filas, sin tenerla completa en memoria.
+    Cada columna se va agregando a un archivo crudo; al cerrar se le pone el encabezado .npy.
+    El tipo de cada columna se toma del primer bloque. La escritura es atómica, como guardar_tabla.
+
+    Las enumeraciones (Esquema.CATEGORIAS) se codifican contra un diccionario que solo crece con los
+    valores distintos. El resto del texto (descripciones, marcas, ...) se agrega tal cual a sus
+    archivos de datos y offsets, así que la memoria depende del bloque y no del número de filas.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.temporal = _carpeta_temporal(ruta)
+        self.filas = 0
+        self._columnas = None
+        self._tipos_numpy = []
+        self._diccionarios = []
+        self._archivos = []
+        self._libres = []
+
+    def _abrir(self, df):
+        self._columnas = []
+        for i, col in enumerate(df.columns):
+            tipo = _tipo_columna(df[col])
+            self._columnas.append({"nombre": str(col), "tipo": tipo, "archivo": f"c{i}"})
+            self._tipos_numpy.append(None)
+            self._archivos.append(open(os.path.join(self.temporal, f"c{i}.bin"), "wb"))
+            if tipo == "texto" and str(col) in Esquema.CATEGORIAS:
+                self._diccionarios.append({})
+                self._libres.append(None)
+            elif tipo == "texto":
+                self._diccionarios.append(None)
+                self._libres.append(_TextoLibre(os.path.join(self.temporal, f"c{i}")))
+            else:
+                self._diccionarios.append(None)
+                self._libres.append(None)
+
+    def agregar(self, df):
+        if self._columnas is None:
+            self._abrir(df)
+        for i, columna in enumerate(self._columnas):
+            serie = df.iloc[:, i]
+            if columna["tipo"] == "numero":
+                arreglo = _arreglo_numerico(serie)
+                if self._tipos_numpy[i] is None:
+                    self._tipos_numpy[i] = arreglo.dtype
+                arreglo = arreglo.astype(self._tipos_numpy[i], casting="same_kind")
+            elif columna["tipo"] == "fecha":
+                self._tipos_numpy[i] = np.dtype(np.int64)
+                arreglo = serie.to_numpy().astype("datetime64[ns]").view(np.int64)
+            else:
+                self._tipos_numpy[i] = np.dtype(np.int32)
+                if self._libres[i] is not None:
+                    arreglo = self._libres[i].agregar(serie)
+                else:
+                    arreglo = self._codificar(serie, self._diccionarios[i])
+            arreglo.tofile(self._archivos[i])
+        self.filas += len(df)
+
+    @staticmethod
+    def _codificar(serie, diccionario):
+        """Códigos del bloque contra el diccionario acumulado de la columna (-1 = nulo)."""
+        codigos, valores = pd.factorize(serie.map(lambda v: v if v is None or isinstance(v, str) else str(v))
+                                        .where(serie.notna(), None))
+        if not len(valores):
+            return np.full(len(codigos), -1, dtype=np.int32)
+        globales = np.array([diccionario.setdefault(v, len(diccionario)) for v in valores], dtype=np.int32)
+        return np.where(codigos < 0, -1, globales[codigos]).astype(np.int32)
+
+    def cerrar(self):
+        """Termina los archivos, escribe el esquema y reemplaza la tabla anterior. Devuelve el número de filas."""
+        for archivo in self._archivos:
+            archivo.close()
+        for i, columna in enumerate(self._columnas or []):
+            base = os.path.join(self.temporal, columna["archivo"])
+            _escribir_npy(base + ".bin", base + ".npy", self._tipos_numpy[i], self.filas)
+            if self._libres[i] is not None:
+                self._libres[i].cerrar()
+            elif columna["tipo"] == "texto":
+                datos = [str(v).encode("utf-8") for v in self._diccionarios[i]]
+                offsets = np.zeros(len(datos) + 1, dtype=np.int64)
+                if datos:
+                    offsets[1:] = np.cumsum([len(d) for d in datos])
+                np.save(base + ".datos.npy", np.frombuffer(b"".join(datos), dtype=np.uint8))
+                np.save(base + ".offsets.npy", offsets)
+
+        with open(os.path.join(self.temporal, ESQUEMA), "w", encoding="utf-8") as f:
+            json.dump({"filas": self.filas, "columnas": self._columnas or []}, f, ensure_ascii=False, indent=2)
+
+        _publicar(self.temporal, self.ruta)
+        return self.filas
+
+    def descartar(self):
+        for archivo in self._archivos:
+            archivo.close()
+        for libre in self._libres:
+            if libre is not None:
+                libre.cerrar_archivos()
+        shutil.rmtree(self.temporal, ignore_errors=True)
+
+
+class _TextoLibre:
+    """
+    Columna de texto libre de EscritorTabla: cada valor no nulo se agrega a <base>.datos y su
+    posición final a <base>.offsets; el código de la fila es el número del valor (-1 = nulo).
+    Queda en el mismo formato que un diccionario, así que se lee igual.
+    """
+
+    def __init__(self, base):
+        self.base = base
+        self.valores = 0
+        self.bytes = 0
+        self._datos = open(base + ".datos.bin", "wb")
+        self._offsets = open(base + ".offsets.bin", "wb")
+        np.zeros(1, dtype=np.int64).tofile(self._offsets)
+
+    def agregar(self, serie):
+        validos = serie.notna().to_numpy()
+        datos = [(v if isinstance(v, str) else str(v)).encode("utf-8") for v in serie[validos]]
+        finales = np.cumsum([len(d) for d in datos], dtype=np.int64) + self.bytes
+        self._datos.write(b"".join(datos))
+        finales.tofile(self._offsets)
+        codigos = np.full(len(serie), -1, dtype=np.int32)
+        codigos[validos] = np.arange(self.valores, self.valores + len(datos), dtype=np.int32)
+        self.valores += len(datos)
+        if len(datos):
+            self.bytes = int(finales[-1])
+        return codigos
+
+    def cerrar(self):
+        self.cerrar_archivos()
+        _escribir_npy(self.base + ".datos.bin", self.base + ".datos.npy", np.dtype(np.uint8), self.bytes)
+        _escribir_npy(self.base + ".offsets.bin", self.base + ".offsets.npy", np.dtype(np.int64), self.valores + 1)
+
+    def cerrar_archivos(self):
+        self._datos.close()
+        self._offsets.close()
+
+
+def _escribir_npy(crudo, ruta, dtype, largo):
+    """Convierte un archivo de datos crudos en .npy: encabezado + los datos, copiados por partes."""
+    with open(ruta, "wb") as destino, open(crudo, "rb") as origen:
+        np.lib.format.write_array_header_1_0(destino, {
+            "descr": np.lib.format.dtype_to_descr(dtype),
+            "fortran_order": False,
+            "shape": (largo,),
+        })
+        shutil.copyfileobj(origen, destino)
+    os.remove(crudo)
+
+
+# --- Lectura ---
+def _diccionario(datos, offsets):
+    buffer = datos.tobytes()
+    return [buffer[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+
+
+def _decodificar_texto(codigos, datos, offsets):
+    valores = np.empty(len(offsets), dtype=object)
+    valores[:-1] = _diccionario(datos, offsets)
+    # El código -1 (nulo) toma el último lugar del arreglo, que queda en None
+    valores[-1] = None
+    return valores[codigos]
+
+
+def _decodificar_categoria(codigos, datos, offsets):
+    """Columna de texto como category: los códigos del almacén son los de la categoría (-1 = nulo)."""
+    return pd.Categorical.from_codes(np.asarray(codigos), categories=_diccionario(datos, offsets))
+
+
+def leer_tabla(ruta, mmap=True, columnas=None):
+    """Lee una tabla del formato columnar como DataFrame (solo las columnas indicadas, si se dan)."""
+    with open(os.path.join(ruta, ESQUEMA), "r", encoding="utf-8") as f:
+        esquema = json.load(f)
+
+    modo = "r" if mmap else None
+    datos = {}
+    for columna in esquema["columnas"]:
+        if columnas is not None and columna["nombre"] not in columnas:
+            continue
+        base = os.path.join(ruta, columna["archivo"])
+        arreglo = np.load(base + ".npy", mmap_mode=modo)
+        if columna["tipo"] == "numero":
+            datos[columna["nombre"]] = arreglo
+        elif columna["tipo"] == "fecha":
+            datos[columna["nombre"]] = np.asarray(arreglo).view("datetime64[ns]")
+        else:
+            decodificar = _decodificar_categoria if columna["nombre"] in Esquema.CATEGORIAS else _decodificar_texto
+            datos[columna["nombre"]] = decodificar(
+                arreglo, np.load(base + ".datos.npy", mmap_mode=modo), np.load(base + ".offsets.npy")
+            )
+    return pd.DataFrame(datos, index=pd.RangeIndex(esquema["filas"]))
+
+
+# --- Conversión automática desde JSON / Excel ---
+def _fuentes(nombre):
+    """Archivos JSON y Excel a partir de los cuales se puede generar la tabla."""
+    fuentes = [os.path.join(RUTA_RECURSOS, nombre + ".json")]
+    # En el .exe el Excel de archivos/ se extrae de nuevo en cada inicio (siempre parece más nuevo):
+    # solo sirve para generar la tabla la primera vez, después manda la tabla del usuario
+    semilla = getattr(sys, "frozen", False) and os.path.exists(os.path.join(ruta_tabla(nombre), ESQUEMA))
+    if nombre in FUENTES_EXCEL and not semilla:
+        fuentes.append(os.path.join(ruta_base(), "archivos", FUENTES_EXCEL[nombre]))
+    return [f for f in fuentes if os.path.exists(f)]
+
+
+def _columnas_de(nombre, disponibles):
+    """
+    Columnas que se guardan de una tabla: todas las que tienen encabezado (si uno se repite, la primera).
+    Error si falta alguna de las que usa el motor.
+    """
+    columnas = list(dict.fromkeys(c for c in disponibles if c is not None and str(c).strip()))
+    faltantes = [c for c in COLUMNAS_REFERENCIA.get(nombre, []) if c not in columnas]
+    if faltantes:
+        raise ValueError(f"A '{nombre}' le faltan las columnas: {', '.join(faltantes)}")
+    return columnas
+
+
+def _texto_celda(valor):
+    """Celda de Excel como texto; los números enteros quedan sin '.0' (EAN 7612345678901)."""
+    if valor is None or isinstance(valor, str):
+        return valor
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor)
+
+
+def importar_excel(ruta_excel, nombre, progreso=None, tamano=BLOQUE_FILAS):
+    """Importa un Excel a la tabla de referencia `nombre` (ver _importar_excel) y la invalida en memoria."""
+    with Traza.etapa(f"importar_{nombre}") as etapa:
+        filas = etapa.filas = _importar_excel(ruta_excel, nombre, progreso, tamano)
+    invalidar(nombre)
+    return filas
+
+
+def _importar_excel(ruta_excel, nombre, progreso=None, tamano=BLOQUE_FILAS):
+    """
+    Importa un Excel a la tabla de referencia `nombre` leyendo fila por fila en modo de solo lectura.
+    Se guardan todas las columnas con encabezado (como texto) y se escriben por bloques de `tamano`
+    filas, así que la memoria máxima depende del bloque y no del tamaño del archivo.
+    Las llaves del motor (EAN) se normalizan a int64 por bloque (se descartan las filas sin llave
+    entera, ver Esquema).
+    progreso(porcentaje, texto) recibe el avance real por filas. Devuelve el número de filas guardadas.
+    """
+    os.makedirs(RUTA_RECURSOS, exist_ok=True)
+    if not ruta_excel.lower().endswith((".xlsx", ".xlsm")):
+        # openpyxl no lee .xls: se usa pandas
+        df = pd.read_excel(ruta_excel)
+        df.columns = [_texto_celda(c) for c in df.columns]
+        df = df.loc[:, ~df.columns.duplicated()][_columnas_de(nombre, df.columns)]
+        df = Esquema.normalizar_llaves(pd.DataFrame(
+            {c: [_texto_celda(v) if pd.notna(v) else None for v in df[c]] for c in df}, dtype=object
+        ), _llaves(nombre))
+        guardar_tabla(df, ruta_tabla(nombre))
+        return len(df)
+
+    wb = load_workbook(ruta_excel, read_only=True, data_only=True)
+    escritor = EscritorTabla(ruta_tabla(nombre))
+    try:
+        ws = wb.worksheets[0]
+        filas = ws.iter_rows(values_only=True)
+        encabezado = [_texto_celda(c) for c in next(filas, None) or []]
+        columnas = _columnas_de(nombre, encabezado)
+        posiciones = [encabezado.index(c) for c in columnas]
+        llaves = _llaves(nombre)
+        total = max((ws.max_row or 0) - 1, 0)
+
+        bloque = []
+        leidas = 0
+        for fila in filas:
+            bloque.append(tuple(_texto_celda(fila[p]) if p < len(fila) else None for p in posiciones))
+            if len(bloque) == tamano:
+                escritor.agregar(Esquema.normalizar_llaves(pd.DataFrame(bloque, columns=columnas, dtype=object), llaves))
+                leidas += len(bloque)
+                bloque = []
+                if progreso:
+                    avance = min(99, leidas * 100 / total) if total else 50
+                    progreso(avance, f"{leidas:,} filas leídas...")
+        escritor.agregar(Esquema.normalizar_llaves(pd.DataFrame(bloque, columns=columnas, dtype=object), llaves))
+        escritor.cerrar()
+    except Exception:
+        escritor.descartar()
+        raise
+    finally:
+        wb.close()
+
+    if progreso:
+        progreso(100, f"{escritor.filas:,} filas")
+    return escritor.filas
+
+
+def convertir(nombre):
+    """Genera la tabla binaria desde su JSON o Excel (el más reciente)."""
+    fuentes = _fuentes(nombre)
+    if not fuentes:
+        raise FileNotFoundError(f"No se encontró ninguna fuente para '{nombre}' en {RUTA_RECURSOS}")
+    fuente = max(fuentes, key=os.path.getmtime)
+    if not fuente.lower().endswith(".json"):
+        _importar_excel(fuente, nombre)
+        return
+    with open(fuente, "r", encoding="utf-8") as f:
+        df = pd.DataFrame(json.load(f))
+    # Del JSON se guardan todas las columnas (si faltan las del motor, no encuentra coincidencias)
+    guardar_tabla(Esquema.normalizar_llaves(df, _llaves(nombre)), ruta_tabla(nombre))
+
+
+def firma(nombre):
+    """
+    Firma barata de una tabla: (ruta, mtime_ns, tamaño) del esquema y de sus fuentes JSON/Excel.
+    Si cualquiera de esos archivos cambia, la firma cambia.
+    """
+    archivos = [os.path.join(ruta_tabla(nombre), ESQUEMA)] + _fuentes(nombre)
+    partes = []
+    for archivo in archivos:
+        try:
+            st = os.stat(archivo)
+        except FileNotFoundError:
+            continue
+        partes.append((archivo, st.st_mtime_ns, st.st_size))
+    return tuple(partes)
+
+
+def version(nombre):
+    """Versión corta de una tabla (hash de su firma) para etiquetar datos calculados con ella."""
+    return hashlib.sha1(repr(firma(nombre)).encode("utf-8")).hexdigest()[:16]
+
+
+def _cargar_desde_disco(nombre):
+    ruta = ruta_tabla(nombre)
+    esquema = os.path.join(ruta, ESQUEMA)
+    if not os.path.exists(esquema) or any(os.path.getmtime(f) > os.path.getmtime(esquema) for f in _fuentes(nombre)):
+        convertir(nombre)
+    # Las tablas se escriben con las llaves ya normalizadas: aquí solo se leen las columnas del motor
+    return Esquema.aplicar(leer_tabla(ruta, columnas=COLUMNAS_REFERENCIA.get(nombre)))
+
+
+def cargar_tabla(nombre):
+    """
+    Carga las columnas del motor (COLUMNAS_REFERENCIA) de una tabla de referencia de la carpeta de
+    datos, con el esquema tipado (ver Esquema). Si no existe en formato binario, o su JSON/Excel es más reciente, se convierte primero.
+    La tabla se conserva en memoria y solo se vuelve a leer cuando cambia su firma
+    (mtime o tamaño de sus archivos). El DataFrame devuelto es compartido: no se debe modificar.
+    """
+    with _cache_lock:
+        actual = firma(nombre)
+        guardada = _cache.get(nombre)
+        if guardada is not None and guardada[0] == actual:
+            return guardada[1]
+
+        df = _cargar_desde_disco(nombre)
+        # La firma se toma después de leer, por si hubo conversión
+        _cache[nombre] = (firma(nombre), df)
+        return df
+
+
+def leer_tabla_completa(nombre):
+    """
+    Tabla de referencia con todas las columnas guardadas, p. ej. para exportar el catálogo completo.
+    No se conserva en memoria: el motor solo usa las columnas de cargar_tabla.
+    """
+    cargar_tabla(nombre)  # la convierte desde su JSON/Excel si hace falta
+    return leer_tabla(ruta_tabla(nombre), mmap=False)
+
+
+def invalidar(nombre=None):
+    """Descarta de memoria una tabla (o todas) para que la próxima carga la lea de disco."""
+    with _cache_lock:
+        if nombre is None:
+            _cache.clear()
+        else:
+            _cache.pop(nombre, None)
+
+
+def guardar_referencia(df, nombre):
+    """Guarda una tabla de referencia (llaves normalizadas) en formato binario y la invalida en memoria."""
+    os.makedirs(RUTA_RECURSOS, exist_ok=True)
+    guardar_tabla(Esquema.normalizar_llaves(df, _llaves(nombre)), ruta_tabla(nombre))
+    invalidar(nombre)
+
+
+def exportar_json(nombre, ruta_json):
+    """Exporta una tabla de referencia completa a JSON (mismo formato que antes: registros con indent=4)."""
+    leer_tabla_completa(nombre).to_json(ruta_json, orient="records", force_ascii=False, indent=4)
+
+
+# --- Carpeta de datos del usuario ---
+SEMILLA = "semilla.json"
+
+# Archivos que la aplicación genera en la carpeta de datos; nunca se copian del paquete
+_NO_SEMBRAR = ("procesos.db", "clasificacion.npy", ".tmp", SEMILLA)
+
+# Archivos de archivos/ que la aplicación reescribe: también viven en la carpeta de datos
+SEMILLAS_ARCHIVOS = ("codigos_cumple.xlsx",)
+
+
+def _firma_semilla(ruta):
+    """Contenido de un archivo (o de una tabla: nombres y tamaños de sus archivos y su esquema) como hash."""
+    h = hashlib.sha1()
+    if os.path.isdir(ruta):
+        for nombre in sorted(os.listdir(ruta)):
+            h.update(f"{nombre}:{os.path.getsize(os.path.join(ruta, nombre))};".encode("utf-8"))
+        ruta = os.path.join(ruta, ESQUEMA)
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def _marca(ruta):
+    """(mtime_ns, tamaño) de un archivo o del esquema de una tabla: cambia si el usuario lo reescribe."""
+    st = os.stat(os.path.join(ruta, ESQUEMA) if os.path.isdir(ruta) else ruta)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _copiar(origen, destino):
+    """Copia atómica (temporal propia + rename) de un archivo o una tabla."""
+    if os.path.isdir(origen):
+        temporal = _carpeta_temporal(destino)
+        try:
+            shutil.copytree(origen, temporal, dirs_exist_ok=True)
+        except BaseException:
+            shutil.rmtree(temporal, ignore_errors=True)
+            raise
+        _publicar(temporal, destino)
+        return
+    descriptor, temporal = tempfile.mkstemp(prefix=os.path.basename(destino) + ".", suffix=".tmp",
+                                            dir=os.path.dirname(destino))
+    os.close(descriptor)
+    try:
+        shutil.copy2(origen, temporal)
+        os.replace(temporal, destino)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+
+def _fuentes_semilla(origen, destino, archivos):
+    """(nombre, ruta en el paquete) de lo que se siembra en la carpeta de datos."""
+    fuentes = []
+    if os.path.abspath(origen) != os.path.abspath(destino) and os.path.isdir(origen):
+        fuentes += [(nombre, os.path.join(origen, nombre)) for nombre in sorted(os.listdir(origen))
+                    if not any(marca in nombre for marca in _NO_SEMBRAR)]
+    fuentes += [(nombre, os.path.join(archivos, nombre)) for nombre in SEMILLAS_ARCHIVOS
+                if os.path.isfile(os.path.join(archivos, nombre))]
+    return fuentes
+
+
+def sembrar_recursos(origen=None, destino=None, archivos=None):
+    """
+    Copia a la carpeta de datos lo que trae resources/ del paquete (y SEMILLAS_ARCHIVOS de archivos/),
+    solo si falta o si lo que hay es la copia sin modificar de un paquete anterior. Lo que el usuario
+    actualizó se conserva. semilla.json guarda de cada archivo copiado la firma del paquete y la marca
+    de la copia. Devuelve los nombres copiados.
+    """
+    origen = origen or RUTA_PAQUETE
+    destino = destino or RUTA_RECURSOS
+    archivos = archivos or os.path.join(ruta_base(), "archivos")
+    fuentes = _fuentes_semilla(origen, destino, archivos)
+    if not fuentes:
+        return []
+    os.makedirs(destino, exist_ok=True)
+    ruta_semilla = os.path.join(destino, SEMILLA)
+    try:
+        with open(ruta_semilla, "r", encoding="utf-8") as f:
+            sembrados = json.load(f)
+    except (OSError, ValueError):
+        sembrados = {}
+
+    copiados = []
+    for nombre, fuente in fuentes:
+        copia = os.path.join(destino, nombre)
+        firma_paquete = _firma_semilla(fuente)
+        anterior = sembrados.get(nombre)
+        if os.path.exists(copia):
+            if anterior is None or anterior["firma"] == firma_paquete:
+                continue  # del usuario, o ya es la copia de este paquete
+            if _marca(copia) != anterior["marca"]:
+                continue  # el usuario la actualizó después de copiarla
+        _copiar(fuente, copia)
+        sembrados[nombre] = {"firma": firma_paquete, "marca": _marca(copia)}
+        copiados.append(nombre)
+
+    if copiados:
+        with open(ruta_semilla, "w", encoding="utf-8") as f:
+            json.dump(sembrados, f, ensure_ascii=False, indent=2)
+    return copiados
+
+
+def preparar_carpeta_datos():
+    """
+    Siembra la carpeta de datos antes del primer uso. La llaman los puntos de entrada (el calentamiento
+    de la interfaz, ProcesosCLI, archivosJSON), no la importación, para que importar no copie archivos.
+    Un error solo se informa: sin la copia se usa lo que ya haya en la carpeta.
+    """
+    try:
+        return sembrar_recursos()
+    except OSError as e:
+        print(f"No se pudo preparar la carpeta de datos {RUTA_RECURSOS}: {e}", file=sys.stderr)
+        return []
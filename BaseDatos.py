@@ -0,0 +1,754 @@
+"""
+Base de datos SQLite (modo WAL) con los datos que la aplicación escribe:
+HISTORIAL, codigos_cumple y la caché de clasificación por ITEM (su mapa ITEM -> clase
+vive aparte, en MAPA_CACHE).
+
+ITEM es la llave primaria de ambas tablas, así que registrar una corrida o editar
+un código solo escribe las filas nuevas o modificadas en lugar de reescribir todo
+el Excel. Excel y JSON quedan como formatos de importación y exportación.
+"""
+import json
+import os
+import sqlite3
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+import Esquema
+import Traza
+from Almacen import RUTA_RECURSOS, ruta_base
+
+RUTA_BD = os.path.join(RUTA_RECURSOS, "procesos.db")
+
+# Excel del HISTORIAL anterior; se importa una sola vez a la base de datos
+HISTORIAL_EXCEL = os.path.join(ruta_base(), "archivos", "HISTORIAL_PROCESOS.xlsx")
+
+# Fuentes anteriores de codigos_cumple; se importa la más reciente una sola vez. Las dos viven en la
+# carpeta de datos (el Excel se siembra de archivos/) porque actualizar_copias_codigos las reescribe
+CODIGOS_EXCEL = os.path.join(RUTA_RECURSOS, "codigos_cumple.xlsx")
+CODIGOS_JSON = os.path.join(RUTA_RECURSOS, "codigos_cumple.json")
+
+# Políticas para un ITEM que ya está guardado (HISTORIAL o codigos_cumple)
+CONSERVAR_PRIMERO = "conservar"   # se queda el registro existente (comportamiento anterior)
+ULTIMO_GANA = "reciente"          # el registro nuevo reemplaza al existente
+POLITICAS = (CONSERVAR_PRIMERO, ULTIMO_GANA)
+
+COLUMNAS_HISTORIAL = ["ITEM", "TIPO DE PROCESO", "NORMA", "DESCRIPCION", "CRITERIO"]
+_CAMPOS_HISTORIAL = ["item", "tipo_proceso", "norma", "descripcion", "criterio"]
+
+COLUMNAS_CODIGOS = ["ITEM", "OBSERVACIONES", "CRITERIO"]
+_CAMPOS_CODIGOS = ["item", "observaciones", "criterio"]
+
+# Caché de clasificación: entradas (NORMA del reporte y valores de referencia) y resultado por ITEM.
+# Cada combinación distinta de esos valores (una "clase") se guarda una sola vez en la tabla
+# clasificacion_clases; el ITEM -> clase vive en MAPA_CACHE, un arreglo ordenado por ITEM junto a la
+# base, que se lee y se reescribe completo con numpy (consultar fila por fila en SQLite costaba lo
+# mismo que volver a clasificar).
+COLUMNAS_CACHE = ["ITEM", "NORMA ENTRADA", "CATALOGO", "CRITERIO CODIGOS",
+                  "TIPO DE PROCESO", "NORMA", "CRITERIO"]
+_CAMPOS_CLASE = ["norma_entrada", "catalogo", "criterio_codigos", "tipo_proceso", "norma", "criterio"]
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    clave TEXT PRIMARY KEY,
+    valor TEXT
+);
+CREATE TABLE IF NOT EXISTS historial (
+    item PRIMARY KEY,
+    tipo_proceso TEXT,
+    norma TEXT,
+    descripcion TEXT,
+    criterio TEXT,
+    actualizado TEXT DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS codigos_cumple (
+    item PRIMARY KEY,
+    observaciones TEXT,
+    criterio TEXT
+);
+CREATE TABLE IF NOT EXISTS clasificacion_clases (
+    clase INTEGER PRIMARY KEY,
+    norma_entrada TEXT,
+    catalogo TEXT,
+    criterio_codigos TEXT,
+    tipo_proceso TEXT,
+    norma TEXT,
+    criterio TEXT
+);
+"""
+
+
+def normalizar_item(valor):
+    """ITEM como entero cuando es numérico ('1033680' y 1033680 son el mismo ITEM)."""
+    if valor is None or (isinstance(valor, float) and pd.isna(valor)):
+        return None
+    try:
+        return int(str(valor).strip())
+    except ValueError:
+        try:
+            numero = float(str(valor).strip())
+        except ValueError:
+            return str(valor).strip()
+        return int(numero) if numero.is_integer() else str(valor).strip()
+
+
+def _texto(valor):
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+        return None
+    return str(valor)
+
+
+def conectar(ruta=None):
+    """Abre la base de datos (la crea si no existe) en modo WAL."""
+    ruta = ruta or RUTA_BD
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    conn = sqlite3.connect(ruta, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_ESQUEMA)
+    return conn
+
+
+def _ya_importado(conn, clave):
+    return conn.execute("SELECT 1 FROM meta WHERE clave = ?", (clave,)).fetchone() is not None
+
+
+def _marcar_importado(conn, clave, origen):
+    conn.execute("INSERT OR REPLACE INTO meta (clave, valor) VALUES (?, ?)", (clave, origen))
+
+
+def _filas(df, columnas):
+    """Tuplas (ITEM normalizado, textos...) listas para SQLite; se omiten filas sin ITEM."""
+    filas = []
+    for valores in df.reindex(columns=columnas).itertuples(index=False, name=None):
+        item = normalizar_item(valores[0])
+        if item is None:
+            continue
+        filas.append((item,) + tuple(_texto(v) for v in valores[1:]))
+    return filas
+
+
+def _sql_upsert(tabla, campos, politica, extra=""):
+    """INSERT según la política: ignorar ITEMS existentes o actualizarlos solo si cambió algún valor."""
+    if politica not in POLITICAS:
+        raise ValueError(f"Política no válida: {politica}")
+    columnas = ", ".join(campos)
+    marcas = ", ".join("?" for _ in campos)
+    if politica == CONSERVAR_PRIMERO:
+        return f"INSERT OR IGNORE INTO {tabla} ({columnas}) VALUES ({marcas})"
+    actualizar = ", ".join(f"{c} = excluded.{c}" for c in campos[1:]) + extra
+    distinto = " OR ".join(f"{c} IS NOT excluded.{c}" for c in campos[1:])
+    return (f"INSERT INTO {tabla} ({columnas}) VALUES ({marcas}) "
+            f"ON CONFLICT(item) DO UPDATE SET {actualizar} WHERE {distinto}")
+
+
+# --- HISTORIAL ---
+def _filas_historial(df):
+    return _filas(df, COLUMNAS_HISTORIAL)
+
+
+def _importar_historial_excel(conn):
+    """Importa el HISTORIAL_PROCESOS.xlsx anterior la primera vez que se abre la base."""
+    if _ya_importado(conn, "historial_excel"):
+        return
+    if os.path.exists(HISTORIAL_EXCEL):
+        df = pd.read_excel(HISTORIAL_EXCEL)
+        conn.executemany(
+            f"INSERT OR IGNORE INTO historial ({', '.join(_CAMPOS_HISTORIAL)}) VALUES (?, ?, ?, ?, ?)",
+            _filas_historial(df)
+        )
+    _marcar_importado(conn, "historial_excel", HISTORIAL_EXCEL)
+
+
+def registrar_historial(df_result, politica=CONSERVAR_PRIMERO, ruta=None):
+    """
+    Registra los resultados de una corrida en el HISTORIAL y devuelve cuántas filas se escribieron.
+    CONSERVAR_PRIMERO: los ITEMS que ya existen no se tocan (igual que el drop_duplicates anterior).
+    ULTIMO_GANA: los ITEMS que ya existen se actualizan solo si alguno de sus valores cambió.
+    """
+    sql = _sql_upsert("historial", _CAMPOS_HISTORIAL, politica, ", actualizado = CURRENT_TIMESTAMP")
+
+    with Traza.etapa("historial", len(df_result)), closing(conectar(ruta)) as conn, conn:
+        _importar_historial_excel(conn)
+        antes = conn.total_changes
+        conn.executemany(sql, _filas_historial(df_result))
+        return conn.total_changes - antes
+
+
+def cargar_historial(ruta=None):
+    """Devuelve el HISTORIAL completo como DataFrame, en el orden en que se registró."""
+    with closing(conectar(ruta)) as conn, conn:
+        _importar_historial_excel(conn)
+        df = pd.read_sql_query(
+            f"SELECT {', '.join(_CAMPOS_HISTORIAL)} FROM historial ORDER BY rowid", conn
+        )
+    df.columns = COLUMNAS_HISTORIAL
+    return df
+
+
+def exportar_historial_excel(ruta_salida, ruta=None):
+    """Exporta el HISTORIAL a Excel (sin formato especial, como el archivo anterior)."""
+    df = cargar_historial(ruta)
+    df.to_excel(ruta_salida, index=False)
+    return len(df)
+
+
+# --- codigos_cumple ---
+def _version_codigos(conn):
+    fila = conn.execute("SELECT valor FROM meta WHERE clave = 'version_codigos'").fetchone()
+    return int(fila[0]) if fila else 0
+
+
+def _nueva_version_codigos(conn):
+    """Cada escritura en codigos_cumple sube la versión (así se invalidan los índices en memoria)."""
+    conn.execute(
+        "INSERT INTO meta (clave, valor) VALUES ('version_codigos', '1') "
+        "ON CONFLICT(clave) DO UPDATE SET valor = CAST(valor AS INTEGER) + 1"
+    )
+
+
+def _importar_codigos(conn):
+    """Importa el codigos_cumple anterior (el más reciente entre el Excel y el JSON) una sola vez."""
+    if _ya_importado(conn, "codigos_cumple"):
+        return
+    fuentes = [f for f in (CODIGOS_EXCEL, CODIGOS_JSON) if os.path.exists(f)]
+    if fuentes:
+        fuente = max(fuentes, key=os.path.getmtime)
+        if fuente.lower().endswith(".json"):
+            with open(fuente, "r", encoding="utf-8") as f:
+                df = pd.DataFrame(json.load(f))
+        else:
+            df = pd.read_excel(fuente)
+        conn.executemany(_sql_upsert("codigos_cumple", _CAMPOS_CODIGOS, CONSERVAR_PRIMERO),
+                         _filas(df, COLUMNAS_CODIGOS))
+        _nueva_version_codigos(conn)
+    _marcar_importado(conn, "codigos_cumple", ";".join(fuentes))
+
+
+def _abrir_codigos(ruta=None):
+    conn = conectar(ruta)
+    with conn:
+        _importar_codigos(conn)
+    return conn
+
+
+def version_codigos(ruta=None):
+    """Versión actual de codigos_cumple (consulta de una sola fila)."""
+    with closing(_abrir_codigos(ruta)) as conn:
+        return _version_codigos(conn)
+
+
+def cargar_codigos(ruta=None, con_version=False, tipado=False):
+    """
+    Devuelve codigos_cumple completo como DataFrame (ITEM, OBSERVACIONES, CRITERIO).
+    Con con_version=True devuelve (versión, DataFrame) leídos en la misma transacción.
+    Con tipado=True aplica el esquema de Esquema (ITEM int64, CRITERIO como category y OBSERVACIONES como string)
+    para usarlo como referencia; los ITEMS que no son numéricos (no cruzan con ningún reporte) se omiten.
+    Sin tipado se devuelven todas las filas tal cual (editor, exportaciones y comparaciones).
+    """
+    with closing(_abrir_codigos(ruta)) as conn:
+        conn.execute("BEGIN")
+        version = _version_codigos(conn)
+        df = pd.read_sql_query(
+            f"SELECT {', '.join(_CAMPOS_CODIGOS)} FROM codigos_cumple ORDER BY rowid", conn
+        )
+        conn.execute("COMMIT")
+    df.columns = COLUMNAS_CODIGOS
+    if tipado:
+        df = Esquema.aplicar(df)
+    return (version, df) if con_version else df
+
+
+def obtener_codigo(item, ruta=None):
+    """Busca un ITEM por su llave. Devuelve un diccionario o None si no existe."""
+    with closing(_abrir_codigos(ruta)) as conn:
+        fila = conn.execute(
+            f"SELECT {', '.join(_CAMPOS_CODIGOS)} FROM codigos_cumple WHERE item = ?",
+            (normalizar_item(item),)
+        ).fetchone()
+    return dict(zip(COLUMNAS_CODIGOS, fila)) if fila else None
+
+
+def obtener_codigos(items, ruta=None, tamano=500):
+    """
+    Filas (ITEM, OBSERVACIONES, CRITERIO) actuales de varios ITEMS, consultadas en bloques.
+    Los ITEMS que no existen simplemente no aparecen.
+    """
+    llaves = list(dict.fromkeys(i for i in map(normalizar_item, items) if i is not None))
+    filas = []
+    with closing(_abrir_codigos(ruta)) as conn:
+        for inicio in range(0, len(llaves), tamano):
+            bloque = llaves[inicio:inicio + tamano]
+            filas.extend(conn.execute(
+                f"SELECT {', '.join(_CAMPOS_CODIGOS)} FROM codigos_cumple "
+                f"WHERE item IN ({', '.join('?' for _ in bloque)}) ORDER BY rowid",
+                bloque
+            ).fetchall())
+    return filas
+
+
+def _como_like(texto):
+    """Texto del buscador como patrón de LIKE (%, _ y \\ se buscan literalmente)."""
+    return texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+# Mayor ITEM entero que SQLite puede guardar; un ITEM numérico tiene a lo más 19 dígitos
+_ITEM_MAXIMO = 2 ** 63 - 1
+
+
+def _orden_sqlite(valor):
+    """Llave para comparar ITEMS como SQLite: los enteros van antes que cualquier texto."""
+    return isinstance(valor, str), valor
+
+
+class FuenteCodigos:
+    """
+    codigos_cumple como fuente de TablaVirtual (editor de códigos), ordenada por ITEM. Cada página se
+    pide a SQLite sobre el índice de la llave primaria a partir de una fila ya conocida (ancla):
+    WHERE item >= ancla ORDER BY item LIMIT n, así que desplazarse cuesta lo mismo al principio que al
+    final de la tabla; solo un salto lejano de la barra cuenta filas desde el principio (OFFSET).
+    Abrir el editor no carga la tabla.
+
+    Una búsqueda se reparte en tramos ordenados de ITEM que no se traslapan, y cada página los recorre
+    en orden. Con solo dígitos es un prefijo de ITEM (no se busca en OBSERVACIONES): un rango de enteros
+    por cada número de dígitos ("12" -> 12, 120-129, 1200-1299, ...) más los ITEMS de texto que empiezan
+    igual, todos sobre el índice (menos de 10 ms con 700 mil códigos). Con otro texto se busca también
+    en OBSERVACIONES, que es un LIKE sin índice: contar recorre la tabla dentro de SQLite (~0.2 s con
+    700 mil códigos) y un salto lejano de la barra dentro de esa búsqueda, el índice hasta ese punto.
+    Usa una conexión propia: cerrar().
+    """
+
+    def __init__(self, ruta=None):
+        self.conn = _abrir_codigos(ruta)
+
+    def cerrar(self):
+        self.conn.close()
+
+    @staticmethod
+    def _rangos_item(texto):
+        """[(desde, hasta)] de los ITEMS que empiezan con texto (solo dígitos), en orden."""
+        rangos = []
+        if texto == "0" or not texto.startswith("0"):
+            inicio = int(texto)
+            for ceros in range(20 - len(texto)):
+                desde = inicio * 10 ** ceros
+                if desde > _ITEM_MAXIMO:
+                    break
+                rangos.append((desde, min((inicio + 1) * 10 ** ceros - 1, _ITEM_MAXIMO)))
+                if inicio == 0:
+                    break
+        # En SQLite todo texto va después de los enteros: los ITEMS de texto son el último rango
+        return rangos + [(texto, texto + "\U0010ffff")]
+
+    @staticmethod
+    def _filtro(texto):
+        """(condición WHERE, parámetros) de una búsqueda de ITEM u OBSERVACIONES con LIKE."""
+        patron = _como_like(texto)
+        parametros = [patron + "%", f"%{patron}%"]
+        # LIKE solo ignora mayúsculas en ASCII: con acentos también se busca en mayúsculas ("ó" -> "Ó")
+        if not patron.isascii():
+            parametros.append(f"%{patron.upper()}%")
+        condiciones = ["CAST(item AS TEXT) LIKE ? ESCAPE '\\'"] + ["observaciones LIKE ? ESCAPE '\\'"] * (len(parametros) - 1)
+        return f"({' OR '.join(condiciones)})", tuple(parametros)
+
+    def _tramos(self, texto, clave=None, hacia_atras=False):
+        """
+        [(condición WHERE, parámetros)] de una búsqueda en orden de ITEM, solo con los ITEMS
+        desde clave (o antes de ella con hacia_atras). Con solo dígitos cada tramo es un rango
+        de la llave primaria, ya recortado a clave para que SQLite use el límite más cercano.
+        """
+        if texto.isascii() and texto.isdigit():
+            tramos = []
+            for desde, hasta in self._rangos_item(texto):
+                if clave is not None and not hacia_atras:
+                    desde = max(desde, clave, key=_orden_sqlite)
+                elif clave is not None and _orden_sqlite(clave) <= _orden_sqlite(hasta):
+                    if _orden_sqlite(clave) > _orden_sqlite(desde):
+                        tramos.append(("item >= ? AND item < ?", (desde, clave)))
+                    continue
+                if _orden_sqlite(desde) <= _orden_sqlite(hasta):
+                    tramos.append(("item BETWEEN ? AND ?", (desde, hasta)))
+            return tramos
+        condicion, parametros = self._filtro(texto) if texto else ("1", ())
+        if clave is not None:
+            condicion += " AND item < ?" if hacia_atras else " AND item >= ?"
+            parametros += (clave,)
+        return [(condicion, parametros)]
+
+    def _contar_tramos(self, tramos):
+        return sum(
+            self.conn.execute(f"SELECT COUNT(*) FROM codigos_cumple WHERE {condicion}", parametros).fetchone()[0]
+            for condicion, parametros in tramos
+        )
+
+    def _recorrer(self, tramos, salto, cantidad, hacia_atras=False):
+        """cantidad filas de los tramos (en orden inverso con hacia_atras) después de saltar salto filas."""
+        filas = []
+        for i, (condicion, parametros) in enumerate(tramos[::-1] if hacia_atras else tramos):
+            # Un tramo que queda completo dentro del salto se descarta contándolo sobre el índice
+            if salto and i < len(tramos) - 1:
+                en_tramo = self._contar_tramos([(condicion, parametros)])
+                if salto >= en_tramo:
+                    salto -= en_tramo
+                    continue
+            filas += self.conn.execute(
+                f"SELECT {', '.join(_CAMPOS_CODIGOS)} FROM codigos_cumple WHERE {condicion} "
+                f"ORDER BY item {'DESC' if hacia_atras else 'ASC'} LIMIT ? OFFSET ?",
+                parametros + (cantidad - len(filas), salto)
+            ).fetchall()
+            salto = 0
+            if len(filas) >= cantidad:
+                break
+        return filas
+
+    def total(self):
+        return self.conn.execute("SELECT COUNT(*) FROM codigos_cumple").fetchone()[0]
+
+    def contar(self, texto):
+        return self._contar_tramos(self._tramos(texto))
+
+    def pagina(self, texto, inicio, cantidad, ancla=None):
+        """
+        Filas inicio..inicio+cantidad de la búsqueda. ancla = (posición, ITEM) de una fila conocida:
+        la página se lee a partir de ella si está más cerca que el principio de la tabla.
+        """
+        if ancla is None or inicio <= abs(inicio - ancla[0]):
+            return self._recorrer(self._tramos(texto), inicio, cantidad)
+        posicion, clave = ancla
+        clave = normalizar_item(clave)
+        if inicio >= posicion:
+            return self._recorrer(self._tramos(texto, clave), inicio - posicion, cantidad)
+        antes = posicion - inicio
+        filas = self._recorrer(self._tramos(texto, clave, hacia_atras=True),
+                               max(0, antes - cantidad), min(antes, cantidad), hacia_atras=True)[::-1]
+        if antes < cantidad:
+            filas += self._recorrer(self._tramos(texto, clave), 0, cantidad - antes)
+        return filas
+
+    def posicion(self, texto, clave):
+        item = normalizar_item(clave)
+        if not any(self.conn.execute(f"SELECT 1 FROM codigos_cumple WHERE item = ? AND {condicion}",
+                                     (item,) + parametros).fetchone()
+                   for condicion, parametros in self._tramos(texto)):
+            return None
+        if texto and not (texto.isascii() and texto.isdigit()):
+            # El LIKE recorre la tabla de todos modos: en su orden es más rápido que por el índice (+item)
+            condicion, parametros = self._filtro(texto)
+            return self.conn.execute(f"SELECT COUNT(*) FROM codigos_cumple WHERE {condicion} AND +item < ?",
+                                     parametros + (item,)).fetchone()[0]
+        return self._contar_tramos(self._tramos(texto, item, hacia_atras=True))
+
+    def fila(self, clave):
+        return self.conn.execute(
+            f"SELECT {', '.join(_CAMPOS_CODIGOS)} FROM codigos_cumple WHERE item = ?", (normalizar_item(clave),)
+        ).fetchone()
+
+
+def guardar_codigo(item, observaciones, criterio, ruta=None):
+    """Agrega un ITEM o reemplaza su OBSERVACION y CRITERIO."""
+    with closing(_abrir_codigos(ruta)) as conn, conn:
+        conn.execute(
+            "INSERT INTO codigos_cumple (item, observaciones, criterio) VALUES (?, ?, ?) "
+            "ON CONFLICT(item) DO UPDATE SET observaciones = excluded.observaciones, "
+            "criterio = excluded.criterio",
+            (normalizar_item(item), _texto(observaciones), _texto(criterio))
+        )
+        _nueva_version_codigos(conn)
+
+
+def actualizar_observacion(item, observaciones, ruta=None):
+    """Cambia solo la OBSERVACION de un ITEM existente."""
+    with closing(_abrir_codigos(ruta)) as conn, conn:
+        cambios = conn.execute(
+            "UPDATE codigos_cumple SET observaciones = ? WHERE item = ?",
+            (_texto(observaciones), normalizar_item(item))
+        ).rowcount
+        if cambios:
+            _nueva_version_codigos(conn)
+    return cambios
+
+
+def eliminar_codigo(item, ruta=None):
+    with closing(_abrir_codigos(ruta)) as conn, conn:
+        cambios = conn.execute("DELETE FROM codigos_cumple WHERE item = ?", (normalizar_item(item),)).rowcount
+        if cambios:
+            _nueva_version_codigos(conn)
+    return cambios
+
+
+def guardar_codigos(df, politica=ULTIMO_GANA, ruta=None):
+    """Escribe varios ITEMS en una sola transacción y devuelve cuántas filas cambiaron."""
+    with closing(_abrir_codigos(ruta)) as conn, conn:
+        antes = conn.total_changes
+        conn.executemany(_sql_upsert("codigos_cumple", _CAMPOS_CODIGOS, politica), _filas(df, COLUMNAS_CODIGOS))
+        escritas = conn.total_changes - antes
+        if escritas:
+            _nueva_version_codigos(conn)
+    return escritas
+
+
+def subir_codigos(df, politica=CONSERVAR_PRIMERO, ruta=None):
+    """
+    Alta/actualización por ITEM de un archivo de códigos en una sola transacción.
+    politica: CONSERVAR_PRIMERO deja los ITEMS existentes; ULTIMO_GANA los sobrescribe.
+    Si un ITEM se repite en el archivo cuenta su primera aparición.
+    Devuelve {"insertados", "actualizados", "omitidos"}; omitidos incluye ITEMS existentes
+    conservados o sin cambios, repetidos y filas sin ITEM.
+    """
+    if politica not in POLITICAS:
+        raise ValueError(f"Política no válida: {politica}")
+    unicas = {}
+    for fila in _filas(df, COLUMNAS_CODIGOS):
+        unicas.setdefault(fila[0], fila)
+    filas = list(unicas.values())
+    with closing(_abrir_codigos(ruta)) as conn, conn:
+        insertados = conn.executemany(
+            _sql_upsert("codigos_cumple", _CAMPOS_CODIGOS, CONSERVAR_PRIMERO), filas
+        ).rowcount
+        actualizados = 0
+        if politica == ULTIMO_GANA:
+            # Los recién insertados ya son iguales y no cuentan como cambio
+            actualizados = conn.executemany(
+                "UPDATE codigos_cumple SET observaciones = ?, criterio = ? "
+                "WHERE item = ? AND (observaciones IS NOT ? OR criterio IS NOT ?)",
+                [(obs, criterio, item, obs, criterio) for item, obs, criterio in filas]
+            ).rowcount
+        if insertados or actualizados:
+            _nueva_version_codigos(conn)
+    return {"insertados": insertados, "actualizados": actualizados,
+            "omitidos": len(df) - insertados - actualizados}
+
+
+def actualizar_copias_codigos(ruta=None):
+    """Reescribe codigos_cumple.xlsx y codigos_cumple.json (en la carpeta de datos) desde la misma lectura."""
+    df = cargar_codigos(ruta)
+    df.to_excel(CODIGOS_EXCEL, index=False)
+    df.to_json(CODIGOS_JSON, orient="records", force_ascii=False, indent=4)
+    return len(df)
+
+
+def comparar_codigos(df_nuevo, ruta=None):
+    """
+    Compara un archivo de códigos contra codigos_cumple con un solo cruce por ITEM.
+    Devuelve un diccionario con:
+      nuevos      ITEMS que no existen (ITEM, OBSERVACIONES, CRITERIO)
+      cambios     ITEMS existentes con otra OBSERVACION (ITEM, OBSERVACIONES ACTUAL, OBSERVACIONES)
+      sin_cambios número de ITEMS existentes con la misma OBSERVACION
+    Si un ITEM se repite en el archivo cuenta su primera aparición.
+    """
+    with Traza.etapa("comparar_codigos", len(df_nuevo)):
+        return _comparar_codigos(df_nuevo, ruta)
+
+
+def _comparar_codigos(df_nuevo, ruta=None):
+    # Las columnas que no trae el archivo quedan vacías
+    nuevo = df_nuevo.reindex(columns=COLUMNAS_CODIGOS, fill_value="")
+    nuevo["ITEM"] = nuevo["ITEM"].map(normalizar_item)
+    nuevo = nuevo[nuevo["ITEM"].notna()].drop_duplicates(subset=["ITEM"])
+    for col in COLUMNAS_CODIGOS[1:]:
+        nuevo[col] = nuevo[col].map(_texto)
+
+    actual = cargar_codigos(ruta)[["ITEM", "OBSERVACIONES"]]
+    unido = nuevo.merge(actual, on="ITEM", how="left", suffixes=("", " ACTUAL"), indicator=True)
+
+    es_nuevo = (unido["_merge"] == "left_only").to_numpy()
+    # Vacío y nulo cuentan como la misma OBSERVACION
+    distinta = (unido["OBSERVACIONES"].fillna("") != unido["OBSERVACIONES ACTUAL"].fillna("")).to_numpy()
+    cambio = ~es_nuevo & distinta
+
+    return {
+        "nuevos": unido.loc[es_nuevo, COLUMNAS_CODIGOS].reset_index(drop=True),
+        "cambios": unido.loc[cambio, ["ITEM", "OBSERVACIONES ACTUAL", "OBSERVACIONES"]].reset_index(drop=True),
+        "sin_cambios": int((~es_nuevo & ~distinta).sum()),
+    }
+
+
+def fusionar_codigos(nuevos, cambios, ruta=None):
+    """
+    Agrega los ITEMS nuevos y cambia la OBSERVACION de los cambios aceptados en una sola transacción.
+    Devuelve (agregados, actualizados, total de ITEMS).
+    """
+    with Traza.etapa("fusionar_codigos", len(nuevos) + len(cambios)), closing(_abrir_codigos(ruta)) as conn, conn:
+        agregados = conn.executemany(
+            _sql_upsert("codigos_cumple", _CAMPOS_CODIGOS, CONSERVAR_PRIMERO), _filas(nuevos, COLUMNAS_CODIGOS)
+        ).rowcount
+        actualizados = conn.executemany(
+            "UPDATE codigos_cumple SET observaciones = ? WHERE item = ?",
+            [(obs, item) for item, obs in _filas(cambios, ["ITEM", "OBSERVACIONES"])]
+        ).rowcount
+        if agregados or actualizados:
+            _nueva_version_codigos(conn)
+        total = conn.execute("SELECT COUNT(*) FROM codigos_cumple").fetchone()[0]
+    return agregados, actualizados, total
+
+
+def exportar_codigos(ruta_salida, ruta=None):
+    """Exporta codigos_cumple a Excel o a JSON (según la extensión del archivo)."""
+    df = cargar_codigos(ruta)
+    if ruta_salida.lower().endswith(".json"):
+        df.to_json(ruta_salida, orient="records", force_ascii=False, indent=4)
+    else:
+        df.to_excel(ruta_salida, index=False)
+    return len(df)
+
+
+# --- Caché de clasificación ---
+# Versiones de referencia con las que se validó la caché (claves de meta)
+_VERSIONES_CACHE = {"reglas": "cache_reglas", "catalogo": "cache_catalogo", "codigos": "cache_codigos"}
+
+# Mapa ITEM -> clase de la caché, en la misma carpeta que la base de datos
+MAPA_CACHE = "clasificacion.npy"
+
+
+def versiones_cache(ruta=None):
+    """Versiones (reglas, catálogo y codigos_cumple) con las que está etiquetada la caché; None si no hay."""
+    with closing(conectar(ruta)) as conn:
+        valores = dict(conn.execute(
+            f"SELECT clave, valor FROM meta WHERE clave IN ({', '.join('?' for _ in _VERSIONES_CACHE)})",
+            list(_VERSIONES_CACHE.values())
+        ).fetchall())
+    return {nombre: valores.get(clave) for nombre, clave in _VERSIONES_CACHE.items()}
+
+
+def _ruta_mapa(ruta=None):
+    return os.path.join(os.path.dirname(ruta or RUTA_BD), MAPA_CACHE)
+
+
+def _leer_mapa(ruta=None):
+    """(ITEMS ordenados, clase de cada uno) de la caché; vacíos si todavía no hay."""
+    try:
+        mapa = np.load(_ruta_mapa(ruta))
+    except (OSError, ValueError):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return mapa[0], mapa[1]
+
+
+def _guardar_mapa(items, clases, ruta=None):
+    """
+    Reescribe el mapa (ordenado por ITEM) con un rename atómico. Si dos procesos escriben a la vez
+    gana el último: a lo más se pierden ITEMS de la caché, que se vuelven a clasificar.
+    """
+    orden = np.argsort(items, kind="stable")
+    destino = _ruta_mapa(ruta)
+    temporal = f"{destino}.{os.getpid()}.tmp"
+    with open(temporal, "wb") as f:
+        np.save(f, np.vstack([items[orden], clases[orden]]).astype(np.int64))
+    os.replace(temporal, destino)
+
+
+def _clases_cache(conn):
+    """Clases de la caché como DataFrame indexado por número de clase."""
+    df = pd.read_sql_query(f"SELECT clase, {', '.join(_CAMPOS_CLASE)} FROM clasificacion_clases", conn,
+                           index_col="clase")
+    df.columns = COLUMNAS_CACHE[1:]
+    return df
+
+
+def llaves_cache(ruta=None):
+    """ITEM y valores de referencia (CATALOGO, CRITERIO CODIGOS) de toda la caché, para revalidarla."""
+    items, clases = _leer_mapa(ruta)
+    with closing(conectar(ruta)) as conn:
+        df_clases = _clases_cache(conn)
+    valores = df_clases.reindex(clases)
+    return pd.DataFrame({
+        "ITEM": items,
+        "CATALOGO": valores["CATALOGO"].to_numpy(dtype=object),
+        "CRITERIO CODIGOS": valores["CRITERIO CODIGOS"].to_numpy(dtype=object),
+    })
+
+
+def depurar_cache(items, versiones, todo=False, ruta=None):
+    """
+    Borra de la caché los ITEMS indicados (o toda la caché con todo=True) y la etiqueta
+    con las versiones actuales. Devuelve los ITEMS borrados.
+    Las clases no se borran: son pocas y así un número de clase nunca cambia de significado.
+    """
+    actuales, clases = _leer_mapa(ruta)
+    if todo:
+        borrar = np.ones(len(actuales), dtype=bool)
+    else:
+        borrar = np.isin(actuales, np.asarray(items, dtype=np.int64))
+    if borrar.any():
+        _guardar_mapa(actuales[~borrar], clases[~borrar], ruta)
+    with closing(conectar(ruta)) as conn, conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO meta (clave, valor) VALUES (?, ?)",
+            [(clave, versiones[nombre]) for nombre, clave in _VERSIONES_CACHE.items()]
+        )
+    return int(borrar.sum())
+
+
+def _mismo_texto(a, b):
+    """Comparación elemento a elemento de dos arreglos de texto en la que dos nulos son iguales."""
+    a, b = pd.Series(a, dtype=object), pd.Series(b, dtype=object)
+    return ((a == b) | (a.isna() & b.isna())).to_numpy()
+
+
+def leer_cache(items, normas, ruta=None):
+    """
+    Aciertos de la caché: ITEMS (enteros) guardados con la misma NORMA de entrada (None = vacía).
+    Devuelve un DataFrame con ITEM, TIPO DE PROCESO, NORMA y CRITERIO.
+    """
+    items = np.asarray(items, dtype=np.int64)
+    guardados, clases = _leer_mapa(ruta)
+    posiciones = np.searchsorted(guardados, items).clip(max=max(len(guardados) - 1, 0))
+    hallados = guardados[posiciones] == items if len(guardados) else np.zeros(len(items), dtype=bool)
+    if not hallados.any():
+        return pd.DataFrame(columns=["ITEM", "TIPO DE PROCESO", "NORMA", "CRITERIO"])
+    with closing(conectar(ruta)) as conn:
+        df_clases = _clases_cache(conn)
+    valores = df_clases.reindex(clases[posiciones[hallados]])
+    acierto = _mismo_texto(valores["NORMA ENTRADA"].to_numpy(dtype=object),
+                           np.asarray(normas, dtype=object)[hallados])
+    # Una clase que ya no existe (no debería pasar) cuenta como fallo
+    acierto &= valores.index.isin(df_clases.index)
+    valores = valores[acierto]
+    return pd.DataFrame({
+        "ITEM": items[hallados][acierto],
+        "TIPO DE PROCESO": valores["TIPO DE PROCESO"].to_numpy(dtype=object),
+        "NORMA": valores["NORMA"].to_numpy(dtype=object),
+        "CRITERIO": valores["CRITERIO"].to_numpy(dtype=object),
+    })
+
+
+def guardar_cache(df, ruta=None):
+    """Guarda (o reemplaza) en la caché las filas de df con COLUMNAS_CACHE (ITEMS enteros). Devuelve las filas escritas."""
+    items = df["ITEM"].to_numpy(dtype=np.int64)
+    combinaciones = list(zip(*(Esquema.objetos(df[col]) if col in df.columns else [None] * len(df)
+                               for col in COLUMNAS_CACHE[1:])))
+    with closing(conectar(ruta)) as conn, conn:
+        # Inmediata: otro proceso no puede numerar las mismas clases nuevas al mismo tiempo
+        conn.execute("BEGIN IMMEDIATE")
+        numeros = {tuple(fila[1:]): fila[0] for fila in conn.execute(
+            f"SELECT clase, {', '.join(_CAMPOS_CLASE)} FROM clasificacion_clases")}
+        siguiente = max(numeros.values(), default=0) + 1
+        nuevas = []
+        for combinacion in dict.fromkeys(combinaciones):
+            if combinacion not in numeros:
+                numeros[combinacion] = siguiente
+                nuevas.append((siguiente, *combinacion))
+                siguiente += 1
+        conn.executemany(
+            f"INSERT INTO clasificacion_clases (clase, {', '.join(_CAMPOS_CLASE)}) "
+            f"VALUES (?, {', '.join('?' for _ in _CAMPOS_CLASE)})",
+            nuevas
+        )
+    clases = np.fromiter((numeros[c] for c in combinaciones), dtype=np.int64, count=len(combinaciones))
+
+    guardados, clases_guardadas = _leer_mapa(ruta)
+    conservar = ~np.isin(guardados, items)
+    _guardar_mapa(np.concatenate([guardados[conservar], items]),
+                  np.concatenate([clases_guardadas[conservar], clases]), ruta)
+    return len(items)
+
+
+def leer_meta(clave, ruta=None):
+    with closing(conectar(ruta)) as conn:
+        fila = conn.execute("SELECT valor FROM meta WHERE clave = ?", (clave,)).fetchone()
+    return fila[0] if fila else None
+
+
+def guardar_meta(clave, valor, ruta=None):
+    with closing(conectar(ruta)) as conn, conn:
+        conn.execute("INSERT OR REPLACE INTO meta (clave, valor) VALUES (?, ?)", (clave, str(valor)))
@@ -0,0 +1,79 @@
+"""
+Esquema tipado de las tablas del proceso: catálogo (base_general), codigos_cumple y TIPO DE PROCESO.
+
+- Llaves ITEM y EAN: int64. Se normalizan una sola vez, al ingresar los datos: ' 0123', 123.0 y 123
+  son la misma llave, igual que el número de parte del reporte (pd.to_numeric). Una fila cuya llave
+  no es un número entero no puede cruzar con ningún ITEM del reporte y se descarta.
+- Enumeraciones (CODIGO FORMATO, NORMA, CRITERIO, TIPO DE PROCESO): category, un código por fila
+  y cada valor distinto guardado una sola vez.
+- Texto libre (DESCRIPCION, OBSERVACIONES, que captura el operador, y cualquier otra columna de
+  texto): string de pandas (nulos como <NA>).
+
+Los cargadores (Almacen.cargar_tabla, BaseDatos.cargar_codigos(tipado=True) y
+Procesamiento.clasificar) devuelven siempre las tablas con este esquema.
+"""
+import numpy as np
+import pandas as pd
+
+LLAVES = ("ITEM", "EAN")
+CATEGORIAS = ("CODIGO FORMATO", "NORMA", "CRITERIO", "TIPO DE PROCESO")
+TEXTO = "string"
+
+
+def llaves_enteras(valores):
+    """
+    Llaves como int64 y la máscara de las que son un número entero.
+    Las que no lo son (texto, vacías, decimales) quedan en 0 y False en la máscara.
+    """
+    serie = valores if isinstance(valores, pd.Series) else pd.Series(valores)
+    if pd.api.types.is_integer_dtype(serie.dtype) and not serie.hasnans:
+        return serie.to_numpy(dtype=np.int64), np.ones(len(serie), dtype=bool)
+    numeros = pd.to_numeric(serie, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    validas = np.isfinite(numeros)
+    validas[validas] = numeros[validas] == np.floor(numeros[validas])
+    llaves = np.zeros(len(numeros), dtype=np.int64)
+    llaves[validas] = numeros[validas].astype(np.int64)
+    return llaves, validas
+
+
+def normalizar_llaves(df, llaves=LLAVES):
+    """
+    Convierte a int64 las columnas llave que tenga df y descarta las filas cuya llave no es entera.
+    llaves limita cuáles se tratan como llave (p. ej. un ITEM informativo del catálogo queda como texto).
+    """
+    columnas = [col for col in llaves if col in df.columns]
+    if all(df[col].dtype == np.int64 for col in columnas):
+        return df  # ya normalizadas (p. ej. leídas del almacén, sin copiar)
+    validas = np.ones(len(df), dtype=bool)
+    llaves = {}
+    for col in columnas:
+        llaves[col], validas_col = llaves_enteras(df[col])
+        validas &= validas_col
+    if validas.all():
+        df = df.copy()
+    else:
+        df = df[validas].reset_index(drop=True)
+    for col in columnas:
+        df[col] = llaves[col][validas]
+    return df
+
+
+def aplicar(df):
+    """DataFrame con el esquema: llaves int64, enumeraciones como category y el resto del texto como string."""
+    df = normalizar_llaves(df).copy(deep=False)
+    for col in df.columns:
+        if col in LLAVES:
+            continue
+        if col in CATEGORIAS:
+            if not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype("category")
+        elif df[col].dtype == object:
+            df[col] = df[col].astype(TEXTO)
+    return df
+
+
+def objetos(serie):
+    """Columna como arreglo object con None en los nulos (como venían antes las columnas de texto)."""
+    valores = serie.to_numpy(dtype=object)
+    valores[pd.isna(valores)] = None
+    return valores
@@ -1,39 +1,90 @@
-# Formato.py
+import numpy as np
 import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.styles import Font, Alignment, PatternFill
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 from openpyxl.utils import get_column_letter
 
+import Esquema
+import Traza
+
+# Forma escrita de un número, sin ceros a la izquierda (4, -4, 4.5, 1033680.0)
+NUMERO = r"-?(?:0|[1-9]\d*)(?:\.\d+)?"
+
+
+def calcular_anchos(df):
+    """
+    Ancho de cada columna según su contenido (encabezado incluido), calculado por columnas.
+    Igual que antes: largo del texto más largo + 2, ignorando celdas vacías, 0 y False.
+    """
+    anchos = []
+    for col in df.columns:
+        serie = df[col]
+        serie = serie[serie.notna()]
+        if len(serie):
+            serie = serie[serie.astype(bool)]
+        max_length = len(str(col)) if str(col) else 0
+        if len(serie):
+            max_length = max(max_length, int(serie.astype(str).str.len().max()))
+        anchos.append(max_length + 2)
+    return anchos
+
+
+def numeros_como_numero(serie):
+    """
+    Valores de una columna de texto (string de Esquema) con los que son la forma escrita de un
+    número convertidos a número. Una DESCRIPCION numérica del reporte llega como '4' o '4.5' y se
+    escribe como número, igual que antes del esquema; '0123' o '4.50' no se leen igual como número
+    y se quedan como texto.
+    """
+    valores = Esquema.objetos(serie)
+    for i in np.flatnonzero(serie.str.fullmatch(NUMERO).fillna(False).to_numpy(dtype=bool)):
+        texto = valores[i]
+        numero = float(texto) if "." in texto else int(texto)
+        if str(numero) == texto:
+            valores[i] = numero
+    return valores
+
+
 def exportar_excel(df, ruta_salida):
-    # Guardar DataFrame en Excel
-    df.to_excel(ruta_salida, index=False, sheet_name="Tipo de Proceso")
+    with Traza.etapa("exportar_excel", len(df)):
+        _exportar_excel(df, ruta_salida)
+
+
+def _exportar_excel(df, ruta_salida):
+    # Libro en modo de solo escritura: las filas se escriben una sola vez, sin releer el archivo
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Tipo de Proceso")
 
-    # Abrir con openpyxl
-    wb = load_workbook(ruta_salida)
-    ws = wb.active
+    # Ajustar ancho de columnas según contenido (debe definirse antes de escribir filas)
+    for col_num, ancho in enumerate(calcular_anchos(df), 1):
+        ws.column_dimensions[get_column_letter(col_num)].width = ancho
 
     # Estilos para encabezados
     header_font = Font(bold=True, color="000000")
     header_fill = PatternFill(start_color="ADD8E6", end_color="ADD8E6", fill_type="solid")
     header_alignment = Alignment(horizontal="center", vertical="center")
+    lado = Side(style="thin")
+    header_border = Border(left=lado, right=lado, top=lado, bottom=lado)
 
-    # Aplicar formato a la fila de encabezados
-    for cell in ws[1]:
+    # Fila de encabezados con formato
+    encabezados = []
+    for col in df.columns:
+        cell = WriteOnlyCell(ws, value=str(col))
         cell.font = header_font
         cell.fill = header_fill
         cell.alignment = header_alignment
+        cell.border = header_border
+        encabezados.append(cell)
+    ws.append(encabezados)
 
-    # Ajustar ancho de columnas según contenido
-    for col_num, column_cells in enumerate(ws.columns, 1):
-        max_length = 0
-        col_letter = get_column_letter(col_num)
-        for cell in column_cells:
-            try:
-                if cell.value:
-                    max_length = max(max_length, len(str(cell.value)))
-            except:
-                pass
-        ws.column_dimensions[col_letter].width = max_length + 2
+    # Filas de datos (los nulos quedan como celdas vacías)
+    valores = df.astype(object).where(df.notna(), None)
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.StringDtype):
+            valores[col] = numeros_como_numero(df[col])
+    for fila in valores.itertuples(index=False, name=None):
+        ws.append(fila)
 
     # Guardar archivo con formato aplicado
     wb.save(ruta_salida)
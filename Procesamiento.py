@@ -0,0 +1,771 @@
+import datetime
+import functools
+import itertools
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from pandas.io.parsers import TextParser
+
+import Almacen
+import Esquema
+import Traza
+from Almacen import RUTA_RECURSOS, cargar_tabla
+from BaseDatos import (cargar_codigos, version_codigos, versiones_cache, llaves_cache, depurar_cache,
+                       leer_cache, guardar_cache, leer_meta, guardar_meta)
+
+# Lector de Excel: calamine (mucho más rápido) si python-calamine está instalado, si no openpyxl
+try:
+    import python_calamine
+    MOTOR_EXCEL = "calamine"
+except ImportError:
+    python_calamine = None
+    MOTOR_EXCEL = None
+
+
+class ProcesoCancelado(Exception):
+    """Se lanza cuando el usuario cancela un proceso en curso."""
+
+
+class Referencias:
+    """
+    Datos de referencia ya indexados (catálogo y codigos_cumple).
+    Se construyen una sola vez y se reutilizan en todos los reportes.
+    version_catalogo / version_codigos identifican los datos; sin ellas no se usa la caché de clasificación.
+    """
+
+    def __init__(self, df_base, df_codigos_cumple, indice_catalogo=None, indice_criterio=None,
+                 version_catalogo=None, version_codigos=None):
+        self.df_base = df_base
+        self.df_codigos_cumple = df_codigos_cumple
+        self.indice_catalogo = indexar_catalogo(df_base) if indice_catalogo is None else indice_catalogo
+        self.indice_criterio = indexar_criterio(df_codigos_cumple) if indice_criterio is None else indice_criterio
+        self.version_catalogo = version_catalogo
+        self.version_codigos = version_codigos
+
+
+# Índices construidos sobre las tablas en memoria: nombre -> (versión, DataFrame, índice)
+_indices = {}
+
+
+def _indice_catalogo():
+    """Catálogo e índice EAN; el índice solo se reconstruye si Almacen recargó la tabla."""
+    df = cargar_tabla("base_general")
+    guardado = _indices.get("base_general")
+    if guardado is None or guardado[1] is not df:
+        guardado = (Almacen.version("base_general"), df, indexar_catalogo(df))
+        _indices["base_general"] = guardado
+    return guardado
+
+
+def _indice_codigos():
+    """codigos_cumple e índice de CRITERIO; solo se vuelven a leer si cambió su versión en la base de datos."""
+    guardado = _indices.get("codigos_cumple")
+    if guardado is None or guardado[0] != version_codigos():
+        version, df = cargar_codigos(con_version=True, tipado=True)
+        guardado = (version, df, indexar_criterio(df))
+        _indices["codigos_cumple"] = guardado
+    return guardado
+
+
+def cargar_referencias():
+    """
+    Devuelve las Referencias indexadas del catálogo y codigos_cumple.
+    Las tablas e índices se conservan entre reportes y solo se recarga lo que cambió.
+    """
+    with Traza.etapa("carga_referencias") as etapa:
+        version_catalogo, df_base, indice_catalogo = _indice_catalogo()
+        version_codigos_cumple, df_codigos_cumple, indice_criterio = _indice_codigos()
+        etapa.filas = len(df_base) + len(df_codigos_cumple)
+    return Referencias(df_base, df_codigos_cumple, indice_catalogo, indice_criterio,
+                       version_catalogo, version_codigos_cumple)
+
+
+# --- Detección del tipo de reporte ---
+# --- Formatos de reporte (FH, MIMPO, ...) ---
+RUTA_FORMATOS = os.path.join(RUTA_RECURSOS, "formatos_reporte.json")
+# El del paquete se usa mientras la carpeta de datos no tenga el suyo (Almacen.preparar_carpeta_datos
+# no se llamó todavía: ProcesosV1, benchmarks o Procesamiento usado como biblioteca)
+FORMATOS_PAQUETE = os.path.join(Almacen.RUTA_PAQUETE, "formatos_reporte.json")
+CAMPOS_FORMATO = ('num_parte', 'descripcion', 'norma', 'criterio')
+
+# Registro leído de RUTA_FORMATOS: (firma del archivo, lista de formatos)
+_formatos = None
+
+
+def _normalizar_encabezado(col):
+    return str(col).strip().lower()
+
+
+def cargar_formatos(ruta=None):
+    """
+    Lista de formatos de reporte, en orden de prioridad. Cada formato tiene un nombre y,
+    por campo (CAMPOS_FORMATO), los nombres de columna posibles.
+    Se vuelve a leer solo si el archivo cambió. Sin ruta se usa el de la carpeta de datos
+    (RUTA_FORMATOS) o, si aún no existe, el del paquete.
+    """
+    global _formatos
+    if ruta is None:
+        ruta = RUTA_FORMATOS if os.path.exists(RUTA_FORMATOS) else FORMATOS_PAQUETE
+    st = os.stat(ruta)
+    firma = (ruta, st.st_mtime_ns, st.st_size)
+    if _formatos is None or _formatos[0] != firma:
+        with open(ruta, "r", encoding="utf-8") as f:
+            formatos = json.load(f)["formatos"]
+        for formato in formatos:
+            faltantes = [campo for campo in ('nombre', 'num_parte') if not formato.get(campo)]
+            if faltantes:
+                raise ValueError(f"Formato de reporte incompleto en {ruta}: falta {', '.join(faltantes)}")
+        _formatos = (firma, formatos)
+    return _formatos[1]
+
+
+def detectar_formato(columnas, formatos=None):
+    """
+    Detecta el formato del reporte solo con sus encabezados.
+    Devuelve (nombre del formato, {campo: columna del reporte o None}).
+    """
+    columnas = list(columnas)
+    normalizadas = {}
+    for col in columnas:
+        normalizadas.setdefault(_normalizar_encabezado(col), col)
+
+    for formato in formatos if formatos is not None else cargar_formatos():
+        resueltas = {}
+        for campo in CAMPOS_FORMATO:
+            resueltas[campo] = next(
+                (normalizadas[a] for a in map(_normalizar_encabezado, formato.get(campo, []))
+                 if a in normalizadas),
+                None
+            )
+        if resueltas['num_parte'] is not None:
+            return formato['nombre'], resueltas
+
+    raise ValueError("No se encontró ninguna columna de NUM. PARTE válida en el reporte")
+
+
+def detectar_columnas(columnas):
+    """
+    Columnas de número de parte, norma, descripción y criterio del reporte según su formato.
+    Las que el reporte no tenga quedan en None.
+    """
+    return detectar_formato(columnas)[1]
+
+
+def leer_encabezado(reporte_path, motor=MOTOR_EXCEL):
+    """Lee solo la fila de encabezados del reporte."""
+    return list(pd.read_excel(reporte_path, nrows=0, engine=motor).columns)
+
+
+def _valor_celda(valor):
+    """Igual que pandas con openpyxl: celdas vacías como '' (luego NaN) y 5.0 como 5."""
+    if valor is None:
+        return ''
+    if isinstance(valor, float) and valor.is_integer():
+        return int(valor)
+    return valor
+
+
+def _valor_calamine(valor):
+    """Igual que pandas con calamine: 5.0 como 5, fechas como Timestamp y duraciones como Timedelta."""
+    if isinstance(valor, float):
+        return int(valor) if valor.is_integer() else valor
+    if isinstance(valor, datetime.date):
+        return pd.Timestamp(valor)
+    if isinstance(valor, datetime.timedelta):
+        return pd.Timedelta(valor)
+    return valor
+
+
+# Filas del reporte entre dos avisos de avance (y revisiones de cancelación) durante la lectura
+BLOQUE_LECTURA = 20_000
+
+
+def _sin_avance(fraccion, texto=None):
+    pass
+
+
+def _tramo(avance, desde, hasta):
+    """Avance de una etapa: recibe la fracción (0 a 1) de la etapa y la ubica entre desde y hasta."""
+    return lambda fraccion, texto=None: avance(desde + (hasta - desde) * fraccion, texto)
+
+
+def _tabla_reporte(filas, valor, total, avance):
+    """
+    Una sola pasada sobre las filas de la hoja: la primera sirve para detectar el formato y de las
+    demás solo se toman las columnas necesarias, por bloques de BLOQUE_LECTURA filas (avisando el
+    avance). valor convierte cada celda como lo hace pd.read_excel con el mismo motor y los tipos se
+    infieren con el mismo TextParser, así que el resultado es igual.
+    """
+    encabezado = [f"Unnamed: {i}" if col in (None, '') else col for i, col in enumerate(next(filas, ()))]
+    necesarias = {col for col in detectar_columnas(encabezado).values() if col is not None}
+    posiciones = [i for i, col in enumerate(encabezado) if col in necesarias]
+    datos = [[encabezado[p] for p in posiciones]]
+    while True:
+        bloque = list(itertools.islice(filas, BLOQUE_LECTURA))
+        if not bloque:
+            break
+        datos.extend([valor(fila[p]) if p < len(fila) else '' for p in posiciones] for fila in bloque)
+        avance(min(len(datos) / total, 1.0) if total else 0.0)
+    with TextParser(datos, header=0) as parser:
+        return parser.read()
+
+
+def _leer_reporte_openpyxl(reporte_path, avance=_sin_avance):
+    wb = load_workbook(reporte_path, read_only=True, data_only=True)
+    try:
+        hoja = wb.worksheets[0]
+        # max_row viene de la dimensión guardada en el archivo; si falta no hay porcentaje
+        return _tabla_reporte(hoja.iter_rows(values_only=True), _valor_celda, hoja.max_row or 0, avance)
+    finally:
+        wb.close()
+
+
+def _leer_reporte_calamine(reporte_path, avance=_sin_avance):
+    # La hoja se carga completa de una vez (en Rust); lo que se reparte por bloques es pasarla a Python
+    hoja = python_calamine.CalamineWorkbook.from_path(reporte_path).get_sheet_by_index(0)
+    return _tabla_reporte(hoja.iter_rows(), _valor_calamine, hoja.height, avance)
+
+
+def leer_reporte(reporte_path, motor=MOTOR_EXCEL, avance=_sin_avance):
+    """
+    Lee del reporte solo las columnas que usa el proceso (número de parte, norma, descripción y criterio).
+    Primero se leen los encabezados para detectar el formato y después solo esas columnas.
+    Las columnas que el reporte no tenga se ignoran (más adelante quedan como '').
+    avance: recibe la fracción leída (0 a 1) cada BLOQUE_LECTURA filas (con xlrd, para .xls sin
+    calamine, solo al terminar).
+    """
+    with Traza.etapa("lectura_reporte") as etapa:
+        if motor == "calamine":
+            df = _leer_reporte_calamine(reporte_path, avance)
+        elif motor is None and reporte_path.lower().endswith((".xlsx", ".xlsm")):
+            df = _leer_reporte_openpyxl(reporte_path, avance)
+        else:
+            necesarias = {col for col in detectar_columnas(leer_encabezado(reporte_path, motor)).values()
+                          if col is not None}
+            df = pd.read_excel(reporte_path, engine=motor, usecols=lambda col: col in necesarias)
+            avance(1.0)
+        etapa.filas = len(df)
+    return df
+
+
+# --- Índice del catálogo BASE DECATHLON ---
+def indexar_catalogo(df_base):
+    """
+    Construye el índice EAN -> CODIGO FORMATO del catálogo, con llaves int64.
+    Se conserva la primera aparición de cada EAN, igual que match.iloc[0].
+    """
+    if 'EAN' not in df_base.columns or 'CODIGO FORMATO' not in df_base.columns:
+        return _indice_vacio()
+    return _indice(df_base['EAN'], Esquema.objetos(df_base['CODIGO FORMATO']))
+
+
+def _indice_vacio():
+    return pd.Series(dtype=object, index=pd.Index([], dtype=np.int64))
+
+
+def _indice(llaves, valores):
+    """Serie llave int64 -> valor (primera aparición); las llaves que no son enteras no entran."""
+    llaves, validas = Esquema.llaves_enteras(llaves)
+    indice = pd.Series(valores[validas], index=pd.Index(llaves[validas]))
+    return indice[~indice.index.duplicated(keep='first')]
+
+
+def resolver_items(items, indice):
+    """
+    Resuelve todos los ITEMS en un solo cruce contra un índice (catálogo o codigos_cumple).
+    Los ITEMS sin coincidencia quedan como ''.
+    """
+    claves, validas = Esquema.llaves_enteras(items)
+    posiciones = indice.index.get_indexer(claves)
+    valores = indice.to_numpy(dtype=object)
+
+    tipo_proceso = np.full(len(claves), '', dtype=object)
+    encontrados = (posiciones >= 0) & validas
+    tipo_proceso[encontrados] = valores[posiciones[encontrados]]
+    return tipo_proceso
+
+
+# --- Índice de codigos_cumple ---
+def indexar_criterio(df_codigos_cumple):
+    """
+    Construye el índice ITEM -> CRITERIO de codigos_cumple (primera aparición de cada ITEM).
+    Si OBSERVACIONES contiene 'CUMPLE' el criterio es CUMPLE; si no, se toma la columna CRITERIO.
+    """
+    if 'ITEM' not in df_codigos_cumple.columns or 'OBSERVACIONES' not in df_codigos_cumple.columns:
+        return _indice_vacio()
+
+    # Se evalúa como texto con None en los nulos ('None'), igual que antes del esquema tipado
+    obs = pd.Series(Esquema.objetos(df_codigos_cumple['OBSERVACIONES'])).map(str).str.upper().str.strip()
+    if 'CRITERIO' in df_codigos_cumple.columns:
+        criterio = pd.Series(Esquema.objetos(df_codigos_cumple['CRITERIO'])).map(str).str.strip()
+    else:
+        criterio = pd.Series('', index=obs.index)
+    criterio = criterio.where(~obs.str.contains('CUMPLE', regex=False), 'CUMPLE')
+
+    return _indice(df_codigos_cumple['ITEM'], criterio.to_numpy(dtype=object))
+
+
+# --- Primeras ocurrencias del reporte ---
+def extraer_primeras_ocurrencias(df_reporte, num_parte_col, norma_col=None, desc_col=None, criterio_col=None):
+    """
+    Construye en una sola pasada la tabla ITEM -> NORMA, DESCRIPCION, CRITERIO del reporte.
+    La llave es el número de parte ya convertido a entero y se conserva la primera fila
+    de cada ITEM, igual que match.iloc[0]. Las columnas que no existan quedan como ''.
+    """
+    claves = pd.to_numeric(df_reporte[num_parte_col], errors='coerce')
+    validas = claves.notna().to_numpy()
+
+    columnas = {'NORMA': norma_col, 'DESCRIPCION': desc_col, 'CRITERIO': criterio_col}
+    indice = pd.Index(claves[validas].astype(int), name='ITEM')
+    primeras = ~indice.duplicated(keep='first')
+
+    tabla = pd.DataFrame(index=indice[primeras])
+    for destino, origen in columnas.items():
+        if origen is not None and origen in df_reporte.columns:
+            tabla[destino] = df_reporte[origen].to_numpy(dtype=object)[validas][primeras]
+        else:
+            tabla[destino] = ''
+    return tabla
+
+
+# --- Reglas para modificar TIPO DE PROCESO, NORMA y CRITERIO ---
+NORMAS_ADHERIBLE = [
+    '015', '050', '004-SE', '024', '141',
+    'NOM-015-SCFI-2007', 'NOM-050-SCFI-2004', 'NOM-004-SE-2021',
+    'NOM-024-SCFI-2013', 'NOM-141-SSA1/SCFI-2012',
+    'NOM004TEXX', 'NOM020INS', 'NOM-020-SCFI-1997'
+]
+NORMAS_COSTURA = ['004', '020', 'NOM004', 'NOM020']
+
+# LISTADO DE NORMAS VALIDAS
+NORMAS_VALIDAS = ['003', '004', 'NOM-004-SE-2021', '008', '015', '020', 'NOM-020-SCFI-1997',
+                  '024', 'NOM-024-SCFI-2013', '035', '050', '051', '116', '141', '142', '173',
+                  '185', '186', '189', '192', '199', '235']
+
+NORMAS_ESPECIALES_ADHERIBLE = ['NOM-050-SCFI-2004', 'NOM-015-SCFI-2007']
+
+
+def _patron(textos):
+    """Una sola expresión regular que encuentra cualquiera de los textos (equivale a any(t in x))."""
+    return re.compile("|".join(re.escape(t) for t in sorted(textos, key=len, reverse=True)))
+
+
+PATRON_ADHERIBLE = _patron(NORMAS_ADHERIBLE)
+PATRON_COSTURA = _patron(NORMAS_COSTURA)
+
+
+@functools.lru_cache(maxsize=4096)
+def clasificar_norma(tipo, norma):
+    """
+    TIPO DE PROCESO según la norma para un par (TIPO, NORMA) ya convertido a texto.
+    La primera regla que coincide gana: TEXX -> 004 -> NOM020INS/NOM-020 -> lista adherible
+    -> lista costura -> '0' -> 'N/D'; si ninguna coincide se conserva el TIPO.
+    """
+    if 'NOM004TEXX' in tipo or 'TEXX' in norma:
+        return 'ADHERIBLE'
+    if 'NOM004' in tipo or '004' in norma:
+        return 'COSTURA'
+    if 'NOM020INS' in tipo or 'NOM-020-SCFI-1997' in norma:
+        return 'ADHERIBLE'
+    if PATRON_ADHERIBLE.search(norma):
+        return 'ADHERIBLE'
+    if PATRON_COSTURA.search(norma):
+        return 'COSTURA'
+    if norma == '0':
+        return 'SIN NORMA'
+    if norma == 'N/D':
+        return ''
+    return tipo
+
+
+def _clasificar_pares(tipo_txt, norma_txt):
+    """Clasifica cada par distinto (TIPO, NORMA) una sola vez y reparte el resultado a todas las filas."""
+    codigos_tipo, tipos = pd.factorize(tipo_txt)
+    codigos_norma, normas = pd.factorize(norma_txt)
+    codigos, pares = pd.factorize(codigos_tipo.astype(np.int64) * len(normas) + codigos_norma)
+    valores = np.empty(len(pares), dtype=object)
+    valores[:] = [clasificar_norma(tipos[par // len(normas)], normas[par % len(normas)]) for par in pares]
+    return valores[codigos]
+
+
+def _texto_limpio(serie):
+    """Equivale a str(valor).strip() con '' para valores nulos."""
+    return serie.map(str).str.strip().where(serie.notna().to_numpy(), '')
+
+
+def aplicar_reglas(df_result):
+    """
+    Aplica las reglas de TIPO DE PROCESO, NORMA y CRITERIO sobre columnas completas.
+    Cada regla se evalúa como máscara y se aplica en el mismo orden que el recorrido
+    fila por fila, así que las anulaciones posteriores (SIN NORMA, CUMPLE/REVISADO,
+    NOM-050/NOM-015 ADHERIBLE) prevalecen igual que antes.
+    """
+    df_result = df_result.copy()
+    for col in ['TIPO DE PROCESO', 'NORMA', 'CRITERIO']:
+        df_result[col] = df_result[col].astype(object)
+
+    # 1. TIPO DE PROCESO según la norma (la primera regla que coincide gana)
+    norma_txt = df_result['NORMA'].map(str)
+    tipo_txt = df_result['TIPO DE PROCESO'].map(str)
+    df_result['TIPO DE PROCESO'] = _clasificar_pares(tipo_txt, norma_txt)
+
+    # 2. NORMA: '0' -> SIN NORMA, 'N/D' -> ''
+    df_result.loc[(norma_txt == '0').to_numpy(), 'NORMA'] = 'SIN NORMA'
+    df_result.loc[(norma_txt == 'N/D').to_numpy(), 'NORMA'] = ''
+
+    # 3. CRITERIO: todo lo que contenga 'C' (salvo NO CUMPLE) se vuelve CUMPLE
+    crit_txt = df_result['CRITERIO'].map(str).str.strip().str.upper()
+    es_cumple = crit_txt.str.contains('C', regex=False) & ~crit_txt.str.contains('NO CUMPLE', regex=False)
+    df_result.loc[es_cumple.to_numpy(), 'CRITERIO'] = 'CUMPLE'
+
+    # 4. REGLAS ADICIONALES (todas se evalúan sobre los valores previos a esta etapa)
+    tipo = _texto_limpio(df_result['TIPO DE PROCESO'])
+    norma_val = _texto_limpio(df_result['NORMA'])
+    criterio_val = _texto_limpio(df_result['CRITERIO']).str.upper()
+
+    norma_invalida = ~norma_val.isin(NORMAS_VALIDAS).to_numpy()
+    norma_vacia = norma_invalida & norma_val.isin(['', '0']).to_numpy()
+    tipo_vacio = ((tipo == '') | ((tipo == '0') & (norma_val == '0'))).to_numpy()
+    cumple = criterio_val.str.contains('CUMPLE', regex=False).to_numpy()
+    revisado = ~cumple & ~criterio_val.isin(['', 'N/D']).to_numpy()
+    especial = norma_val.isin(NORMAS_ESPECIALES_ADHERIBLE).to_numpy() & ~cumple
+
+    df_result.loc[norma_invalida | tipo_vacio, 'TIPO DE PROCESO'] = 'SIN NORMA'
+    df_result.loc[norma_vacia | tipo_vacio, 'NORMA'] = 'SIN NORMA'
+    df_result.loc[cumple, 'TIPO DE PROCESO'] = 'CUMPLE'
+    df_result.loc[cumple, 'CRITERIO'] = ''
+    df_result.loc[revisado, 'CRITERIO'] = 'REVISADO'
+    df_result.loc[especial, 'TIPO DE PROCESO'] = 'ADHERIBLE'
+
+    return df_result
+
+
+# --- Generación del archivo TIPO DE PROCESO ---
+def primeras_ocurrencias(df_reporte):
+    """ITEM -> NORMA, DESCRIPCION, CRITERIO del reporte (primera fila de cada ITEM, en orden de aparición)."""
+    with Traza.etapa("primeras_ocurrencias") as etapa:
+        columnas = detectar_columnas(df_reporte.columns)
+        primeras = extraer_primeras_ocurrencias(
+            df_reporte, columnas['num_parte'], columnas['norma'], columnas['descripcion'], columnas['criterio']
+        )
+        etapa.filas = len(primeras)
+    return primeras
+
+
+def clasificar(primeras, referencias, avance=_sin_avance):
+    """
+    Genera el DataFrame TIPO DE PROCESO a partir de la tabla de primeras apariciones
+    (de un reporte o de varios ya consolidados) y las referencias indexadas.
+    El resultado tiene el esquema tipado (ver Esquema): ITEM int64, TIPO DE PROCESO, NORMA y
+    CRITERIO como category y DESCRIPCION como string.
+    avance: recibe la fracción hecha (0 a 1) entre los cruces y las reglas.
+    """
+    with Traza.etapa("cruces", len(primeras)):
+        # --- 1. ITEM ---
+        items = primeras.index.to_numpy()
+
+        # --- 2. TIPO DE PROCESO ---
+        tipo_proceso = resolver_items(items, referencias.indice_catalogo)
+
+        # --- 5. CRITERIO ---
+        criterio = resolver_items(items, referencias.indice_criterio)
+
+        # Crear DataFrame final (3. NORMA y 4. DESCRIPCION de la primera aparición de cada ITEM)
+        df_result = pd.DataFrame({
+            'ITEM': items,
+            'TIPO DE PROCESO': tipo_proceso,
+            'NORMA': primeras['NORMA'].to_numpy(dtype=object),
+            'CRITERIO': criterio,
+            'DESCRIPCION': primeras['DESCRIPCION'].to_numpy(dtype=object),
+        })
+
+    # Los cruces son casi inmediatos; las reglas, el resto del tiempo
+    avance(0.1)
+
+    # REGLAS PARA MODIFICAR TIPO DE PROCESO, NORMA Y CRITERIO
+    with Traza.etapa("reglas", len(df_result)):
+        return Esquema.aplicar(aplicar_reglas(df_result))
+
+
+# --- Caché de clasificación por ITEM (clasificacion_clases y MAPA_CACHE de BaseDatos) ---
+# Subir este número cuando cambien las reglas: invalida toda la caché
+VERSION_REGLAS = "1"
+
+# Con menos ITEMS clasificados la medición por ITEM es poco confiable y se usa la última guardada
+MINIMO_MEDICION = 1000
+
+# Con menos ITEMS clasificar todo cuesta menos que abrir la caché (unos milisegundos): no se usa
+MINIMO_CACHE = 3000
+
+# La caché es opcional: se activa con esta variable de entorno (en ProcesosCLI.py, --cache)
+VARIABLE_CACHE = "TIPOS_CACHE"
+
+
+def cache_activada():
+    """True si la variable de entorno TIPOS_CACHE pide usar la caché de clasificación."""
+    return os.environ.get(VARIABLE_CACHE, "").strip().lower() not in ("", "0", "no")
+
+
+def _llave_texto(valores):
+    """Valores como texto comparable; los nulos quedan como el carácter nulo (distinto de cualquier texto)."""
+    serie = pd.Series(valores, dtype=object)
+    return serie.map(str).where(serie.notna(), '\0').to_numpy(dtype=object)
+
+
+def _versiones_actuales(referencias):
+    return {
+        'reglas': VERSION_REGLAS,
+        'catalogo': str(referencias.version_catalogo),
+        'codigos': str(referencias.version_codigos),
+    }
+
+
+def _revalidar_cache(referencias, ruta=None):
+    """
+    Si el catálogo o codigos_cumple cambiaron desde que se etiquetó la caché, borra solo los ITEMS
+    cuyo valor de referencia es distinto al guardado; si cambiaron las reglas se borra toda.
+    Devuelve el número de ITEMS invalidados.
+    """
+    actuales = _versiones_actuales(referencias)
+    guardadas = versiones_cache(ruta)
+    if guardadas == actuales:
+        return 0
+    if guardadas['reglas'] != actuales['reglas']:
+        return depurar_cache((), actuales, todo=True, ruta=ruta)
+
+    llaves = llaves_cache(ruta)
+    cambiados = np.zeros(len(llaves), dtype=bool)
+    if guardadas['catalogo'] != actuales['catalogo']:
+        valores = resolver_items(llaves['ITEM'], referencias.indice_catalogo)
+        cambiados |= _llave_texto(valores) != _llave_texto(llaves['CATALOGO'])
+    if guardadas['codigos'] != actuales['codigos']:
+        valores = resolver_items(llaves['ITEM'], referencias.indice_criterio)
+        cambiados |= _llave_texto(valores) != _llave_texto(llaves['CRITERIO CODIGOS'])
+    return depurar_cache(llaves['ITEM'][cambiados], actuales, ruta=ruta)
+
+
+def clasificar_con_cache(primeras, referencias, ruta=None, avance=_sin_avance):
+    """
+    Igual que clasificar, pero los ITEMS ya clasificados con la misma NORMA y las mismas
+    referencias se toman de la caché (sin cruces ni reglas) y solo se clasifican los demás.
+    Devuelve (df_result, estadísticas); sin versiones en las referencias o con menos de MINIMO_CACHE
+    ITEMS no se usa la caché y las estadísticas son None.
+    avance: como en clasificar.
+    """
+    if (referencias.version_catalogo is None or referencias.version_codigos is None
+            or len(primeras) < MINIMO_CACHE):
+        return clasificar(primeras, referencias, avance), None
+    inicio = time.perf_counter()
+    _revalidar_cache(referencias, ruta)
+
+    items = primeras.index
+    norma = primeras['NORMA'].to_numpy(dtype=object)
+    # Solo se guardan NORMAS de texto o vacías: otro tipo (p. ej. 15 numérico) puede dar otro resultado
+    guardable = np.fromiter((isinstance(v, str) or (isinstance(v, float) and np.isnan(v)) for v in norma),
+                            dtype=bool, count=len(norma))
+    normas_guardables = [None if not isinstance(v, str) else v for v in norma[guardable]]
+    with Traza.etapa("lectura_cache") as etapa:
+        guardadas = leer_cache(items[guardable], normas_guardables, ruta)
+        etapa.filas = len(guardadas)
+    posiciones = items.get_indexer(guardadas['ITEM'])
+    acierto = np.zeros(len(items), dtype=bool)
+    acierto[posiciones] = True
+    fallo = ~acierto
+
+    avance(0.1)
+
+    inicio_fallos = time.perf_counter()
+    df_fallos = clasificar(primeras[fallo], referencias, _tramo(avance, 0.1, 0.9))
+    segundos_fallos = time.perf_counter() - inicio_fallos
+    avance(0.9)
+
+    nuevos = fallo & guardable
+    if nuevos.any():
+        en_fallos = guardable[fallo]
+        items_nuevos = items[nuevos]
+        with Traza.etapa("escritura_cache", int(nuevos.sum())):
+            guardar_cache(pd.DataFrame({
+                'ITEM': items_nuevos,
+                'NORMA ENTRADA': norma[nuevos],
+                'CATALOGO': resolver_items(items_nuevos, referencias.indice_catalogo),
+                'CRITERIO CODIGOS': resolver_items(items_nuevos, referencias.indice_criterio),
+                'TIPO DE PROCESO': df_fallos['TIPO DE PROCESO'].to_numpy(dtype=object)[en_fallos],
+                'NORMA': df_fallos['NORMA'].to_numpy(dtype=object)[en_fallos],
+                'CRITERIO': df_fallos['CRITERIO'].to_numpy(dtype=object)[en_fallos],
+            }), ruta)
+
+    # Resultado en el orden original: aciertos desde la caché, fallos recién clasificados
+    columnas = {}
+    for col in ['TIPO DE PROCESO', 'NORMA', 'CRITERIO']:
+        valores = np.empty(len(items), dtype=object)
+        valores[posiciones] = guardadas[col].to_numpy(dtype=object)
+        valores[fallo] = df_fallos[col].to_numpy(dtype=object)
+        columnas[col] = valores
+    df_result = Esquema.aplicar(pd.DataFrame({
+        'ITEM': items.to_numpy(),
+        'TIPO DE PROCESO': columnas['TIPO DE PROCESO'],
+        'NORMA': columnas['NORMA'],
+        'CRITERIO': columnas['CRITERIO'],
+        'DESCRIPCION': primeras['DESCRIPCION'].to_numpy(dtype=object),
+    }))
+
+    # Tiempo ahorrado: lo que costaría clasificar todos los ITEMS (costo por ITEM medido en esta
+    # u otra corrida) menos lo que tomó realmente, incluidas la lectura y escritura de la caché.
+    # Queda en None mientras no haya una medición confiable.
+    aciertos = int(acierto.sum())
+    if fallo.sum() >= MINIMO_MEDICION:
+        por_item = segundos_fallos / fallo.sum()
+        guardar_meta('cache_segundos_item', por_item, ruta)
+    else:
+        por_item = leer_meta('cache_segundos_item', ruta)
+    segundos = time.perf_counter() - inicio
+    ahorrados = None
+    if por_item is not None:
+        ahorrados = len(items) * float(por_item) - segundos if aciertos else 0.0
+    estadisticas = {
+        'items': len(items),
+        'aciertos': aciertos,
+        'porcentaje': 100 * aciertos / len(items) if len(items) else 0.0,
+        'segundos': segundos,
+        'segundos_ahorrados': ahorrados,
+    }
+    return df_result, estadisticas
+
+
+def resumen_cache(estadisticas):
+    """Texto de una línea con el uso de la caché en la corrida ('' si no se usó)."""
+    if not estadisticas:
+        return ""
+    texto = (f"Caché: {estadisticas['aciertos']} de {estadisticas['items']} ITEMS "
+             f"({estadisticas['porcentaje']:.1f}%)")
+    # La estimación es nula o negativa cuando la caché costó más de lo que ahorró (fría o corrida chica)
+    ahorrados = estadisticas['segundos_ahorrados']
+    if ahorrados is not None and round(ahorrados, 2) > 0:
+        texto += f", ~{ahorrados:.2f} s ahorrados"
+    return texto
+
+
+def _avance(progreso, cancelado):
+    def avanzar(valor, texto=None):
+        if cancelado is not None and cancelado.is_set():
+            raise ProcesoCancelado()
+        if progreso and texto:
+            progreso(valor, texto)
+        elif progreso:
+            progreso(valor)
+    return avanzar
+
+
+def _clasificar(primeras, referencias, usar_cache, avance=_sin_avance):
+    """clasificar con o sin caché; el uso de la caché queda en df_result.attrs['cache']."""
+    with Traza.etapa("clasificacion", len(primeras)):
+        if usar_cache:
+            df_result, estadisticas = clasificar_con_cache(primeras, referencias, avance=avance)
+        else:
+            df_result, estadisticas = clasificar(primeras, referencias, avance), None
+    df_result.attrs['cache'] = estadisticas
+    return df_result
+
+
+def generar_tipo_proceso(df_reporte, referencias, progreso=None, cancelado=None, usar_cache=False):
+    """
+    Genera el DataFrame TIPO DE PROCESO de un reporte de mercancía.
+    progreso: función opcional que recibe el avance de 0 a 100.
+    cancelado: threading.Event opcional; si se activa se lanza ProcesoCancelado.
+    usar_cache: tomar de la caché de clasificación los ITEMS ya clasificados (opcional: ver cache_activada).
+    """
+    avanzar = _avance(progreso, cancelado)
+    avanzar(0)
+    df_result = _generar(df_reporte, referencias, usar_cache, _tramo(avanzar, 0, 100))
+    avanzar(100)
+    return df_result
+
+
+def _generar(df_reporte, referencias, usar_cache, avance):
+    primeras = primeras_ocurrencias(df_reporte)
+    avance(0.1, "Clasificando...")
+    return _clasificar(primeras, referencias, usar_cache, _tramo(avance, 0.1, 1.0))
+
+
+def generar_tipo_proceso_reporte(reporte_path, referencias, progreso=None, cancelado=None, usar_cache=False):
+    """
+    Lee un reporte y genera su TIPO DE PROCESO, con el avance de las dos etapas: la lectura
+    (de 0 a 60, por bloques de filas) y la clasificación (de 60 a 100). cancelado se revisa en
+    cada aviso de avance. Los demás parámetros, como en generar_tipo_proceso.
+    """
+    avanzar = _avance(progreso, cancelado)
+    avanzar(0, "Leyendo reporte...")
+    df_reporte = leer_reporte(reporte_path, avance=_tramo(avanzar, 0, 60))
+    df_result = _generar(df_reporte, referencias, usar_cache, _tramo(avanzar, 60, 100))
+    avanzar(100)
+    return df_result
+
+
+# --- Varios reportes en un solo TIPO DE PROCESO ---
+def leer_primeras_ocurrencias(reporte_path):
+    """Lee un reporte (solo sus columnas necesarias) y devuelve su tabla de primeras apariciones."""
+    return primeras_ocurrencias(leer_reporte(reporte_path))
+
+
+def consolidar(tablas):
+    """
+    Une las tablas de primeras apariciones de varios reportes.
+    Si un ITEM aparece en varios reportes se queda el del primero (en el orden recibido).
+    """
+    tablas = list(tablas)
+    if not tablas:
+        return extraer_primeras_ocurrencias(pd.DataFrame({'ITEM': []}), 'ITEM')
+    unida = pd.concat(tablas)
+    return unida[~unida.index.duplicated(keep='first')]
+
+
+def generar_tipo_proceso_consolidado(rutas, referencias, procesos=None, progreso=None, cancelado=None,
+                                     usar_cache=False):
+    """
+    Genera un solo TIPO DE PROCESO para varios reportes.
+    Los reportes se leen en paralelo (procesos: número de procesos, por defecto uno por núcleo);
+    la clasificación se hace una sola vez sobre los ITEMS ya consolidados.
+    """
+    avanzar = _avance(progreso, cancelado)
+    rutas = list(rutas)
+    procesos = min(procesos or os.cpu_count() or 1, len(rutas)) or 1
+    avanzar(0)
+
+    tablas = [None] * len(rutas)
+    with Traza.etapa("lectura_reportes") as etapa:
+        if procesos == 1:
+            for i, ruta in enumerate(rutas):
+                try:
+                    tablas[i] = leer_primeras_ocurrencias(ruta)
+                except Exception as e:
+                    raise ValueError(f"{os.path.basename(ruta)}: {e}") from e
+                avanzar(70 * (i + 1) / len(rutas), f"Leídos {i + 1} de {len(rutas)} reportes...")
+        else:
+            with ProcessPoolExecutor(max_workers=procesos) as pool:
+                futuros = {pool.submit(leer_primeras_ocurrencias, ruta): i for i, ruta in enumerate(rutas)}
+                try:
+                    for terminados, futuro in enumerate(as_completed(futuros), 1):
+                        i = futuros[futuro]
+                        try:
+                            tablas[i] = futuro.result()
+                        except Exception as e:
+                            raise ValueError(f"{os.path.basename(rutas[i])}: {e}") from e
+                        avanzar(70 * terminados / len(rutas), f"Leídos {terminados} de {len(rutas)} reportes...")
+                except BaseException:
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    raise
+        etapa.filas = sum(len(tabla) for tabla in tablas)
+
+    with Traza.etapa("consolidar") as etapa:
+        primeras = consolidar(tablas)
+        etapa.filas = len(primeras)
+    avanzar(75, "Clasificando...")
+    df_result = _clasificar(primeras, referencias, usar_cache, _tramo(avanzar, 75, 100))
+    avanzar(100)
+    return df_result
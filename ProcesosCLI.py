@@ -0,0 +1,219 @@
+"""
+Generación del archivo TIPO DE PROCESO por línea de comandos (sin tkinter).
+
+Ejemplos:
+    python ProcesosCLI.py reportes/ -o salida/
+    python ProcesosCLI.py "REPORTE 1.xlsx" "REPORTE 2.xlsx" -o salida/ --procesos 4
+    python ProcesosCLI.py reportes/ -o salida/ --consolidar
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import Almacen
+import Traza
+from Formato import exportar_excel
+from BaseDatos import POLITICAS, CONSERVAR_PRIMERO, exportar_historial_excel, registrar_historial
+from Procesamiento import (VARIABLE_CACHE, cache_activada, cargar_referencias, generar_tipo_proceso,
+                           generar_tipo_proceso_consolidado, leer_reporte, resumen_cache)
+
+EXTENSIONES = (".xlsx", ".xls")
+NOMBRE_CONSOLIDADO = "TIPO DE PROCESO - CONSOLIDADO.xlsx"
+
+# Referencias cargadas una sola vez por proceso
+_referencias = None
+
+
+def _inicializar_trabajador():
+    global _referencias
+    _referencias = cargar_referencias()
+
+
+def listar_reportes(entradas):
+    """Expande archivos y carpetas en la lista ordenada de reportes de Excel (sin repetir un mismo archivo)."""
+    reportes = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            for nombre in sorted(os.listdir(entrada)):
+                # Se ignoran los archivos temporales que deja Excel abiertos (~$...)
+                if nombre.lower().endswith(EXTENSIONES) and not nombre.startswith("~$"):
+                    reportes.append(os.path.join(entrada, nombre))
+        elif os.path.isfile(entrada):
+            reportes.append(entrada)
+        else:
+            raise FileNotFoundError(f"No se encontró el archivo o carpeta: {entrada}")
+    unicos, vistos = [], set()
+    for reporte in reportes:
+        clave = os.path.normcase(os.path.abspath(reporte))
+        if clave not in vistos:
+            vistos.add(clave)
+            unicos.append(reporte)
+    return unicos
+
+
+def ruta_salida(reporte_path, carpeta_salida):
+    nombre = os.path.splitext(os.path.basename(reporte_path))[0]
+    return os.path.join(carpeta_salida, f"TIPO DE PROCESO - {nombre}.xlsx")
+
+
+def rutas_salida(reportes, carpeta_salida):
+    """
+    Archivo de salida de cada reporte. Dos reportes con el mismo nombre en carpetas distintas no se
+    sobrescriben: desde el segundo se agrega ' (2)', ' (3)', ... (sin distinguir mayúsculas, como Windows).
+    """
+    rutas = {}
+    usadas = set()
+    for reporte in reportes:
+        salida = ruta_salida(reporte, carpeta_salida)
+        base, extension = os.path.splitext(salida)
+        numero = 1
+        while salida.lower() in usadas:
+            numero += 1
+            salida = f"{base} ({numero}){extension}"
+        usadas.add(salida.lower())
+        rutas[reporte] = salida
+    return rutas
+
+
+def procesar_archivo(reporte_path, salida, usar_cache=False):
+    """Genera el TIPO DE PROCESO de un reporte y lo guarda en salida con el formato de Formato.exportar_excel."""
+    inicio = time.perf_counter()
+    traza = Traza.iniciar("procesar_reporte", reporte=reporte_path)
+    with Traza.usar(traza):
+        try:
+            df_reporte = leer_reporte(reporte_path)
+            df_result = generar_tipo_proceso(df_reporte, _referencias, usar_cache=usar_cache)
+            exportar_excel(df_result, salida)
+        except Exception as e:
+            Traza.terminar(traza, e)
+            raise
+    df_result.attrs['traza'] = Traza.terminar(traza)
+    return df_result, salida, time.perf_counter() - inicio
+
+
+def procesar_consolidado(reportes, carpeta_salida, procesos, usar_cache=False):
+    """Un solo TIPO DE PROCESO para todos los reportes (ITEMS repetidos: gana el primer reporte)."""
+    inicio = time.perf_counter()
+    traza = Traza.iniciar("procesar_reportes", reportes=len(reportes))
+    with Traza.usar(traza):
+        try:
+            df_result = generar_tipo_proceso_consolidado(reportes, cargar_referencias(), procesos=procesos,
+                                                         usar_cache=usar_cache)
+            salida = os.path.join(carpeta_salida, NOMBRE_CONSOLIDADO)
+            exportar_excel(df_result, salida)
+        except Exception as e:
+            Traza.terminar(traza, e)
+            raise
+    df_result.attrs['traza'] = Traza.terminar(traza)
+    return df_result, salida, time.perf_counter() - inicio
+
+
+def _linea_resultado(origen, df_result, salida, segundos, detalle=""):
+    linea = f"{origen} → {salida} ({detalle}{segundos:.2f} s)"
+    cache = resumen_cache(df_result.attrs.get('cache'))
+    if cache:
+        linea = f"{linea} — {cache}"
+    if df_result.attrs.get('traza'):
+        linea = f"{linea}\n    {df_result.attrs['traza']}"
+    return linea
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera archivos TIPO DE PROCESO sin interfaz gráfica.")
+    parser.add_argument("entradas", nargs="+", help="Reportes de mercancía o carpetas que los contienen")
+    parser.add_argument("-o", "--salida", required=True, help="Carpeta donde se guardan los archivos generados")
+    parser.add_argument("-p", "--procesos", type=int, default=1,
+                        help="Número de procesos en paralelo (por defecto 1)")
+    parser.add_argument("--consolidar", action="store_true",
+                        help=f"Generar un solo archivo ({NOMBRE_CONSOLIDADO}) con los ITEMS de todos los reportes")
+    parser.add_argument("--historial", choices=POLITICAS, default=CONSERVAR_PRIMERO,
+                        help="ITEMS que ya están en el HISTORIAL: conservar el registro existente "
+                             "o reemplazarlo con el más reciente (por defecto: conservar)")
+    parser.add_argument("--sin-historial", action="store_true", help="No actualizar el HISTORIAL")
+    parser.add_argument("--traza", nargs="?", const="tiempos", choices=("tiempos", "memoria"),
+                        help=f"Guardar una traza JSON por corrida en {Traza.carpeta_trazas()} "
+                             "(tiempos y filas por etapa; 'memoria' agrega la memoria máxima)")
+    parser.add_argument("--cache", action="store_true",
+                        help="Usar la caché de clasificación: los ITEMS ya clasificados no se vuelven a "
+                             f"clasificar (también con la variable de entorno {VARIABLE_CACHE})")
+    parser.add_argument("--exportar-historial", metavar="RUTA_XLSX",
+                        help="Al terminar, exportar el HISTORIAL completo a este Excel")
+    args = parser.parse_args(argv)
+    Almacen.preparar_carpeta_datos()
+    usar_cache = args.cache or cache_activada()
+    if args.traza:
+        # Antes de crear los procesos: la heredan por la variable de entorno
+        Traza.activar(memoria=args.traza == "memoria")
+
+    reportes = listar_reportes(args.entradas)
+    if not reportes:
+        print("No se encontraron reportes para procesar.")
+        return 1
+    os.makedirs(args.salida, exist_ok=True)
+
+    resultados = {}
+    errores = 0
+    if args.consolidar:
+        try:
+            df_result, salida, segundos = procesar_consolidado(reportes, args.salida, args.procesos,
+                                                               usar_cache)
+        except Exception as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            return 1
+        print(_linea_resultado(f"{len(reportes)} reportes", df_result, salida, segundos,
+                               f"{len(df_result)} ITEMS, "))
+        resultados[salida] = (df_result, salida, segundos)
+    elif args.procesos > 1:
+        # Las tablas se convierten una sola vez aquí (carpeta de datos nueva o fuentes más recientes);
+        # los procesos solo abren las tablas ya terminadas en lugar de escribirlas todos a la vez
+        _inicializar_trabajador()
+        salidas = rutas_salida(reportes, args.salida)
+        with ProcessPoolExecutor(max_workers=args.procesos, initializer=_inicializar_trabajador) as pool:
+            futuros = {reporte: pool.submit(procesar_archivo, reporte, salidas[reporte], usar_cache)
+                       for reporte in reportes}
+            for reporte, futuro in futuros.items():
+                try:
+                    resultados[reporte] = futuro.result()
+                except Exception as e:
+                    errores += 1
+                    print(f"ERROR {reporte}: {e}", file=sys.stderr)
+                else:
+                    print(_linea_resultado(reporte, *resultados[reporte]))
+    else:
+        _inicializar_trabajador()
+        salidas = rutas_salida(reportes, args.salida)
+        for reporte in reportes:
+            try:
+                resultados[reporte] = procesar_archivo(reporte, salidas[reporte], usar_cache)
+            except Exception as e:
+                errores += 1
+                print(f"ERROR {reporte}: {e}", file=sys.stderr)
+            else:
+                print(_linea_resultado(reporte, *resultados[reporte]))
+
+    # El HISTORIAL se actualiza una sola vez y en el orden de entrada (resultados se llena en ese orden),
+    # equivalente a haber guardado los reportes uno por uno
+    if resultados and not args.sin_historial:
+        df_nuevos = pd.concat([df for df, _, _ in resultados.values()])
+        traza = Traza.iniciar("actualizar_historial", filas=len(df_nuevos))
+        with Traza.usar(traza):
+            escritas = registrar_historial(df_nuevos, args.historial)
+        resumen = Traza.terminar(traza)
+        print(f"HISTORIAL actualizado: {escritas} filas escritas" + (f"\n    {resumen}" if resumen else ""))
+
+    if args.exportar_historial:
+        total = exportar_historial_excel(args.exportar_historial)
+        print(f"HISTORIAL exportado ({total} filas): {args.exportar_historial}")
+
+    print(f"Procesados: {len(resultados)}, con error: {errores}")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
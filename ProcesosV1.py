@@ -7,6 +7,8 @@ from PIL import Image, ImageTk
 import sys
 import json
 from Formato import exportar_excel
+from Procesamiento import detectar_columnas
+import Almacen
 import re
 
 
@@ -48,16 +50,10 @@ def procesar_reporte(reporte_path):
             def cargar_json(nombre_json):
                 """
                 Carga un archivo JSON como DataFrame de pandas.
-                Funciona tanto en Python normal como en .exe creado con PyInstaller.
+                Funciona tanto en Python normal como en .exe creado con PyInstaller
+                (en el .exe se lee de la carpeta de datos del usuario, ver Almacen.carpeta_datos).
                 """
-                if getattr(sys, "frozen", False):
-                    # Cuando se ejecuta como .exe
-                    base_path = sys._MEIPASS
-                else:
-                    # Cuando se ejecuta como script normal
-                    base_path = os.path.dirname(__file__)
-                
-                ruta = os.path.join(base_path, "resources", nombre_json)
+                ruta = os.path.join(Almacen.RUTA_RECURSOS, nombre_json)
                 
                 if not os.path.exists(ruta):
                     raise FileNotFoundError(f"No se encontró el archivo JSON: {ruta}")
@@ -74,28 +70,12 @@ def procesar_reporte(reporte_path):
             df_reporte = pd.read_excel(reporte_path)  # El reporte sigue siendo cargado por el usuario
 
 #=========================================================================================================================0
-            # --- Detectar tipo de reporte y columnas ---
-            # Primero revisamos si es FH
-            if 'Número de Parte' in df_reporte.columns:
-                # Reporte FH
-                num_parte_col = 'Número de Parte'
-                desc_col = 'Desc. Pedimento'
-                norma_col = 'Normas'
-                criterio_col = 'CRITERIO'   # FH usa CRITERIO
-            elif any(col.strip().lower() in ['num. parte', 'num.parte', 'numero de parte','num.parte'] for col in df_reporte.columns):
-                # Reporte MIMPO
-                for col in df_reporte.columns:
-                    if col.strip().lower() in ['num. parte', 'num.parte', 'numero de parte','num.parte']:
-                        num_parte_col = col
-                        break
-                for col in df_reporte.columns:
-                    if col.strip().lower() == 'descripción agente aduanal':
-                        desc_col = col
-                        break
-                norma_col = 'NOMs'
-                criterio_col = 'CRITERIO'   # 👈 ajusta aquí si en MIMPO se llama distinto (ej: "Criterio")
-            else:
-                raise ValueError("No se encontró ninguna columna de NUM. PARTE válida en el reporte")
+            # --- Detectar tipo de reporte y columnas (formatos en resources/formatos_reporte.json) ---
+            columnas = detectar_columnas(df_reporte.columns)
+            num_parte_col = columnas['num_parte']
+            desc_col = columnas['descripcion']
+            norma_col = columnas['norma']
+            criterio_col = columnas['criterio']
 
             # --- 1. Columna ITEM ---
             items = pd.to_numeric(df_reporte[num_parte_col], errors='coerce').dropna().astype(int).unique()
@@ -318,6 +298,9 @@ root.geometry("650x480")
 root.configure(bg="#FFFFFF")
 
 if __name__ == "__main__":
+    # Copia a la carpeta de datos los JSON y el registro de formatos del paquete (primera vez o versión nueva)
+    Almacen.preparar_carpeta_datos()
+
     frame = tk.Frame(root, bg="#FFFFFF")
     frame.pack(expand=True, fill="both")
 
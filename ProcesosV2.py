@@ -1,15 +1,21 @@
 import os
-import pandas as pd
-from pathlib import Path
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-from PIL import Image, ImageTk
 import sys
-import json
-from Formato import exportar_excel
-import re
+from TablaVirtual import TablaVirtual
+import Traza
+import multiprocessing
+import queue
+import threading
 import time
 
+# Momento en que arrancó la aplicación (para medir el arranque con TIPOS_MEDIR_ARRANQUE)
+INICIO = time.time()
+
+# pandas, PIL y los módulos del motor (Procesamiento, BaseDatos, Almacen, Formato) se importan
+# dentro de las funciones que los usan: importar este módulo no hace trabajo pesado y la ventana
+# aparece de inmediato; el calentamiento (ver calentar) los carga en segundo plano.
+
 if getattr(sys, 'frozen', False):
     # Cuando está compilado en .exe
     BASE_PATH = sys._MEIPASS
@@ -19,76 +25,57 @@ else:
 
 # Archivos fijos
 BASE_GENERAL = os.path.join(BASE_PATH, "archivos","BASE DECATHLON GENERAL ADVANCE II.xlsx")
-INSPECCION = os.path.join(BASE_PATH, "archivos","codigos_cumple.xlsx")
-HISTORIAL = os.path.join(BASE_PATH, "archivos","HISTORIAL_PROCESOS.xlsx")
 
 # Rutas de archivos
 BASE_PATH = os.path.dirname(os.path.abspath(__file__))
-INSPECCION = os.path.join(BASE_PATH, "archivos","codigos_cumple.xlsx")
-
-import tkinter as tk
-import pandas as pd
 
 # 🔹 Función para abrir ventana y actualizar/eliminar 
-# Ruta fija
-ARCHIVO_CODIGOS = "archivos/codigos_cumple.xlsx"
-ARCHIVO_JSON = "archivos/codigos_cumple.json"
-
-# Cargar o crear archivo base
-if os.path.exists(ARCHIVO_CODIGOS):
-    df_codigos_cumple = pd.read_excel(ARCHIVO_CODIGOS)
-else:
-    df_codigos_cumple = pd.DataFrame(columns=["ITEM", "OBSERVACIONES"])
-
-
+# codigos_cumple vive en la base de datos (BaseDatos); Excel y JSON solo se importan/exportan
 def abrir_editor_codigos(parent=None):
-    global df_codigos_cumple
-    
+    import pandas as pd
+    from BaseDatos import (
+        FuenteCodigos, obtener_codigo, guardar_codigo, subir_codigos, actualizar_copias_codigos,
+        eliminar_codigo, COLUMNAS_CODIGOS, CONSERVAR_PRIMERO, ULTIMO_GANA
+    )
     ventana = tk.Toplevel(parent) if parent else tk.Toplevel()
     ventana.title("Editor de Códigos")
     ventana.geometry("800x500")
     ventana.grab_set()
 
-    # Tabla con los datos
-    tree = ttk.Treeview(ventana, columns=list(df_codigos_cumple.columns), show="headings", height=15)
-    for col in df_codigos_cumple.columns:
-        tree.heading(col, text=col)
-        tree.column(col, width=150)
-    tree.pack(fill="both", expand=True, pady=10)
-
-    # Llenar tabla
-    def cargar_tabla():
-        for row in tree.get_children():
-            tree.delete(row)
-        for _, fila in df_codigos_cumple.iterrows():
-            tree.insert("", "end", values=list(fila))
-    cargar_tabla()
+    # Tabla con buscador: solo se piden a la base las filas visibles
+    tabla = TablaVirtual(ventana, COLUMNAS_CODIGOS, alto=15)
+    tabla.pack(fill="both", expand=True, pady=10, padx=10)
+    fuente = FuenteCodigos()
+    tabla.cargar(fuente)
+
+    def cerrar():
+        fuente.cerrar()
+        ventana.destroy()
+    ventana.protocol("WM_DELETE_WINDOW", cerrar)
 
     # Editar item seleccionado
     def editar_item():
-        seleccion = tree.focus()
-        if not seleccion:
+        valores = tabla.fila_seleccionada()
+        if not valores:
             messagebox.showwarning("Atención", "Selecciona un ITEM para editar.")
             return
-        valores = tree.item(seleccion, "values")
         item_id = valores[0]
 
         actualizar_observacion_interactiva(item_id)
 
-        cargar_tabla()
+        # Se vuelven a pedir solo las filas visibles
+        tabla.refrescar()
 
     # Eliminar item
     def eliminar_item():
-        seleccion = tree.focus()
-        if not seleccion:
+        valores = tabla.fila_seleccionada()
+        if not valores:
             messagebox.showwarning("Atención", "Selecciona un ITEM para eliminar.")
             return
-        valores = tree.item(seleccion, "values")
         item_id = valores[0]
 
-        df_codigos_cumple.drop(df_codigos_cumple[df_codigos_cumple["ITEM"] == int(item_id)].index, inplace=True)
-        guardar_cambios()
-        cargar_tabla()
+        eliminar_codigo(item_id)
+        tabla.refrescar()
 
     # Agregar item nuevo
     def agregar_item():
@@ -120,20 +107,13 @@ def abrir_editor_codigos(parent=None):
             criterio_val = entry_criterio.get()  # 👈 Ahora sí lo leemos antes
 
             # Verificar duplicado
-            if item_val in df_codigos_cumple["ITEM"].values:
+            if obtener_codigo(item_val) is not None:
                 messagebox.showwarning("Duplicado", "Ese ITEM ya existe. Se actualizará la observación y criterio.")
-                df_codigos_cumple.loc[df_codigos_cumple["ITEM"] == item_val, "OBSERVACIONES"] = obs_val
-                df_codigos_cumple.loc[df_codigos_cumple["ITEM"] == item_val, "CRITERIO"] = criterio_val
-            else:
-                # Agregar nuevo registro
-                df_codigos_cumple.loc[len(df_codigos_cumple)] = {
-                    "ITEM": item_val,
-                    "OBSERVACIONES": obs_val,
-                    "CRITERIO": criterio_val
-                }
-
-            guardar_cambios()   # tu función para guardar el Excel
-            cargar_tabla()      # tu función para refrescar la tabla en la UI
+
+            # Agrega el registro o actualiza el existente
+            guardar_codigo(item_val, obs_val, criterio_val)
+            # Mostrarlo en la tabla (se vuelve a pedir solo la página donde quedó)
+            tabla.mostrar(item_val)
             ventana_add.destroy()
 
         tk.Button(ventana_add, text="Guardar", command=guardar_nuevo, bg="#ECD925").pack(pady=10)
@@ -149,33 +129,33 @@ def abrir_editor_codigos(parent=None):
         df_subido = pd.read_excel(file_path)
 
         # Verificamos que existan las columnas necesarias
-        columnas_necesarias = ["ITEM", "OBSERVACIONES", "CRITERIO"]
-        for col in columnas_necesarias:
+        for col in COLUMNAS_CODIGOS:
             if col not in df_subido.columns:
                 messagebox.showerror("Error", f"Falta la columna '{col}' en el archivo")
                 return
 
-        # Aseguramos que df_codigos_cumple tenga esas 3 columnas
-        global df_codigos_cumple
-        if df_codigos_cumple.empty:
-            df_codigos_cumple = pd.DataFrame(columns=columnas_necesarias)
-
-        # Concatenamos lo nuevo
-        df_codigos_cumple = pd.concat(
-            [df_codigos_cumple, df_subido[columnas_necesarias]],
-            ignore_index=True
+        # Política para los ITEMS que ya existen
+        sobrescribir = messagebox.askyesnocancel(
+            "ITEMS existentes",
+            "¿Sobrescribir OBSERVACIONES y CRITERIO de los ITEMS que ya existen?\n\n"
+            "Sí: sobrescribir con el archivo\nNo: conservar los existentes"
         )
+        if sobrescribir is None:
+            return
+        politica = ULTIMO_GANA if sobrescribir else CONSERVAR_PRIMERO
 
-        # Guardar cambios
-        df_codigos_cumple.to_excel("archivos/codigos_cumple.xlsx", index=False)
-
-        messagebox.showinfo("Éxito", "Archivo cargado y datos guardados correctamente")
-
+        conteo = subir_codigos(df_subido[COLUMNAS_CODIGOS], politica=politica)
+        # El Excel y el JSON se regeneran desde la base para que sigan iguales
+        actualizar_copias_codigos()
 
-    # Guardar Excel + JSON
-    def guardar_cambios():
-        df_codigos_cumple.to_excel(ARCHIVO_CODIGOS, index=False)
-        df_codigos_cumple.to_json(ARCHIVO_JSON, orient="records", force_ascii=False, indent=4)
+        # La tabla solo vuelve a pedir las filas visibles
+        tabla.refrescar()
+        messagebox.showinfo(
+            "Éxito",
+            f"Archivo cargado y datos guardados correctamente\n\n"
+            f"➕ Nuevos: {conteo['insertados']}\n✏️ Actualizados: {conteo['actualizados']}\n"
+            f"⏭️ Omitidos: {conteo['omitidos']}"
+        )
 
     # Botones
     frame_botones = tk.Frame(ventana)
@@ -190,8 +170,7 @@ def abrir_editor_codigos(parent=None):
 
 
 def actualizar_observacion_interactiva(item):
-    global df_codigos_cumple
-
+    from BaseDatos import actualizar_observacion, obtener_codigo
     ventana = tk.Toplevel()
     ventana.title(f"Actualizar OBSERVACIÓN - ITEM {item}")
     ventana.geometry("500x250")
@@ -203,10 +182,9 @@ def actualizar_observacion_interactiva(item):
         item_num = item
 
     obs_actual = ""
-    if "OBSERVACIONES" in df_codigos_cumple.columns:
-        fila = df_codigos_cumple[df_codigos_cumple["ITEM"] == item_num]
-        if not fila.empty:
-            obs_actual = str(fila.iloc[0]["OBSERVACIONES"])
+    fila = obtener_codigo(item_num)
+    if fila is not None and fila["OBSERVACIONES"] is not None:
+        obs_actual = str(fila["OBSERVACIONES"])
 
     tk.Label(ventana, text=f"ITEM: {item_num}", font=("Segoe UI", 12, "bold")).pack(pady=(10, 5))
     tk.Label(ventana, text="Observación actual:").pack()
@@ -216,9 +194,7 @@ def actualizar_observacion_interactiva(item):
 
     def guardar():
         nueva_obs = entrada.get()
-        df_codigos_cumple.loc[df_codigos_cumple["ITEM"] == item_num, "OBSERVACIONES"] = nueva_obs
-        df_codigos_cumple.to_excel(ARCHIVO_CODIGOS, index=False)
-        df_codigos_cumple.to_json(ARCHIVO_JSON, orient="records", force_ascii=False, indent=4)
+        actualizar_observacion(item_num, nueva_obs)
         ventana.destroy()
 
     tk.Button(ventana, text="Guardar", command=guardar, bg="#ECD925").pack(pady=10)
@@ -226,7 +202,67 @@ def actualizar_observacion_interactiva(item):
     ventana.wait_window()
 
 # --- Función para actualizar códigos ---
+# Los ITEMS nuevos se agregan; las OBSERVACIONES distintas se revisan todas juntas en una sola tabla
+ACEPTAR = "✔ SÍ"
+RECHAZAR = "✘ NO"
+
+def revisar_cambios(cambios, al_confirmar, al_cancelar=None):
+    """
+    Muestra en una sola tabla los ITEMS cuya OBSERVACIÓN cambió.
+    al_confirmar recibe el DataFrame (ITEM, OBSERVACIONES) de los cambios aceptados;
+    si se cierra la ventana o se cancela no se guarda nada y se llama al_cancelar.
+    """
+    import pandas as pd
+    ventana = tk.Toplevel()
+    ventana.title("Revisar cambios de OBSERVACIONES")
+    ventana.geometry("900x550")
+    ventana.grab_set()
+
+    tk.Label(
+        ventana, font=("Segoe UI", 10, "bold"),
+        text=f"{len(cambios)} ITEMS tienen una OBSERVACIÓN distinta. Doble clic para aceptar o rechazar."
+    ).pack(pady=(10, 0))
+
+    columnas = ["ITEM", "OBSERVACIÓN ACTUAL", "OBSERVACIÓN NUEVA", "ACEPTAR"]
+    tabla = TablaVirtual(ventana, columnas, alto=18, columna_texto=2)
+    tabla.pack(fill="both", expand=True, pady=10, padx=10)
+    df_revision = cambios.copy()
+    df_revision.columns = columnas[:3]
+    df_revision["ACEPTAR"] = ACEPTAR
+    tabla.cargar(df_revision)
+
+    def alternar(_evento=None):
+        fila = tabla.fila_seleccionada()
+        if fila:
+            tabla.actualizar_fila(fila[:3] + (RECHAZAR if fila[3] == ACEPTAR else ACEPTAR,))
+
+    def marcar_todos(marca):
+        tabla.aplicar_lote([fila[:3] + (marca,) for fila in tabla.filas()])
+
+    def aplicar():
+        aceptados = [(fila[0], fila[2]) for fila in tabla.filas() if fila[3] == ACEPTAR]
+        ventana.destroy()
+        al_confirmar(pd.DataFrame(aceptados, columns=["ITEM", "OBSERVACIONES"]))
+
+    def cancelar():
+        ventana.destroy()
+        if al_cancelar:
+            al_cancelar()
+
+    tabla.tree.bind("<Double-1>", alternar)
+    ventana.protocol("WM_DELETE_WINDOW", cancelar)
+
+    frame_botones = tk.Frame(ventana)
+    frame_botones.pack(pady=10)
+    tk.Button(frame_botones, text="✔ Aceptar todos", command=lambda: marcar_todos(ACEPTAR)).pack(side="left", padx=5)
+    tk.Button(frame_botones, text="✘ Rechazar todos", command=lambda: marcar_todos(RECHAZAR)).pack(side="left", padx=5)
+    tk.Button(frame_botones, text="Aceptar / Rechazar", command=alternar).pack(side="left", padx=5)
+    tk.Button(frame_botones, text="Aplicar cambios", command=aplicar, bg="#ECD925").pack(side="left", padx=5)
+    tk.Button(frame_botones, text="Cancelar", command=cancelar).pack(side="left", padx=5)
+
 def actualizar_codigos(frame_principal):
+    import pandas as pd
+    from BaseDatos import comparar_codigos, fusionar_codigos
     try:
         nuevo_file = filedialog.askopenfilename(
             title="Selecciona el archivo con nuevos códigos",
@@ -235,85 +271,95 @@ def actualizar_codigos(frame_principal):
         if not nuevo_file:
             return
 
-        df_base = pd.read_excel(INSPECCION) if os.path.exists(INSPECCION) else pd.DataFrame(columns=["ITEM","OBSERVACIONES","CRITERIO"])
-        df_nuevo = pd.read_excel(nuevo_file)
-
-        if "ITEM" not in df_nuevo.columns:
-            messagebox.showerror("Error", "El archivo nuevo no contiene la columna 'ITEM'")
-            return
-
-        df_nuevo = df_nuevo.drop_duplicates(subset=["ITEM"])
-        for col in ["OBSERVACIONES","CRITERIO"]:
-            if col not in df_nuevo.columns:
-                df_nuevo[col] = ""
-
-        items_existentes = set(df_base["ITEM"].astype(str))
-        nuevos_items = []
-
-        # Barra de progreso unificada
-        barra = BarraProgreso(frame_principal, "Actualizando items...")
-
-        for idx, row in df_nuevo.iterrows():
-            item = str(row["ITEM"])
-            obs_nueva = str(row.get("OBSERVACIONES",""))
-            criterio_nuevo = str(row.get("CRITERIO",""))
-
-            if item in items_existentes:
-                fila_base = df_base[df_base["ITEM"].astype(str) == item].iloc[0]
-                obs_actual = str(fila_base.get("OBSERVACIONES",""))
-                if obs_actual != obs_nueva:
-                    obs_final = actualizar_observacion_interactiva(item, obs_actual, obs_nueva)
-                    df_base.loc[df_base["ITEM"].astype(str) == item, "OBSERVACIONES"] = obs_final
+        traza = Traza.iniciar("actualizar_codigos", archivo=nuevo_file)
+
+        # Lectura y comparación en segundo plano (un solo cruce por ITEM)
+        def comparar(progreso, cancelado):
+            with Traza.etapa("lectura_archivo") as etapa:
+                df_nuevo = pd.read_excel(nuevo_file)
+                etapa.filas = len(df_nuevo)
+            if "ITEM" not in df_nuevo.columns:
+                raise ValueError("El archivo nuevo no contiene la columna 'ITEM'")
+            progreso(60)
+            return comparar_codigos(df_nuevo)
+
+        def guardar(diferencias, aceptados):
+            nuevos = diferencias["nuevos"]
+            ejecutar_en_segundo_plano(
+                frame_principal, "Actualizando items...",
+                trabajo_trazado(traza, lambda progreso, cancelado: fusionar_codigos(nuevos, aceptados)),
+                al_terminar=lambda resultado: messagebox.showinfo(
+                    "Actualizar ITEMS",
+                    con_resumen(
+                        f"✅ Se agregaron {resultado[0]} ITEMS nuevos y se actualizaron "
+                        f"{resultado[1]} OBSERVACIONES ({len(diferencias['cambios']) - resultado[1]} rechazadas, "
+                        f"{diferencias['sin_cambios']} sin cambios).\n📊 Total ahora: {resultado[2]}",
+                        Traza.terminar(traza)
+                    )
+                )
+            )
+
+        def revisar(diferencias):
+            if diferencias["nuevos"].empty and diferencias["cambios"].empty:
+                messagebox.showinfo("Actualizar ITEMS", con_resumen("No hay ITEMS nuevos ni OBSERVACIONES distintas.",
+                                                                    Traza.terminar(traza)))
+            elif diferencias["cambios"].empty:
+                guardar(diferencias, diferencias["cambios"])
             else:
-                nuevos_items.append({"ITEM": item, "OBSERVACIONES": obs_nueva, "CRITERIO": criterio_nuevo})
-
-            barra.actualizar((idx+1)/len(df_nuevo)*100)
-
-        if nuevos_items:
-            df_base = pd.concat([df_base, pd.DataFrame(nuevos_items)], ignore_index=True)
+                revisar_cambios(diferencias["cambios"], lambda aceptados: guardar(diferencias, aceptados),
+                                al_cancelar=lambda: Traza.terminar(traza, "Revisión cancelada: no se guardó nada"))
 
-        df_base.to_excel(INSPECCION, index=False)
-        barra.finalizar()
-
-        messagebox.showinfo(
-            "Actualizar ITEMS",
-            f"✅ Se actualizaron OBSERVACIONES y se agregaron {len(nuevos_items)} ITEMS nuevos.\n📊 Total ahora: {len(df_base)}"
-        )
+        ejecutar_en_segundo_plano(frame_principal, "Comparando códigos...", trabajo_trazado(traza, comparar),
+                                  al_terminar=revisar)
 
     except Exception as e:
         messagebox.showerror("Error", f"Ocurrió un problema al actualizar los códigos:\n{e}")
 
 # --- Función para exportar concentrado ---
 def exportar_concentrado_codigos(frame_principal):
+    from BaseDatos import exportar_codigos
     try:
-        if not os.path.exists(INSPECCION):
-            messagebox.showerror("Error", f"No se encontró el archivo {INSPECCION}")
+        ruta_guardado = filedialog.asksaveasfilename(
+            defaultextension=".xlsx",
+            filetypes=[("Archivos Excel", "*.xlsx *.xls"), ("Archivos JSON", "*.json")],
+            title="Guardar concentrado de codigos_cumple"
+        )
+        if not ruta_guardado:
             return
 
-        df_codigos = pd.read_excel(INSPECCION)
-        total_filas = len(df_codigos)
-
-        barra = BarraProgreso(frame_principal, "Generando concentrado...")
+        # La lectura y la escritura corren en un hilo; la barra solo marca que sigue trabajando
+        ejecutar_en_segundo_plano(
+            frame_principal, "Generando concentrado...",
+            lambda progreso, cancelado: exportar_codigos(ruta_guardado),
+            al_terminar=lambda total: messagebox.showinfo(
+                "Exportar Codigos", f"✅ Se exportó correctamente el concentrado ({total} ITEMS) a:\n{ruta_guardado}")
+        )
 
-        for i in range(total_filas):
-            barra.actualizar((i+1)/total_filas*100)
+    except Exception as e:
+        messagebox.showerror("Error", f"Ocurrió un problema al exportar el concentrado:\n{e}")
 
+# --- Función para exportar el HISTORIAL ---
+def exportar_historial(frame_principal):
+    from BaseDatos import exportar_historial_excel
+    try:
         ruta_guardado = filedialog.asksaveasfilename(
             defaultextension=".xlsx",
-            filetypes=[("Archivos Excel", "*.xlsx *.xls")],
-            title="Guardar concentrado de codigos_cumple"
+            filetypes=[("Archivos Excel", "*.xlsx")],
+            title="Guardar HISTORIAL de procesos",
+            initialfile="HISTORIAL_PROCESOS.xlsx"
         )
         if not ruta_guardado:
-            barra.finalizar()
             return
 
-        df_codigos.to_excel(ruta_guardado, index=False)
-        barra.finalizar()
-        messagebox.showinfo("Exportar Codigos", f"✅ Se exportó correctamente el concentrado a:\n{ruta_guardado}")
+        ejecutar_en_segundo_plano(
+            frame_principal, "Exportando historial...",
+            lambda progreso, cancelado: exportar_historial_excel(ruta_guardado),
+            al_terminar=lambda total: messagebox.showinfo(
+                "Exportar Historial", f"✅ Se exportaron {total} ITEMS a:\n{ruta_guardado}")
+        )
 
     except Exception as e:
-        barra.finalizar()
-        messagebox.showerror("Error", f"Ocurrió un problema al exportar el concentrado:\n{e}")
+        messagebox.showerror("Error", f"No se pudo exportar el historial:\n{e}")
 
 def crear_boton_exportar_concentrado(frame):
     """
@@ -329,269 +375,74 @@ def crear_boton_exportar_concentrado(frame):
     return btn_exportar
 
 # --- Función para generar el tipo de proceso ---
+def guardar_resultado(df_result, nombre_inicial="TIPO DE PROCESO.xlsx", traza=None):
+    """
+    Pide dónde guardar el TIPO DE PROCESO; el Excel y el HISTORIAL se escriben en segundo plano.
+    traza: la del proceso que generó el resultado; se cierra al terminar de guardar.
+    """
+    from BaseDatos import registrar_historial
+    from Formato import exportar_excel
+    from Procesamiento import resumen_cache
+    save_path = filedialog.asksaveasfilename(
+        defaultextension=".xlsx",
+        filetypes=[("Archivos Excel", "*.xlsx")],
+        title="Guardar archivo TIPO DE PROCESO",
+        initialfile=nombre_inicial
+    )
+    if not save_path:
+        Traza.terminar(traza, "No se guardó el archivo")
+        messagebox.showwarning("Cancelado", "No se guardó el archivo.")
+        return
+
+    def exportar(progreso, cancelado):
+        exportar_excel(df_result, save_path)
+        progreso(70)
+        registrar_historial(df_result)
+
+    # Uso de la caché de clasificación en esta corrida (aciertos y tiempo ahorrado)
+    cache = resumen_cache(df_result.attrs.get('cache'))
+    ejecutar_en_segundo_plano(
+        frame, "Guardando...", trabajo_trazado(traza, exportar),
+        al_terminar=lambda _: messagebox.showinfo(
+            "Éxito", con_resumen(con_resumen("GUARDADO EXITOSAMENTE", cache), Traza.terminar(traza))
+        )
+    )
+
 def procesar_reporte(reporte_path):
+    from Procesamiento import cache_activada, cargar_referencias, generar_tipo_proceso_reporte
     global frame
 
-    # SE CREA LA BARRA DE PROGRESO EN EL FRAME PRINCIPAL (LADO DERECHO)
-    try:
-        global progress_label, progress_var, progress_bar, percent_label
-        try:
-            progress_label.destroy()
-            progress_bar.destroy()
-            percent_label.destroy()
-        except Exception:
-            pass
-
-        # Etiqueta de texto
-        progress_label = tk.Label(frame, text="Procesando...", font=("Segoe UI", 9, "bold"), bg="#FFFFFF")
-        progress_label.place(relx=1.0, rely=1.0, x=-20, y=-80, anchor="se")  # Separación superior
-
-        # Barra de progreso
-        progress_var = tk.DoubleVar()
-        progress_bar = ttk.Progressbar(frame, variable=progress_var, maximum=100, length=220)  # Más pequeña
-        progress_bar.place(relx=1.0, rely=1.0, x=-20, y=-50, anchor="se")  # Debajo de la etiqueta
-
-        # Porcentaje
-        percent_label = tk.Label(frame, text="0%", font=("Segoe UI", 10, "bold"), bg="#FFFFFF")
-        percent_label.place(relx=1.0, rely=1.0, x=-20, y=-25, anchor="se")  # Debajo de la barra
-
-        frame.update()
-
-
-        # LECTURA DE DATOS DE LOS ARCHIVOS DE EXCEL CONVERTIDOS EN JSON
-        def cargar_json(nombre_json):
-            """
-            Carga un archivo JSON como DataFrame de pandas.
-            Funciona tanto en Python normal como en .exe creado con PyInstaller.
-            """
-            if getattr(sys, "frozen", False):
-                # Cuando se ejecuta como .exe
-                base_path = sys._MEIPASS
-            else:
-                # Cuando se ejecuta como script normal
-                base_path = os.path.dirname(__file__)
-            
-            ruta = os.path.join(base_path, "resources", nombre_json)
-            
-            if not os.path.exists(ruta):
-                raise FileNotFoundError(f"No se encontró el archivo JSON: {ruta}")
-            
-            with open(ruta, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            
-            return pd.DataFrame(data)
+    traza = Traza.iniciar("procesar_reporte", reporte=reporte_path)
 
+    # El cálculo corre en un hilo; la barra consume sus eventos desde la ventana principal.
+    # La lectura (solo las columnas que usa el proceso) avanza por bloques de filas y se puede cancelar
+    def calcular(progreso, cancelado):
         # LEER ARCHIVOS BASE EN FORMATO JSON
-        df_base = cargar_json("base_general.json")
-        df_codigos_cumple = cargar_json("codigos_cumple.json")
-        df_reporte = pd.read_excel(reporte_path)  # El reporte sigue siendo cargado por el usuario
-
-        # --- Detectar tipo de reporte y columnas ---
-        if 'Número de Parte' in df_reporte.columns:
-            # Reporte FH
-            num_parte_col = 'Número de Parte'
-            desc_col = 'Desc. Pedimento'
-            norma_col = 'Normas'
-            criterio_col = 'CRITERIO'   # FH usa CRITERIO
-        elif any(col.strip().lower() in ['num. parte', 'num.parte', 'numero de parte'] for col in df_reporte.columns):
-            # Reporte MIMPO
-            for col in df_reporte.columns:
-                if col.strip().lower() in ['num. parte', 'num.parte', 'numero de parte']:
-                    num_parte_col = col
-                    break
-            for col in df_reporte.columns:
-                if col.strip().lower() == 'descripción agente aduanal':
-                    desc_col = col
-                    break
-            norma_col = 'NOMs'
-            criterio_col = 'CRITERIO'
-        else:
-            raise ValueError("No se encontró ninguna columna de NUM. PARTE válida en el reporte")
-        
-        # --- Armado de columnas del archivo TIPO DE PROCESO ---
-        items = pd.to_numeric(df_reporte[num_parte_col], errors='coerce').dropna().astype(int).unique()
-        total = len(items)
-
-        # --- 2. TIPO DE PROCESO ---
-        df_base['EAN'] = df_base['EAN'].astype(str)
-        tipo_proceso = []
-        for idx, item in enumerate(items):
-            match = df_base[df_base['EAN'] == str(item)]
-            tipo = match.iloc[0]['CODIGO FORMATO'] if not match.empty and 'CODIGO FORMATO' in match.columns else ''
-            tipo_proceso.append(tipo)
-            progress = ((idx + 1) / total) * 20
-            progress_var.set(progress)
-            percent_label.config(text=f"{int(progress)}%")
-            frame.update()
-
-        # --- 3. NORMA ---
-        norma = []
-        for idx, item in enumerate(items):
-            match = df_reporte[df_reporte[num_parte_col].astype(str) == str(item)]
-            n = match.iloc[0][norma_col] if not match.empty and norma_col in match.columns else ''
-            norma.append(n)
-            progress = 20 + ((idx + 1) / total) * 20
-            progress_var.set(progress)
-            percent_label.config(text=f"{int(progress)}%")
-            frame.update()
-
-        # --- 4. DESCRIPCION ---
-        descripcion = []
-        for idx, item in enumerate(items):
-            match = df_reporte[df_reporte[num_parte_col].astype(str) == str(item)]
-            desc = match.iloc[0][desc_col] if not match.empty and desc_col in match.columns else ''
-            descripcion.append(desc)
-            progress = 40 + ((idx + 1) / total) * 20
-            progress_var.set(progress)
-            percent_label.config(text=f"{int(progress)}%")
-            frame.update()
-
-        # --- 5. CRITERIO ---
-        criterio = []
-        for idx, item in enumerate(items):
-            match = df_codigos_cumple[df_codigos_cumple['ITEM'].astype(str) == str(item)]
-            if not match.empty:
-                if 'OBSERVACIONES' in match.columns:
-                    obs = str(match.iloc[0]['OBSERVACIONES']).upper().strip()
-                    if 'CUMPLE' in obs:
-                        crit = 'CUMPLE'
-                    else:
-                        crit = str(match.iloc[0]['CRITERIO']).strip() if 'CRITERIO' in match.columns else ''
-                else:
-                    crit = ''
-            else:
-                crit = ''
-            criterio.append(crit)
-            progress = 60 + ((idx + 1) / total) * 20
-            progress_var.set(progress)
-            percent_label.config(text=f"{int(progress)}%")
-            frame.update()
-
-        # Crear DataFrame final
-        df_result = pd.DataFrame({
-            'ITEM': items,
-            'TIPO DE PROCESO': tipo_proceso,
-            'NORMA': norma,
-            'CRITERIO': criterio,
-            'DESCRIPCION': descripcion,
-        })
-        progress_var.set(80)
-        percent_label.config(text="80%")
-        frame.update()
-
-        # REGLAS PARA MODIFICAR TIPO DE PROCESO, NORMA Y CRITERIO
-        normas_adherible = [
-            '015', '050', '004-SE', '024', '141',
-            'NOM-015-SCFI-2007', 'NOM-050-SCFI-2004', 'NOM-004-SE-2021',
-            'NOM-024-SCFI-2013', 'NOM-141-SSA1/SCFI-2012',
-            'NOM004TEXX', 'NOM020INS','NOM-020-SCFI-1997'
-        ]
-        normas_costura = ['004', '020', 'NOM004', 'NOM020']
-
-        def contiene_numero(texto, lista_numeros):
-            texto = str(texto)
-            return any(n in texto for n in lista_numeros)
-
-        def modificar_tipo_proceso(row):
-            norma_val = str(row['NORMA'])
-            tipo = str(row['TIPO DE PROCESO'])
-            if 'NOM004TEXX' in tipo or 'TEXX' in norma_val:
-                return 'ADHERIBLE'
-            if 'NOM004' in tipo or '004' in norma_val:
-                return 'COSTURA'
-            if 'NOM020INS' in tipo or 'NOM-020-SCFI-1997' in norma_val:
-                return 'ADHERIBLE'
-            if contiene_numero(norma_val, normas_adherible):
-                return 'ADHERIBLE'
-            if contiene_numero(norma_val, normas_costura):
-                return 'COSTURA'
-            if norma_val == '0':
-                return 'SIN NORMA'
-            if norma_val == 'N/D':
-                return ''
-            return tipo
-
-        df_result['TIPO DE PROCESO'] = df_result.apply(modificar_tipo_proceso, axis=1)
-
-        def modificar_norma(norma_val):
-            if str(norma_val) == '0':
-                return 'SIN NORMA'
-            elif str(norma_val) == 'N/D':
-                return ''
-            return norma_val
-        df_result['NORMA'] = df_result['NORMA'].apply(modificar_norma)
-
-        def modificar_criterio(crit_val):
-            crit = str(crit_val).strip().upper()
-            if 'NO CUMPLE' in crit:
-                return crit_val
-            if any(palabra in crit for palabra in ['CUMPLE', 'C']):
-                return 'CUMPLE'
-            return crit_val
-        df_result['CRITERIO'] = df_result['CRITERIO'].apply(modificar_criterio)
-
-        # LISTADO DE NORMAS VALIDAS
-        normas_validas = ['003','004','NOM-004-SE-2021','008','015','020','NOM-020-SCFI-1997',
-                          '024','NOM-024-SCFI-2013','035','050','051','116','141','142','173','185','186','189','192','199','235']
-
-        # REGLAS ADICIONALES
-        for idx, row in df_result.iterrows():
-            tipo = str(row['TIPO DE PROCESO']).strip() if not pd.isna(row['TIPO DE PROCESO']) else ''
-            norma_val = str(row['NORMA']).strip() if not pd.isna(row['NORMA']) else ''
-            criterio_val = str(row['CRITERIO']).strip().upper() if not pd.isna(row['CRITERIO']) else ''
-
-            if norma_val not in normas_validas:
-                df_result.at[idx, 'TIPO DE PROCESO'] = 'SIN NORMA'
-                if norma_val in ['', '0']:
-                    df_result.at[idx, 'NORMA'] = 'SIN NORMA'
-
-            if tipo == '' or (tipo == '0' and norma_val == '0') or (tipo == '' and norma_val == ''):
-                df_result.at[idx, 'TIPO DE PROCESO'] = 'SIN NORMA'
-                df_result.at[idx, 'NORMA'] = 'SIN NORMA'
-
-            if 'CUMPLE' in criterio_val:
-                df_result.at[idx, 'TIPO DE PROCESO'] = 'CUMPLE'
-                df_result.at[idx, 'CRITERIO'] = ''
-            elif criterio_val not in ['', 'N/D']:
-                df_result.at[idx, 'CRITERIO'] = 'REVISADO'
-
-            if norma_val in ['NOM-050-SCFI-2004', 'NOM-015-SCFI-2007'] and 'CUMPLE' not in criterio_val:
-                df_result.at[idx, 'TIPO DE PROCESO'] = 'ADHERIBLE'
-
-        progress_var.set(100)
-        percent_label.config(text="100%")
-        progress_label.config(text="¡Completado!")
-        frame.update()
-
-        def remove_progress_widgets():
-            progress_label.destroy()
-            progress_bar.destroy()
-            percent_label.destroy()
-        frame.after(500, remove_progress_widgets)
-
-        # Guardar archivo final
-        save_path = filedialog.asksaveasfilename(
-            defaultextension=".xlsx",
-            filetypes=[("Archivos Excel", "*.xlsx")],
-            title="Guardar archivo TIPO DE PROCESO",
-            initialfile="TIPO DE PROCESO.xlsx"
-        )
+        referencias = cargar_referencias()
+        return generar_tipo_proceso_reporte(reporte_path, referencias, progreso, cancelado,
+                                            usar_cache=cache_activada())
 
-        if save_path:
-            exportar_excel(df_result, save_path)
+    ejecutar_en_segundo_plano(
+        frame, "Procesando...", trabajo_trazado(traza, calcular),
+        al_terminar=lambda df_result: guardar_resultado(df_result, traza=traza), cancelable=True
+    )
 
-            if Path(HISTORIAL).exists():
-                df_hist = pd.read_excel(HISTORIAL)
-                df_final = pd.concat([df_hist, df_result]).drop_duplicates(subset=["ITEM"])
-            else:
-                df_final = df_result.copy()
-            df_final.to_excel(HISTORIAL, index=False)
-            messagebox.showinfo("Éxito", "GUARDADO EXITOSAMENTE")
-        else:
-            messagebox.showwarning("Cancelado", "No se guardó el archivo.")
+def procesar_reportes(rutas):
+    """Varios reportes en un solo TIPO DE PROCESO: se leen en paralelo y se clasifican una vez."""
+    from Procesamiento import cache_activada, cargar_referencias, generar_tipo_proceso_consolidado
+    global frame
+    traza = Traza.iniciar("procesar_reportes", reportes=len(rutas))
 
-    except Exception as e:
-        messagebox.showerror("Error", f"Ocurrió un problema:\n{e}")
+    def calcular(progreso, cancelado):
+        referencias = cargar_referencias()
+        return generar_tipo_proceso_consolidado(rutas, referencias, progreso=progreso, cancelado=cancelado,
+                                                usar_cache=cache_activada())
+
+    ejecutar_en_segundo_plano(
+        frame, f"Procesando {len(rutas)} reportes...", trabajo_trazado(traza, calcular),
+        al_terminar=lambda df_result: guardar_resultado(df_result, "TIPO DE PROCESO - CONSOLIDADO.xlsx", traza),
+        cancelable=True
+    )
 
 def seleccionar_reporte():
     ruta = filedialog.askopenfilename(
@@ -601,8 +452,18 @@ def seleccionar_reporte():
     if ruta:
         procesar_reporte(ruta)
 
+def seleccionar_reportes():
+    rutas = filedialog.askopenfilenames(
+        title="Seleccionar los REPORTES DE MERCANCIA del embarque",
+        filetypes=[("Archivos Excel", "*.xlsx *.xls")]
+    )
+    if len(rutas) == 1:
+        procesar_reporte(rutas[0])
+    elif rutas:
+        procesar_reportes(list(rutas))
+
 def actualizar_catalogo(frame_principal):
-    barra = None
+    import Almacen
     try:
         # Seleccionar archivo Excel
         file_path = filedialog.askopenfilename(
@@ -613,65 +474,33 @@ def actualizar_catalogo(frame_principal):
         if not file_path:
             return  # Usuario canceló
 
-        barra = BarraProgreso(frame_principal, "Cargando catálogo...")
-
-        # Paso 1: leer Excel
-        barra.actualizar(20)
-        df = pd.read_excel(file_path)
-
-        # Paso 2: preparar rutas
-        barra.actualizar(50)
-        if getattr(sys, "frozen", False):
-            base_path = sys._MEIPASS
-        else:
-            base_path = os.path.dirname(__file__)
-
-        resources_path = os.path.join(base_path, "resources")
-        if not os.path.exists(resources_path):
-            os.makedirs(resources_path)
-
-        json_path = os.path.join(resources_path, "base_general.json")
-
-        # Paso 3: guardar JSON
-        barra.actualizar(80)
-        df.to_json(json_path, orient="records", force_ascii=False, indent=4)
-
-        # Paso 4: finalizar
-        barra.actualizar(100)
-        time.sleep(0.5)
-        barra.finalizar()
-
-        messagebox.showinfo("Catálogo actualizado", "El catálogo fue cargado correctamente.")
+        # Lectura fila por fila y escritura por bloques en el almacén de la carpeta de datos;
+        # el avance es el de las filas leídas
+        traza = Traza.iniciar("actualizar_catalogo", archivo=file_path)
+        ejecutar_en_segundo_plano(
+            frame_principal, "Cargando catálogo...",
+            trabajo_trazado(
+                traza, lambda progreso, cancelado: Almacen.importar_excel(file_path, "base_general", progreso)
+            ),
+            al_terminar=lambda filas: messagebox.showinfo(
+                "Catálogo actualizado",
+                con_resumen(f"El catálogo fue cargado correctamente ({filas:,} filas).", Traza.terminar(traza))
+            )
+        )
 
     except Exception as e:
-        if barra:
-            barra.finalizar()
         messagebox.showerror("Error", f"No se pudo actualizar el catálogo:\n{e}")
 
 def exportar_concentrado_catalogo(frame_principal):
+    import pandas as pd
+    import Almacen
     try:
-        # Detectar ruta base (para .exe y script)
-        if getattr(sys, "frozen", False):
-            base_path = sys._MEIPASS
-        else:
-            base_path = os.path.dirname(__file__)
-
-        resources_path = os.path.join(base_path, "resources")
-        json_path = os.path.join(resources_path, "base_general.json")
-
-        if not os.path.exists(json_path):
-            messagebox.showerror("Error", "No se encontró el archivo base_general.json")
+        try:
+            df = Almacen.leer_tabla_completa("base_general")
+        except FileNotFoundError:
+            messagebox.showerror("Error", f"No se encontró el catálogo base_general en {Almacen.RUTA_RECURSOS}")
             return
 
-        df = pd.read_json(json_path)
-
-        # Crear barra de progreso
-        barra = BarraProgreso(frame_principal, "Descargando catalogo...")
-
-        total_filas = len(df)
-        for i in range(total_filas):
-            barra.actualizar((i + 1) / total_filas * 100)
-
         # Seleccionar ruta de guardado
         ruta_guardado = filedialog.asksaveasfilename(
             defaultextension=".xlsx",
@@ -679,31 +508,34 @@ def exportar_concentrado_catalogo(frame_principal):
             title="Guardar concentrado del catálogo"
         )
         if not ruta_guardado:
-            barra.finalizar()
             return
 
-        # Exportar a Excel
-        with pd.ExcelWriter(ruta_guardado, engine="openpyxl") as writer:
-            df.to_excel(writer, index=False)
+        # Exportar a Excel en un hilo
+        def exportar(progreso, cancelado):
+            with pd.ExcelWriter(ruta_guardado, engine="openpyxl") as writer:
+                df.to_excel(writer, index=False)
 
-        barra.finalizar()
-        messagebox.showinfo("Exportar Catálogo", f"✅ Se exportó correctamente el concentrado a:\n{ruta_guardado}")
+        ejecutar_en_segundo_plano(
+            frame_principal, "Descargando catalogo...", exportar,
+            al_terminar=lambda _: messagebox.showinfo(
+                "Exportar Catálogo", f"✅ Se exportó correctamente el concentrado a:\n{ruta_guardado}")
+        )
 
     except Exception as e:
-        try:
-            barra.finalizar()
-        except:
-            pass
         messagebox.showerror("Error", f"No se pudo exportar el catálogo:\n{e}")
 
 # --- Función unificada para la barra de progreso ---
 class BarraProgreso:
-    def __init__(self, frame, texto="Procesando...", ancho=250, posicion="derecha"):
+    # Frecuencia con la que la ventana revisa la cola de eventos del hilo de trabajo
+    INTERVALO_MS = 50
+
+    def __init__(self, frame, texto="Procesando...", ancho=250, posicion="derecha", al_cancelar=None):
         """
         frame: contenedor donde se mostrará la barra
         texto: texto de la barra
         ancho: longitud de la barra
         posicion: "derecha" o "izquierda"
+        al_cancelar: si se indica, se muestra un botón "Cancelar" que la llama
         """
         self.frame = frame
         self.ancho = ancho
@@ -712,11 +544,16 @@ class BarraProgreso:
         self.lbl = tk.Label(frame, text=texto, font=("Segoe UI", 10, "bold"), bg="#FFFFFF", fg="#282828")
         self.percent_lbl = tk.Label(frame, text="0%", font=("Segoe UI", 10, "bold"), bg="#FFFFFF", fg="#282828")
         self.bar = ttk.Progressbar(frame, variable=self.var, maximum=100, length=self.ancho)
+        self.btn_cancelar = None
+        if al_cancelar:
+            self.btn_cancelar = tk.Button(frame, text="✖ Cancelar", command=self._cancelar, bg="#FF4C4C",
+                                          fg="white", font=("Segoe UI", 8, "bold"), borderwidth=0)
+        self.al_cancelar = al_cancelar
         
         # Guardar posición
         self.posicion = posicion
         self._colocar_widgets()
-        frame.update()
+        frame.update_idletasks()
 
     def _colocar_widgets(self):
         """Coloca los widgets según la posición deseada."""
@@ -731,6 +568,10 @@ class BarraProgreso:
         self.bar.place(relx=1.0 if self.posicion=="derecha" else 0.0, rely=1.0, x=x_offset, y=-40, anchor=anchor)
         self.lbl.place(relx=1.0 if self.posicion=="derecha" else 0.0, rely=1.0, x=x_offset, y=-60, anchor=anchor)
         self.percent_lbl.place(relx=1.0 if self.posicion=="derecha" else 0.0, rely=1.0, x=x_offset, y=-20, anchor=anchor)
+        if self.btn_cancelar:
+            self.btn_cancelar.place(relx=1.0 if self.posicion=="derecha" else 0.0, rely=1.0,
+                                    x=x_offset - self.ancho + 60 if self.posicion=="derecha" else x_offset,
+                                    y=-18, anchor=anchor)
 
     def actualizar(self, valor, texto=None):
         self.var.set(valor)
@@ -739,11 +580,60 @@ class BarraProgreso:
         self.percent_lbl.config(text=f"{int(valor)}%")
         self.frame.update()
 
+    def _mostrar(self, valor, texto=None):
+        """Como actualizar(), pero sin forzar el redibujado (lo hace el ciclo de Tk)."""
+        self.var.set(valor)
+        if texto:
+            self.lbl.config(text=texto)
+        self.percent_lbl.config(text=f"{int(valor)}%")
+
+    def escuchar(self, cola, al_terminar=None, al_fallar=None):
+        """
+        Consume los eventos que un hilo de trabajo deja en la cola:
+        ("progreso", valor[, texto]), ("terminado", resultado), ("error", excepcion) y ("cancelado",).
+        La cola se revisa cada INTERVALO_MS y solo se dibuja el último avance recibido,
+        así que el número de redibujados no depende del tamaño del reporte.
+        """
+        ultimo = None
+        while True:
+            try:
+                evento = cola.get_nowait()
+            except queue.Empty:
+                break
+
+            tipo = evento[0]
+            if tipo == "progreso":
+                ultimo = evento[1:]
+            elif tipo == "terminado":
+                self.finalizar()
+                if al_terminar:
+                    al_terminar(evento[1])
+                return
+            elif tipo == "cancelado":
+                self.finalizar("Cancelado")
+                return
+            elif tipo == "error":
+                self.finalizar("Error")
+                if al_fallar:
+                    al_fallar(evento[1])
+                return
+
+        if ultimo is not None:
+            self._mostrar(*ultimo)
+        self.frame.after(self.INTERVALO_MS, self.escuchar, cola, al_terminar, al_fallar)
+
+    def _cancelar(self):
+        self.lbl.config(text="Cancelando...")
+        self.btn_cancelar.config(state="disabled")
+        self.al_cancelar()
+
     def finalizar(self, mensaje="¡Completado!"):
         self.var.set(100)
         self.lbl.config(text=mensaje)
         self.percent_lbl.config(text="100%")
-        self.frame.update()
+        if self.btn_cancelar:
+            self.btn_cancelar.place_forget()
+        self.frame.update_idletasks()
         # Ocultar widgets después de un tiempo
         self.frame.after(800, self._ocultar)
 
@@ -751,15 +641,189 @@ class BarraProgreso:
         self.bar.place_forget()
         self.lbl.place_forget()
         self.percent_lbl.place_forget()
-        
-# VENTANA PRINCIPAL
-root = tk.Tk()
-root.title("GENERADOR DE TIPO DE PROCESO")
-root.geometry("650x570")
-root.configure(bg="#FFFFFF")
+
+
+def trabajo_trazado(traza, trabajo):
+    """
+    trabajo(progreso, cancelado) con traza como traza en curso de su hilo.
+    Si falla o se cancela, la traza se cierra (y se guarda) con el error; también si el trabajo
+    termina después de cancelado, porque entonces al_terminar no se llama.
+    """
+    def correr(progreso, cancelado):
+        with Traza.usar(traza):
+            try:
+                resultado = trabajo(progreso, cancelado)
+            except BaseException as e:
+                Traza.terminar(traza, e)
+                raise
+            if cancelado.is_set():
+                Traza.terminar(traza, "Cancelado")
+            return resultado
+    return correr
+
+
+def con_resumen(mensaje, resumen):
+    """Agrega al mensaje una línea de resumen (traza o caché) si la hay."""
+    return f"{mensaje}\n\n{resumen}" if resumen else mensaje
+
+
+def ejecutar_en_segundo_plano(frame_principal, texto, trabajo, al_terminar=None, cancelable=False):
+    """
+    Ejecuta trabajo(progreso, cancelado) en un hilo y muestra su avance con BarraProgreso.
+    progreso(valor, texto=None) deja eventos en una cola; cancelado es un threading.Event
+    que se activa con el botón Cancelar. al_terminar recibe el resultado en el hilo de Tk.
+    """
+    from Procesamiento import ProcesoCancelado
+    cola = queue.Queue()
+    cancelado = threading.Event()
+
+    def progreso(valor, texto=None):
+        cola.put(("progreso", valor, texto))
+
+    def correr():
+        try:
+            resultado = trabajo(progreso, cancelado)
+        except ProcesoCancelado:
+            cola.put(("cancelado",))
+        except Exception as e:
+            cola.put(("error", e))
+        else:
+            cola.put(("cancelado",) if cancelado.is_set() else ("terminado", resultado))
+
+    barra = BarraProgreso(frame_principal, texto, al_cancelar=cancelado.set if cancelable else None)
+    threading.Thread(target=correr, daemon=True).start()
+    barra.escuchar(
+        cola, al_terminar,
+        al_fallar=lambda e: messagebox.showerror("Error", f"Ocurrió un problema:\n{e}")
+    )
+    return cancelado
+
+# --- Arranque: la ventana aparece de inmediato y lo pesado se carga en segundo plano ---
+RUTA_CARGA = os.path.join(BASE_PATH, "img", "imagen_carga.gif")
+RUTA_LOGO = os.path.join(BASE_PATH, "img", "logo.png")
+
+
+def calentar():
+    """
+    Importa pandas y los módulos del motor, prepara la carpeta de datos y carga las referencias
+    (catálogo y codigos_cumple) para que el primer reporte no espere. Devuelve el logo ya escalado (PIL) o None.
+    Corre en un hilo: no toca widgets de Tk.
+    """
+    import pandas  # noqa: F401
+    import Almacen
+    Almacen.preparar_carpeta_datos()
+    import BaseDatos  # noqa: F401
+    import Formato  # noqa: F401
+    from Procesamiento import cargar_referencias
+    try:
+        cargar_referencias()
+    except Exception as e:
+        # Sin catálogo todavía (p. ej. la primera vez): el error se muestra al procesar un reporte
+        print(f"No se pudieron precargar las referencias: {e}")
+
+    logo = None
+    try:
+        from PIL import Image
+        if os.path.exists(RUTA_LOGO):
+            logo = Image.open(RUTA_LOGO).resize((150, 100), Image.LANCZOS)
+    except Exception as e:
+        print(f"Error cargando el logo: {e}")
+    return logo
+
+
+def iniciar_calentamiento(ventana, al_terminar):
+    """Corre calentar() en un hilo y llama al_terminar(logo) en el hilo de Tk cuando termina."""
+    cola = queue.Queue()
+
+    def correr():
+        try:
+            cola.put(("terminado", calentar()))
+        except Exception as e:
+            cola.put(("error", e))
+
+    def revisar():
+        try:
+            evento = cola.get_nowait()
+        except queue.Empty:
+            ventana.after(50, revisar)
+            return
+        if evento[0] == "error":
+            messagebox.showerror("Error", f"No se pudo iniciar la aplicación:\n{evento[1]}")
+            ventana.destroy()
+        else:
+            al_terminar(evento[1])
+
+    threading.Thread(target=correr, daemon=True).start()
+    ventana.after(50, revisar)
+
+
+class PantallaCarga:
+    """
+    Animación de img/imagen_carga.gif encima de toda la ventana mientras dura el calentamiento.
+    Los cuadros se decodifican conforme se muestran (el GIF tiene cientos) y se liberan al cerrar.
+    """
+
+    INTERVALO_MS = 40
+    REDUCCION = 2  # el GIF es de 800x600
+
+    def __init__(self, ventana, texto="Cargando..."):
+        self.ventana = ventana
+        self.marco = tk.Frame(ventana, bg="#FFFFFF")
+        self.marco.place(relx=0, rely=0, relwidth=1, relheight=1)
+        self.imagen = tk.Label(self.marco, bg="#FFFFFF")
+        self.imagen.pack(expand=True)
+        tk.Label(self.marco, text=texto, bg="#FFFFFF", fg="#282828",
+                 font=("Segoe UI", 10, "bold")).pack(pady=(0, 40))
+        self._cuadros = []
+        self._siguiente = 0
+        self._tarea = None
+        self._animar()
+
+    def _cuadro(self, indice):
+        if indice < len(self._cuadros):
+            return self._cuadros[indice]
+        try:
+            cuadro = tk.PhotoImage(file=RUTA_CARGA, format=f"gif -index {indice}").subsample(self.REDUCCION)
+        except tk.TclError:
+            return None  # no hay más cuadros (o no está el archivo)
+        self._cuadros.append(cuadro)
+        return cuadro
+
+    def _animar(self):
+        cuadro = self._cuadro(self._siguiente)
+        if cuadro is None:
+            if not self._cuadros:
+                return  # sin GIF: solo queda el texto
+            self._siguiente = 0
+            cuadro = self._cuadros[0]
+        self.imagen.configure(image=cuadro)
+        self._siguiente += 1
+        self._tarea = self.ventana.after(self.INTERVALO_MS, self._animar)
+
+    def cerrar(self):
+        if self._tarea is not None:
+            self.ventana.after_cancel(self._tarea)
+        self.marco.destroy()
+        self._cuadros.clear()
+
+
+def medir_arranque(evento):
+    """Con TIPOS_MEDIR_ARRANQUE imprime los segundos desde INICIO (ver benchmarks/bench_arranque.py)."""
+    if os.environ.get("TIPOS_MEDIR_ARRANQUE"):
+        print(f"{evento} {time.time() - INICIO:.4f}", flush=True)
+
 
 # --- DISEÑO DE LA VENTANA ---
 if __name__ == "__main__":
+    # Necesario para los procesos de lectura en paralelo en el .exe de PyInstaller
+    multiprocessing.freeze_support()
+
+    # VENTANA PRINCIPAL (dentro del main: los procesos hijos importan este módulo sin abrir ventanas)
+    root = tk.Tk()
+    root.title("GENERADOR DE TIPO DE PROCESO")
+    root.geometry("650x570")
+    root.configure(bg="#FFFFFF")
+
     frame = tk.Frame(root, bg="#FFFFFF")
     frame.pack(expand=True, fill="both", padx=20, pady=20)
 
@@ -771,17 +835,13 @@ if __name__ == "__main__":
     frame_left = tk.Frame(frame_top, bg="#FFFFFF")
     frame_left.pack(side="left", fill="both", expand=True, padx=(0,20))
 
-    # --- Logo ---
-    try:
-        logo_path = os.path.join(BASE_PATH, "img", "logo.png")
-        if os.path.exists(logo_path):
-            logo_img_raw = Image.open(logo_path).resize((150, 100), Image.LANCZOS)
-            logo_img = ImageTk.PhotoImage(logo_img_raw)
-            logo_label = tk.Label(frame_left, image=logo_img, bg="#FFFFFF")
-            logo_label.image = logo_img
-            logo_label.pack(pady=(20, 20))
-    except Exception as e:
-        print(f"Error cargando el logo: {e}")
+    # --- Logo (el espacio se reserva ya; la imagen llega con el calentamiento) ---
+    logo_label = None
+    if os.path.exists(RUTA_LOGO):
+        logo_vacio = tk.PhotoImage(width=150, height=100)
+        logo_label = tk.Label(frame_left, image=logo_vacio, bg="#FFFFFF")
+        logo_label.image = logo_vacio  # referencia para que Tk no pierda la imagen
+        logo_label.pack(pady=(20, 20))
 
     label = tk.Label(
         frame_left, 
@@ -863,10 +923,12 @@ if __name__ == "__main__":
 
     botones = [
         ("📂 REPORTE DE MERCANCIA", seleccionar_reporte),
+        ("📑 VARIOS REPORTES", seleccionar_reportes),
         ("🔄 ACTUALIZAR CODIGOS", lambda: abrir_editor_codigos(frame_right)), 
         ("📦 EXPORTAR CODIGOS", lambda: exportar_concentrado_codigos(frame_right)),  
         ("🔄 ACTUALIZAR CATALOGO", lambda: actualizar_catalogo(frame_right)),
         ("📦 EXPORTAR CATALOGO", lambda: exportar_concentrado_catalogo(frame_right)),
+        ("📦 EXPORTAR HISTORIAL", lambda: exportar_historial(frame_right)),
         ("❌ Salir", root.quit)
     ]
 
@@ -875,5 +937,26 @@ if __name__ == "__main__":
         btn = ttk.Button(frame_buttons, text=texto.ljust(max_width), command=comando, style='TButton')
         btn.pack(pady=10, ipadx=10, ipady=10, fill="x")
 
+    # Pantalla de carga mientras se importan los módulos pesados y se cargan las referencias
+    pantalla_carga = PantallaCarga(root)
+    if os.environ.get("TIPOS_MEDIR_ARRANQUE"):
+        def al_mostrar(evento):
+            if evento.widget is root:
+                root.unbind("<Map>")
+                medir_arranque("ventana")
+        root.bind("<Map>", al_mostrar)
+
+    def al_calentar(logo):
+        if logo is not None and logo_label is not None:
+            from PIL import ImageTk
+            logo_img = ImageTk.PhotoImage(logo)
+            logo_label.configure(image=logo_img)
+            logo_label.image = logo_img
+        pantalla_carga.cerrar()
+        medir_arranque("lista")
+        if os.environ.get("TIPOS_MEDIR_ARRANQUE"):
+            root.after(100, root.destroy)
+
+    iniciar_calentamiento(root, al_calentar)
     root.mainloop()
 
@@ -0,0 +1,379 @@
+"""
+Tabla virtualizada con buscador para tkinter.
+
+La ttk.Treeview solo tiene las filas que caben en pantalla; al desplazarse se
+reutilizan esas mismas filas con otros valores. Las filas vienen de una fuente
+que entrega solo la página pedida:
+
+    total()                                 -> filas en la fuente
+    contar(texto)                           -> filas que pasan la búsqueda
+    pagina(texto, inicio, cantidad, ancla)  -> tuplas de esas filas, en orden
+    posicion(texto, clave)                  -> lugar de una fila dentro de la búsqueda (o None)
+    fila(clave)                             -> tupla de una fila (o None)
+
+ancla es (posición, llave) de una fila de la búsqueda que la tabla ya conoce (la primera
+en pantalla o la seleccionada): la fuente puede leer la página a partir de esa fila en
+lugar de contar desde el principio.
+
+- BaseDatos.FuenteCodigos (editor de códigos) consulta SQLite en cada página a partir
+  del ancla (WHERE item >= ancla ORDER BY item LIMIT n): abrir la tabla no carga los
+  registros a Python, solo cuenta las filas y pide la primera página, y desplazarse no
+  depende de qué tan abajo esté la vista.
+- FuenteMemoria guarda las filas de un DataFrame, para tablas chicas (revisión
+  de cambios); su búsqueda usa IndiceBusqueda.
+"""
+import bisect
+import tkinter as tk
+from tkinter import ttk
+
+
+
+class IndiceBusqueda:
+    """
+    Índice de búsqueda por prefijo de llave (búsqueda binaria sobre las llaves ordenadas)
+    y subcadena de texto (recorre el texto en mayúsculas ya preparado).
+    Se mantiene al día fila por fila (agregar) sin reconstruirse.
+    """
+
+    def __init__(self, claves=(), textos=()):
+        pares = sorted((str(c), c) for c in claves)
+        self._llaves_texto = [p[0] for p in pares]
+        self._llaves = [p[1] for p in pares]
+        self._textos = {c: self._preparar(t) for c, t in zip(claves, textos)}
+
+    @staticmethod
+    def _preparar(texto):
+        return "" if texto is None else str(texto).upper()
+
+    def agregar(self, clave, texto):
+        if clave not in self._textos:
+            posicion = bisect.bisect_left(self._llaves_texto, str(clave))
+            self._llaves_texto.insert(posicion, str(clave))
+            self._llaves.insert(posicion, clave)
+        self._textos[clave] = self._preparar(texto)
+
+    def buscar(self, texto):
+        """Llaves que empiezan con texto o cuyo texto lo contiene (sin orden)."""
+        texto = texto.strip()
+        inicio = bisect.bisect_left(self._llaves_texto, texto)
+        fin = bisect.bisect_left(self._llaves_texto, texto + "\uffff")
+        encontradas = set(self._llaves[inicio:fin])
+        subcadena = texto.upper()
+        encontradas.update(c for c, t in self._textos.items() if subcadena in t)
+        return encontradas
+
+
+class FuenteMemoria:
+    """
+    Fuente de TablaVirtual con las filas de un DataFrame en memoria (la llave es la primera columna).
+    Pensada para tablas chicas: cargarla y buscar cuestan en proporción al número de filas.
+    """
+
+    def __init__(self, df, columna_texto=1):
+        valores = df.astype(object).where(df.notna(), "")
+        self._filas = {fila[0]: fila for fila in valores.itertuples(index=False, name=None)}
+        self._claves = list(self._filas)
+        self._orden = {clave: i for i, clave in enumerate(self._claves)}
+        self.columna_texto = columna_texto
+        self._indice = None      # IndiceBusqueda (se construye al buscar)
+        self._busqueda = None    # (texto, llaves que lo cumplen en orden) de la última búsqueda
+
+    def _visibles(self, texto):
+        if not texto:
+            return self._claves
+        if self._busqueda is None or self._busqueda[0] != texto:
+            if self._indice is None:
+                self._indice = IndiceBusqueda(
+                    self._claves, [self._filas[c][self.columna_texto] for c in self._claves]
+                )
+            self._busqueda = (texto, sorted(self._indice.buscar(texto), key=self._orden.__getitem__))
+        return self._busqueda[1]
+
+    def total(self):
+        return len(self._claves)
+
+    def contar(self, texto):
+        return len(self._visibles(texto))
+
+    def pagina(self, texto, inicio, cantidad, ancla=None):
+        return [self._filas[c] for c in self._visibles(texto)[inicio:inicio + cantidad]]
+
+    def posicion(self, texto, clave):
+        if not texto:
+            return self._orden.get(clave)
+        try:
+            return self._visibles(texto).index(clave)
+        except ValueError:
+            return None
+
+    def fila(self, clave):
+        return self._filas.get(clave)
+
+    def actualizar(self, valores):
+        """Agrega o reemplaza una fila (la llave es valores[0]). Devuelve False si no cambió nada."""
+        clave = valores[0]
+        if self._filas.get(clave) == valores:
+            return False
+        if clave not in self._filas:
+            self._orden[clave] = len(self._claves)
+            self._claves.append(clave)
+        self._filas[clave] = valores
+        if self._indice is not None:
+            self._indice.agregar(clave, valores[self.columna_texto])
+        self._busqueda = None
+        return True
+
+    def filas(self):
+        """Todas las filas (sin filtro) en su orden."""
+        return [self._filas[c] for c in self._claves]
+
+
+def _sin_nulos(valores):
+    return tuple("" if v is None else v for v in valores)
+
+
+class TablaVirtual(tk.Frame):
+    """
+    Treeview que solo materializa las filas visibles, con buscador incremental.
+    La primera columna es la llave de cada fila (ITEM). Las filas vienen de una fuente (ver el módulo).
+    """
+    # Espera entre teclazos antes de buscar
+    ESPERA_BUSQUEDA_MS = 150
+
+    def __init__(self, parent, columnas, alto=15, columna_texto=1, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.columnas = list(columnas)
+        self.columna_texto = columna_texto
+        self.alto = alto
+
+        self._fuente = None
+        self._texto = ""         # búsqueda aplicada
+        self._total = 0          # filas que pasan la búsqueda
+        self._inicio = 0         # primera fila visible dentro de la búsqueda
+        self._ventana = []       # filas en pantalla (tuplas)
+        self._ancla = None       # (posición, llave) de la primera fila en pantalla
+        self._seleccion = None   # llave seleccionada
+        self._busqueda_pendiente = None
+        self._dibujando = False
+
+        # Buscador
+        frame_buscar = tk.Frame(self)
+        frame_buscar.pack(fill="x", pady=(0, 5))
+        tk.Label(frame_buscar, text="🔍 Buscar ITEM u observación:").pack(side="left")
+        self.var_buscar = tk.StringVar()
+        entrada = tk.Entry(frame_buscar, textvariable=self.var_buscar, width=40)
+        entrada.pack(side="left", padx=5, fill="x", expand=True)
+        self.lbl_total = tk.Label(frame_buscar, text="")
+        self.lbl_total.pack(side="right")
+        self.var_buscar.trace_add("write", lambda *_: self._programar_busqueda())
+
+        # Tabla + barra de desplazamiento propia (la Treeview nunca tiene más filas que las visibles)
+        frame_tabla = tk.Frame(self)
+        frame_tabla.pack(fill="both", expand=True)
+        self.tree = ttk.Treeview(frame_tabla, columns=self.columnas, show="headings",
+                                 height=alto, selectmode="browse")
+        for col in self.columnas:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=150)
+        self.scroll = ttk.Scrollbar(frame_tabla, orient="vertical", command=self._desplazar)
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scroll.pack(side="right", fill="y")
+
+        self.tree.bind("<<TreeviewSelect>>", self._al_seleccionar)
+        self.tree.bind("<Configure>", self._al_redimensionar)
+        self.tree.bind("<MouseWheel>", lambda e: self._mover_vista(-1 if e.delta > 0 else 1, "units"))
+        self.tree.bind("<Button-4>", lambda e: self._mover_vista(-1, "units"))
+        self.tree.bind("<Button-5>", lambda e: self._mover_vista(1, "units"))
+        self.tree.bind("<Up>", lambda e: self._mover_seleccion(-1))
+        self.tree.bind("<Down>", lambda e: self._mover_seleccion(1))
+        self.tree.bind("<Prior>", lambda e: self._mover_seleccion(-self.alto))
+        self.tree.bind("<Next>", lambda e: self._mover_seleccion(self.alto))
+
+    # --- Datos ---
+    def cargar(self, datos):
+        """
+        Muestra un DataFrame (mismas columnas que la tabla; se guarda en memoria con FuenteMemoria)
+        o una fuente que entrega las filas por páginas, como BaseDatos.FuenteCodigos.
+        """
+        self._fuente = datos if hasattr(datos, "pagina") else FuenteMemoria(datos, self.columna_texto)
+        self._seleccion = None
+        self._aplicar_filtro()
+
+    def refrescar(self):
+        """Vuelve a consultar la fuente (después de cambiar sus datos) conservando la posición de la vista."""
+        self._contar()
+        if self._seleccion is not None and self._fuente.fila(self._seleccion) is None:
+            self._seleccion = None
+        self._inicio = self._limitar_inicio(self._inicio)
+        self._dibujar()
+
+    def actualizar_fila(self, valores):
+        """Agrega o reemplaza una sola fila de una tabla en memoria (la llave es valores[0])."""
+        if self._fuente.actualizar(_sin_nulos(valores)):
+            self.refrescar()
+
+    def aplicar_lote(self, filas, tamano=5000, al_terminar=None):
+        """
+        Aplica muchas altas/cambios a una tabla en memoria en bloques de `tamano` filas,
+        devolviendo el control a tkinter entre bloques. La pantalla se redibuja una sola vez.
+        """
+        filas = [_sin_nulos(valores) for valores in filas]
+
+        def bloque(inicio):
+            for valores in filas[inicio:inicio + tamano]:
+                self._fuente.actualizar(valores)
+            if inicio + tamano < len(filas):
+                self.after(1, bloque, inicio + tamano)
+            else:
+                self.refrescar()
+                if al_terminar:
+                    al_terminar()
+
+        bloque(0)
+
+    def mostrar(self, clave):
+        """Selecciona una fila y desplaza la vista hasta ella (si pasa la búsqueda actual)."""
+        if self._fuente.fila(clave) is None:
+            return
+        self._seleccion = clave
+        self._contar()
+        posicion = self._fuente.posicion(self._texto, clave)
+        if posicion is not None and not self._inicio <= posicion < self._inicio + self.alto:
+            self._inicio = self._limitar_inicio(posicion - self.alto // 2)
+        self._dibujar(None if posicion is None else (posicion, clave))
+
+    def filas(self):
+        """Todas las filas (sin filtro) en su orden; solo para tablas en memoria."""
+        return self._fuente.filas()
+
+    def fila_seleccionada(self):
+        """Valores de la fila seleccionada o None."""
+        if self._seleccion is None:
+            return None
+        fila = self._fuente.fila(self._seleccion)
+        return None if fila is None else _sin_nulos(fila)
+
+    # --- Búsqueda ---
+    def _programar_busqueda(self):
+        if self._busqueda_pendiente is not None:
+            self.after_cancel(self._busqueda_pendiente)
+        self._busqueda_pendiente = self.after(self.ESPERA_BUSQUEDA_MS, self._aplicar_filtro)
+
+    def _aplicar_filtro(self):
+        self._busqueda_pendiente = None
+        if self._fuente is None:
+            return
+        self._texto = self.var_buscar.get().strip()
+        self._contar()
+        self._inicio = 0
+        self._ancla = None
+        self._dibujar()
+
+    def _contar(self):
+        self._total = self._fuente.contar(self._texto)
+        self.lbl_total.config(text=f"{self._total} de {self._fuente.total()}")
+
+    # --- Dibujo de la ventana visible ---
+    def _leer_ventana(self, ancla=None):
+        """Pide a la fuente la página visible a partir del ancla indicada o de la página anterior."""
+        filas = self._fuente.pagina(self._texto, self._inicio, self.alto, ancla or self._ancla)
+        self._ventana = [_sin_nulos(f) for f in filas]
+        self._ancla = (self._inicio, self._ventana[0][0]) if self._ventana else None
+
+    def _dibujar(self, ancla=None):
+        """Pide a la fuente la página visible y la pinta."""
+        self._leer_ventana(ancla)
+        self._pintar()
+
+    def _pintar(self):
+        self._dibujando = True
+        hijos = self.tree.get_children()
+
+        # Reutilizar las filas existentes; solo se crean/borran las que sobran o faltan
+        seleccionada = None
+        for i, valores in enumerate(self._ventana):
+            iid = f"f{i}"
+            if i < len(hijos):
+                self.tree.item(iid, values=valores)
+            else:
+                self.tree.insert("", "end", iid=iid, values=valores)
+            if valores[0] == self._seleccion:
+                seleccionada = iid
+        for iid in hijos[len(self._ventana):]:
+            self.tree.delete(iid)
+
+        if seleccionada is not None:
+            self.tree.selection_set(seleccionada)
+            self.tree.focus(seleccionada)
+        else:
+            self.tree.selection_remove(self.tree.selection())
+
+        total = max(self._total, 1)
+        self.scroll.set(self._inicio / total, min(1.0, (self._inicio + self.alto) / total))
+        self._dibujando = False
+
+    def _limitar_inicio(self, inicio):
+        return max(0, min(inicio, self._total - self.alto))
+
+    def _desplazar(self, accion, cantidad, unidad=None):
+        """Comando de la barra de desplazamiento ('moveto' o 'scroll')."""
+        if accion == "moveto":
+            self._inicio = self._limitar_inicio(int(float(cantidad) * self._total))
+            self._dibujar()
+        else:
+            self._mover_vista(int(cantidad), unidad)
+
+    def _mover_vista(self, cantidad, unidad="units"):
+        paso = self.alto if unidad == "pages" else 1
+        self._inicio = self._limitar_inicio(self._inicio + cantidad * paso)
+        self._dibujar()
+        return "break"
+
+    def _posicion_seleccion(self):
+        """Lugar de la fila seleccionada dentro de la búsqueda; sin consultar si está en pantalla."""
+        for i, valores in enumerate(self._ventana):
+            if valores[0] == self._seleccion:
+                return self._inicio + i
+        if self._seleccion is None:
+            return None
+        return self._fuente.posicion(self._texto, self._seleccion)
+
+    def _mover_seleccion(self, delta):
+        if not self._total:
+            return "break"
+        posicion = self._posicion_seleccion()
+        ancla = None if posicion is None else (posicion, self._seleccion)
+        posicion = self._inicio if posicion is None else posicion + delta
+        posicion = max(0, min(posicion, self._total - 1))
+        if posicion < self._inicio:
+            self._inicio = posicion
+        elif posicion >= self._inicio + self.alto:
+            self._inicio = self._limitar_inicio(posicion - self.alto + 1)
+        self._leer_ventana(ancla)
+        if posicion - self._inicio < len(self._ventana):
+            self._seleccion = self._ventana[posicion - self._inicio][0]
+        self._pintar()
+        return "break"
+
+    def _al_seleccionar(self, _evento):
+        if self._dibujando:
+            return
+        seleccion = self.tree.selection()
+        if seleccion:
+            posicion = int(seleccion[0][1:])
+            if posicion < len(self._ventana):
+                self._seleccion = self._ventana[posicion][0]
+
+    def _al_redimensionar(self, evento):
+        """Ajusta cuántas filas se materializan según el alto real de la tabla."""
+        hijos = self.tree.get_children()
+        if not hijos:
+            return
+        caja = self.tree.bbox(hijos[0])
+        if not caja:
+            return
+        alto = max(1, (evento.height - caja[1]) // caja[3])
+        if alto != self.alto:
+            self.alto = alto
+            self._inicio = self._limitar_inicio(self._inicio)
+            self._dibujar()
@@ -0,0 +1,213 @@
+"""
+Traza de ejecución: tiempo, filas y memoria máxima (tracemalloc) por etapa de un proceso
+(procesar reporte, actualizar catálogo, actualizar códigos, ...).
+
+Se activa con la variable de entorno TIPOS_TRAZA (1 = tiempos y filas; memoria = además la
+memoria máxima de cada etapa) o con activar(). Cada ejecución escribe un JSON en carpeta_trazas().
+
+Apagada no cuesta nada medible: iniciar() devuelve None y etapa() devuelve siempre el mismo
+objeto vacío, sin medir tiempo ni memoria.
+
+Uso:
+    traza = Traza.iniciar("procesar_reporte", reporte=ruta)
+    with Traza.usar(traza):
+        with Traza.etapa("lectura_reporte") as e:
+            df = leer(...)
+            e.filas = len(df)
+    Traza.terminar(traza)
+"""
+import contextlib
+import datetime
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+VARIABLE = "TIPOS_TRAZA"
+VARIABLE_CARPETA = "TIPOS_TRAZAS"
+
+
+def carpeta_trazas():
+    """Carpeta de las trazas: TIPOS_TRAZAS o logs/ dentro de la carpeta de datos."""
+    if os.environ.get(VARIABLE_CARPETA):
+        return os.environ[VARIABLE_CARPETA]
+    # Almacen importa este módulo (y pandas): se importa aquí para no cargarlo al arrancar.
+    # En el .exe la carpeta de datos es la del usuario, que siempre se puede escribir.
+    import Almacen
+    return os.path.join(Almacen.carpeta_datos(), "logs")
+
+# Traza en curso de cada hilo (el trabajo de la interfaz corre en hilos aparte)
+_local = threading.local()
+
+
+def activa():
+    return os.environ.get(VARIABLE, "").strip().lower() not in ("", "0", "no")
+
+
+def con_memoria():
+    return os.environ.get(VARIABLE, "").strip().lower() == "memoria"
+
+
+def activar(memoria=False):
+    """Activa la traza en este proceso y en los procesos hijos (heredan la variable de entorno)."""
+    os.environ[VARIABLE] = "memoria" if memoria else "1"
+
+
+class _EtapaVacia:
+    """Etapa sin medición (traza apagada): se puede usar con 'with' y asignarle filas."""
+    filas = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *error):
+        return False
+
+    def __setattr__(self, nombre, valor):
+        pass
+
+
+_VACIA = _EtapaVacia()
+
+
+class Etapa:
+    def __init__(self, traza, nombre, filas=None):
+        self.traza = traza
+        self.nombre = nombre
+        self.filas = filas
+        self.nivel = 0
+        self.segundos = None
+        self.pico = 0
+
+    def __enter__(self):
+        pila = self.traza._pila
+        self.nivel = len(pila)
+        if self.traza.memoria:
+            # El pico hasta aquí pertenece a la etapa que contiene a esta
+            if pila:
+                pila[-1].pico = max(pila[-1].pico, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        pila.append(self)
+        self.traza.etapas.append(self)
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *error):
+        self.segundos = time.perf_counter() - self._inicio
+        pila = self.traza._pila
+        pila.pop()
+        if self.traza.memoria:
+            self.pico = max(self.pico, tracemalloc.get_traced_memory()[1])
+            if pila:
+                pila[-1].pico = max(pila[-1].pico, self.pico)
+            tracemalloc.reset_peak()
+        return False
+
+    def como_dict(self):
+        datos = {"etapa": self.nombre, "nivel": self.nivel, "segundos": round(self.segundos or 0.0, 6)}
+        if self.filas is not None:
+            datos["filas"] = int(self.filas)
+        if self.traza.memoria:
+            datos["pico_mb"] = round(self.pico / 2 ** 20, 2)
+        return datos
+
+
+class Traza:
+    """Etapas medidas de una ejecución de un proceso."""
+
+    def __init__(self, proceso, memoria=False, **datos):
+        self.proceso = proceso
+        self.memoria = memoria
+        self.datos = datos
+        self.etapas = []
+        self._pila = []
+        self.fecha = datetime.datetime.now()
+        self._inicio = time.perf_counter()
+        self.segundos = None
+        self._detener_memoria = False
+        if memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._detener_memoria = True
+
+    def etapa(self, nombre, filas=None):
+        return Etapa(self, nombre, filas)
+
+    def pico_mb(self):
+        return max((e.pico for e in self.etapas), default=0) / 2 ** 20
+
+    def como_dict(self, error=None):
+        datos = {
+            "proceso": self.proceso,
+            "fecha": self.fecha.isoformat(timespec="seconds"),
+            "segundos": round(self.segundos or 0.0, 6),
+            "datos": {clave: str(valor) for clave, valor in self.datos.items()},
+            "etapas": [e.como_dict() for e in self.etapas if e.segundos is not None],
+        }
+        if self.memoria:
+            datos["pico_mb"] = round(self.pico_mb(), 2)
+        if error is not None:
+            datos["error"] = str(error) or type(error).__name__
+        return datos
+
+    def resumen(self):
+        """Una línea: tiempo total, las etapas principales y la memoria máxima."""
+        principales = [e for e in self.etapas if e.nivel == 0 and e.segundos is not None]
+        partes = [f"{e.nombre} {e.segundos:.2f} s" + (f" ({e.filas:,} filas)" if e.filas is not None else "")
+                  for e in principales]
+        texto = f"{self.proceso}: {self.segundos or 0.0:.2f} s"
+        if partes:
+            texto += " — " + ", ".join(partes)
+        if self.memoria:
+            texto += f" — pico {self.pico_mb():.0f} MB"
+        return texto
+
+
+def iniciar(proceso, **datos):
+    """Nueva traza si está activa; si no, None (y nada más se mide)."""
+    if not activa():
+        return None
+    return Traza(proceso, con_memoria(), **datos)
+
+
+@contextlib.contextmanager
+def usar(traza):
+    """Hace de traza la traza en curso del hilo actual mientras dure el bloque."""
+    anterior = getattr(_local, "traza", None)
+    _local.traza = traza
+    try:
+        yield traza
+    finally:
+        _local.traza = anterior
+
+
+def etapa(nombre, filas=None):
+    """Etapa de la traza en curso del hilo (o una etapa vacía si no hay traza)."""
+    traza = getattr(_local, "traza", None)
+    if traza is None:
+        return _VACIA
+    return traza.etapa(nombre, filas)
+
+
+def terminar(traza, error=None, carpeta=None):
+    """
+    Cierra la traza y la escribe como JSON en la carpeta de trazas.
+    Devuelve el resumen de una línea ('' si la traza está apagada). Un error al escribir
+    el archivo no interrumpe el proceso.
+    """
+    if traza is None:
+        return ""
+    traza.segundos = time.perf_counter() - traza._inicio
+    if traza._detener_memoria:
+        tracemalloc.stop()
+        traza._detener_memoria = False
+    carpeta = carpeta or carpeta_trazas()
+    nombre = f"{traza.fecha:%Y%m%d-%H%M%S-%f}-{traza.proceso}.json"
+    try:
+        os.makedirs(carpeta, exist_ok=True)
+        with open(os.path.join(carpeta, nombre), "w", encoding="utf-8") as f:
+            json.dump(traza.como_dict(error), f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        print(f"No se pudo guardar la traza: {e}", file=sys.stderr)
+    return traza.resumen()
@@ -1,29 +1,29 @@
-import pandas as pd
 import os
+import sys
+
+import Almacen
+
+Almacen.preparar_carpeta_datos()
 
 # Carpeta donde están los Excel
 BASE_PATH = os.path.join(os.getcwd(), "archivos")
 
-# Archivos Excel y su JSON de salida
-archivos_excel = {
-    "BASE DECATHLON GENERAL ADVANCE II.xlsx": "base_general.json",
-    "codigos_cumple.xlsx": "codigos_cumple.json",
-    "HISTORIAL_PROCESOS.xlsx": "historial.json"
-}
+# Archivos Excel y la tabla de resources/ que generan
+archivos_excel = {excel: nombre for nombre, excel in Almacen.FUENTES_EXCEL.items()}
 
-# Carpeta donde se guardarán los JSON
-RESOURCES_PATH = os.path.join(os.getcwd(), "resources")
-if not os.path.exists(RESOURCES_PATH):
-    os.makedirs(RESOURCES_PATH)
+# Con --json también se exporta cada tabla a JSON (formato anterior)
+exportar_json = "--json" in sys.argv
 
 # Procesar cada archivo
-for excel_file, json_file in archivos_excel.items():
+for excel_file, nombre in archivos_excel.items():
     excel_path = os.path.join(BASE_PATH, excel_file)  # Ruta completa al Excel
-    json_path = os.path.join(RESOURCES_PATH, json_file)  # Ruta completa al JSON
-    
+
     if os.path.exists(excel_path):
-        df = pd.read_excel(excel_path)
-        df.to_json(json_path, orient="records", force_ascii=False, indent=4)
-        print(f"{excel_file} → resources/{json_file}")
+        filas = Almacen.importar_excel(excel_path, nombre)
+        print(f"{excel_file} → resources/{nombre}{Almacen.EXTENSION} ({filas} filas)")
+        if exportar_json:
+            json_path = os.path.join(Almacen.RUTA_RECURSOS, nombre + ".json")
+            Almacen.exportar_json(nombre, json_path)
+            print(f"{excel_file} → resources/{nombre}.json")
     else:
         print(f"No se encontró el archivo: {excel_path}")
@@ -0,0 +1,51 @@
+"""
+Benchmark de carga de datos de referencia: JSON con indent=4 contra el almacén columnar.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_almacen
+"""
+import json
+import os
+import tempfile
+
+import pandas as pd
+
+import Esquema
+from Almacen import guardar_tabla, leer_tabla
+from benchmarks.datos_sinteticos import completar_catalogo, generar_catalogo, items_reporte, medir
+
+
+def tamano(ruta):
+    if os.path.isdir(ruta):
+        return sum(os.path.getsize(os.path.join(ruta, f)) for f in os.listdir(ruta))
+    return os.path.getsize(ruta)
+
+
+def cargar_json_anterior(ruta):
+    with open(ruta, "r", encoding="utf-8") as f:
+        return pd.DataFrame(json.load(f))
+
+
+def main():
+    with tempfile.TemporaryDirectory() as carpeta:
+        print(f"{'filas':>8} {'JSON (MB)':>10} {'tabla (MB)':>11} {'JSON (s)':>9} {'tabla (s)':>10} {'mmap (s)':>9}")
+        for filas in (10_000, 100_000, 300_000):
+            df = completar_catalogo(generar_catalogo(items_reporte(filas), filas))
+            ruta_json = os.path.join(carpeta, f"catalogo_{filas}.json")
+            ruta_tabla = os.path.join(carpeta, f"catalogo_{filas}.tabla")
+            df.to_json(ruta_json, orient="records", force_ascii=False, indent=4)
+            guardar_tabla(df, ruta_tabla)
+
+            t_json, df_json = medir(cargar_json_anterior, ruta_json, repeticiones=3)
+            t_tabla, df_tabla = medir(leer_tabla, ruta_tabla, False, repeticiones=3)
+            t_mmap, _ = medir(leer_tabla, ruta_tabla, True, repeticiones=3)
+            # to_json redondea los decimales a 10 dígitos; la tabla los guarda exactos.
+            # CODIGO FORMATO se lee como category (ver Esquema): se comparan sus valores
+            pd.testing.assert_frame_equal(df_json, df_tabla.assign(**{'CODIGO FORMATO': Esquema.objetos(df_tabla['CODIGO FORMATO'])}), rtol=1e-6)
+
+            print(f"{filas:>8} {tamano(ruta_json) / 1e6:10.1f} {tamano(ruta_tabla) / 1e6:11.1f} "
+                  f"{t_json:9.3f} {t_tabla:10.3f} {t_mmap:9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark del arranque de la interfaz (ProcesosV2).
+
+Mide, cada una en un proceso nuevo (arranque en frío):
+- importar ProcesosV2 (lo que pasa antes de poder crear la ventana),
+- el calentamiento en segundo plano (pandas, módulos del motor, catálogo y codigos_cumple, logo),
+- con pantalla disponible: la aplicación completa con TIPOS_MEDIR_ARRANQUE=1, que imprime
+  el tiempo hasta la primera ventana ("ventana") y hasta quedar lista para procesar ("lista").
+
+Sin pantalla (DISPLAY) solo se miden las dos primeras.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_arranque
+    python -m benchmarks.bench_arranque --repeticiones 10
+    python -m benchmarks.bench_arranque --comando "dist/Tipos de procesos.exe"
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MEDIR_IMPORTACION = (
+    "import time; inicio = time.perf_counter(); import ProcesosV2; "
+    "print(time.perf_counter() - inicio)"
+)
+MEDIR_CALENTAMIENTO = (
+    "import time, ProcesosV2; inicio = time.perf_counter(); ProcesosV2.calentar(); "
+    "print(time.perf_counter() - inicio)"
+)
+
+
+def _segundos(codigo):
+    salida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True, check=True)
+    return float(salida.stdout.strip().splitlines()[-1])
+
+
+def hay_pantalla():
+    return sys.platform == "win32" or bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
+
+def medir_aplicacion(comando):
+    """Corre la aplicación hasta que queda lista. Devuelve {'ventana': s, 'lista': s}."""
+    entorno = dict(os.environ, TIPOS_MEDIR_ARRANQUE="1")
+    salida = subprocess.run(comando, cwd=RAIZ, env=entorno, capture_output=True, text=True, timeout=120)
+    tiempos = {}
+    for linea in salida.stdout.splitlines():
+        partes = linea.split()
+        if len(partes) == 2 and partes[0] in ("ventana", "lista"):
+            tiempos[partes[0]] = float(partes[1])
+    if "lista" not in tiempos:
+        raise RuntimeError(f"La aplicación no reportó el arranque:\n{salida.stdout}\n{salida.stderr}")
+    return tiempos
+
+
+def resumen(nombre, valores):
+    print(f"{nombre:<28} mediana {statistics.median(valores):.3f} s   "
+          f"mín {min(valores):.3f} s   máx {max(valores):.3f} s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tiempo de arranque de la interfaz.")
+    parser.add_argument("--repeticiones", type=int, default=5, help="Arranques por medición (por defecto 5)")
+    parser.add_argument("--comando", nargs="+",
+                        help="Aplicación a medir (por defecto: python ProcesosV2.py); p. ej. el .exe")
+    args = parser.parse_args(argv)
+
+    resumen("importar ProcesosV2", [_segundos(MEDIR_IMPORTACION) for _ in range(args.repeticiones)])
+    resumen("calentamiento", [_segundos(MEDIR_CALENTAMIENTO) for _ in range(args.repeticiones)])
+
+    if not hay_pantalla():
+        print("Sin pantalla: no se mide el tiempo hasta la primera ventana.")
+        return 0
+    comando = args.comando or [sys.executable, "ProcesosV2.py"]
+    corridas = [medir_aplicacion(comando) for _ in range(args.repeticiones)]
+    resumen("hasta la primera ventana", [c["ventana"] for c in corridas if "ventana" in c])
+    resumen("hasta quedar lista", [c["lista"] for c in corridas])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Benchmark de la importación del catálogo (botón ACTUALIZAR CATALOGO):
+pd.read_excel completo + guardar_referencia contra Almacen.importar_excel, que lee
+fila por fila en modo de solo lectura y escribe todas las columnas por bloques.
+
+Compara tiempo, memoria máxima (tracemalloc) y verifica que el índice EAN -> CODIGO FORMATO
+que usa el motor sea el mismo y que se conserven todas las columnas para exportar. Trabaja en una carpeta temporal; no toca resources/.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_catalogo [filas]
+"""
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+import Almacen
+from benchmarks.datos_sinteticos import (
+    COLUMNAS_CATALOGO, completar_catalogo, escribir_catalogo, generar_catalogo, items_reporte, medir, medir_memoria
+)
+from Procesamiento import indexar_catalogo
+
+
+def importar_anterior(ruta_excel):
+    df = pd.read_excel(ruta_excel)
+    Almacen.guardar_referencia(df, "base_general")
+    return df
+
+
+def main(filas=50_000):
+    with tempfile.TemporaryDirectory() as carpeta:
+        Almacen.RUTA_RECURSOS = carpeta
+        ruta_excel = os.path.join(carpeta, "catalogo.xlsx")
+        escribir_catalogo(ruta_excel, completar_catalogo(generar_catalogo(items_reporte(filas), filas)))
+
+        t_anterior, df_anterior = medir(importar_anterior, ruta_excel)
+        m_anterior = medir_memoria(importar_anterior, ruta_excel)
+        indice_anterior = indexar_catalogo(df_anterior)
+
+        avances = []
+        argumentos = (ruta_excel, "base_general", lambda v, t=None: avances.append(v), 10_000)
+        t_nuevo, total = medir(Almacen.importar_excel, *argumentos)
+        m_nuevo = medir_memoria(Almacen.importar_excel, *argumentos)
+        df_nuevo = Almacen.cargar_tabla("base_general")
+        indice_nuevo = indexar_catalogo(df_nuevo)
+
+        # Los EAN vacíos no pueden cruzar con ningún ITEM y se descartan al importar (ver Esquema)
+        assert total == len(df_nuevo) == df_anterior["EAN"].notna().sum()
+        assert list(df_nuevo.columns) == ["EAN", "CODIGO FORMATO"]
+        df_completo = Almacen.leer_tabla_completa("base_general")
+        assert list(df_completo.columns) == ["EAN", "CODIGO FORMATO"] + COLUMNAS_CATALOGO
+        assert (df_completo["DESCRIPCION"].to_numpy() == df_anterior.loc[df_anterior["EAN"].notna(), "DESCRIPCION"]
+                .to_numpy()).all()
+        # Mismo resultado para todos los EAN (enteros o como texto)
+        claves = pd.Index(df_nuevo["EAN"].unique())
+        assert (indice_anterior.reindex(claves).to_numpy() == indice_nuevo.reindex(claves).to_numpy()).all()
+        # Dos corridas: el avance vuelve a empezar en la segunda
+        avances = avances[:len(avances) // 2]
+        assert avances == sorted(avances) and avances[-1] == 100
+
+        print(f"Catálogo de {filas} filas y {2 + len(COLUMNAS_CATALOGO)} columnas")
+        print(f"{'':>18} {'tiempo (s)':>11} {'memoria máx (MB)':>17}")
+        print(f"{'read_excel':>18} {t_anterior:11.2f} {m_anterior:17.1f}")
+        print(f"{'por bloques':>18} {t_nuevo:11.2f} {m_nuevo:17.1f}")
+        print(f"Avance reportado {len(avances)} veces por corrida")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
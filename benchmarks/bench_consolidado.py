@@ -0,0 +1,54 @@
+"""
+Benchmark de Procesamiento.generar_tipo_proceso_consolidado: varios reportes leídos en
+1, 2, 4... procesos (hasta el número de núcleos) y clasificados una sola vez.
+
+Verifica que el resultado sea el mismo con cualquier número de procesos y que sea igual a
+procesar cada reporte por separado y quedarse con la primera aparición de cada ITEM.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_consolidado [reportes] [filas_por_reporte]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.datos_sinteticos import generar_catalogo, generar_codigos, generar_reporte
+from Procesamiento import (
+    Referencias, generar_tipo_proceso, generar_tipo_proceso_consolidado, leer_reporte
+)
+
+
+def main(reportes=8, filas=5_000):
+    with tempfile.TemporaryDirectory() as carpeta:
+        rutas, items = [], []
+        for i in range(reportes):
+            ruta = os.path.join(carpeta, f"REPORTE {i}.xlsx")
+            items.append(generar_reporte(ruta, filas, semilla=i))
+            rutas.append(ruta)
+        items = np.concatenate(items)
+        referencias = Referencias(generar_catalogo(items), generar_codigos(items))
+
+        # Uno por uno y después unidos (lo que se hacía a mano)
+        por_separado = pd.concat([generar_tipo_proceso(leer_reporte(r), referencias) for r in rutas])
+        esperado = por_separado.drop_duplicates(subset=['ITEM']).reset_index(drop=True)
+
+        nucleos = os.cpu_count() or 1
+        niveles = sorted({1, *[p for p in (2, 4, 8, 16) if p <= nucleos], nucleos})
+        print(f"{reportes} reportes x {filas} filas, {nucleos} núcleos")
+        base = None
+        for procesos in niveles:
+            inicio = time.perf_counter()
+            df = generar_tipo_proceso_consolidado(rutas, referencias, procesos=procesos)
+            segundos = time.perf_counter() - inicio
+            pd.testing.assert_frame_equal(df, esperado)
+            base = base or segundos
+            print(f"{procesos:>3} procesos: {segundos:6.2f} s  (x{base / segundos:.1f})  {len(df)} ITEMS")
+
+
+if __name__ == "__main__":
+    argumentos = [int(a) for a in sys.argv[1:3]]
+    main(*argumentos)
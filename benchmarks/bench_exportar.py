@@ -0,0 +1,91 @@
+"""
+Benchmark de Formato.exportar_excel: escritura anterior (to_excel + load_workbook + segundo
+guardado) contra la escritura en una sola pasada en modo de solo escritura.
+
+Verifica que ambos archivos tengan los mismos valores, anchos de columna y estilo de encabezado.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_exportar
+"""
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.styles import Font, Alignment, PatternFill
+from openpyxl.utils import get_column_letter
+
+from benchmarks.datos_sinteticos import medir
+from Formato import exportar_excel
+
+TIPOS = ['ADHERIBLE', 'COSTURA', 'SIN NORMA', 'CUMPLE', '']
+NORMAS = ['NOM-050-SCFI-2004', '004', 'SIN NORMA', '015', np.nan]
+
+
+def exportar_excel_anterior(df, ruta_salida):
+    """Copia de la versión anterior de Formato.exportar_excel."""
+    df.to_excel(ruta_salida, index=False, sheet_name="Tipo de Proceso")
+    wb = load_workbook(ruta_salida)
+    ws = wb.active
+    header_font = Font(bold=True, color="000000")
+    header_fill = PatternFill(start_color="ADD8E6", end_color="ADD8E6", fill_type="solid")
+    header_alignment = Alignment(horizontal="center", vertical="center")
+    for cell in ws[1]:
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.alignment = header_alignment
+    for col_num, column_cells in enumerate(ws.columns, 1):
+        max_length = 0
+        col_letter = get_column_letter(col_num)
+        for cell in column_cells:
+            try:
+                if cell.value:
+                    max_length = max(max_length, len(str(cell.value)))
+            except:
+                pass
+        ws.column_dimensions[col_letter].width = max_length + 2
+    wb.save(ruta_salida)
+
+
+def generar_resultado(filas, semilla=0):
+    rng = np.random.default_rng(semilla)
+    return pd.DataFrame({
+        'ITEM': rng.integers(100_000, 9_999_999, filas),
+        'TIPO DE PROCESO': rng.choice(TIPOS, filas),
+        'NORMA': rng.choice(np.array(NORMAS, dtype=object), filas),
+        'CRITERIO': rng.choice(['', 'REVISADO'], filas),
+        'DESCRIPCION': [f"ARTICULO DEPORTIVO {n}" for n in rng.integers(0, 10 ** rng.integers(1, 6), filas)],
+    })
+
+
+def describir(ruta):
+    wb = load_workbook(ruta)
+    ws = wb.active
+    encabezado = [(c.value, c.font.b, c.fill.fgColor.rgb, c.alignment.horizontal, c.border.left.style)
+                  for c in ws[1]]
+    anchos = [ws.column_dimensions[get_column_letter(i)].width for i in range(1, ws.max_column + 1)]
+    valores = [tuple(c.value for c in fila) for fila in ws.iter_rows(min_row=2)]
+    return ws.title, encabezado, anchos, valores
+
+
+def main():
+    with tempfile.TemporaryDirectory() as carpeta:
+        df = generar_resultado(2_000)
+        anterior = os.path.join(carpeta, "anterior.xlsx")
+        nuevo = os.path.join(carpeta, "nuevo.xlsx")
+        exportar_excel_anterior(df, anterior)
+        exportar_excel(df, nuevo)
+        assert describir(anterior) == describir(nuevo), "El archivo nuevo no coincide con el anterior"
+        print("Mismos valores, anchos y encabezado que la versión anterior\n")
+
+        print(f"{'filas':>8} {'anterior (s)':>13} {'una pasada (s)':>15}")
+        for filas in (10_000, 100_000):
+            df = generar_resultado(filas)
+            t_anterior, _ = medir(exportar_excel_anterior, df, anterior)
+            t_nuevo, _ = medir(exportar_excel, df, nuevo)
+            print(f"{filas:>8} {t_anterior:13.2f} {t_nuevo:15.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark de la actualización de codigos_cumple (BaseDatos.comparar_codigos + fusionar_codigos)
+con un archivo de 50 mil ITEMS: mitad existentes (la mitad de ellos con otra OBSERVACION) y mitad nuevos.
+
+Usa una base de datos temporal; no toca resources/procesos.db.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_fusion_codigos
+"""
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from BaseDatos import cargar_codigos, comparar_codigos, fusionar_codigos, guardar_codigos, obtener_codigos
+
+# ITEMS fuera del rango de los reales, para no chocar con lo que se importa de archivos/
+PRIMER_ITEM = 90_000_000
+
+
+def generar(filas, semilla=0):
+    rng = np.random.default_rng(semilla)
+    existentes = pd.DataFrame({
+        'ITEM': np.arange(PRIMER_ITEM, PRIMER_ITEM + filas),
+        'OBSERVACIONES': rng.choice(['CUMPLE', 'IMPORTADOR', 'DENOMINACION', None], filas),
+        'CRITERIO': rng.choice(['', 'REVISADO'], filas),
+    })
+    # La segunda mitad del archivo son ITEMS nuevos; de la primera, uno de cada dos cambia
+    nuevo = pd.DataFrame({
+        'ITEM': np.arange(PRIMER_ITEM + filas // 2, PRIMER_ITEM + filas // 2 + filas),
+        'OBSERVACIONES': 'CUMPLE',
+        'CRITERIO': '',
+    })
+    nuevo.loc[:filas // 2 - 1, 'OBSERVACIONES'] = existentes['OBSERVACIONES'].iloc[filas // 2:].to_numpy()
+    nuevo.loc[:filas // 2 - 1:2, 'OBSERVACIONES'] = 'OBSERVACION NUEVA'
+    return existentes, nuevo
+
+
+def main(filas=50_000):
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "procesos.db")
+        existentes, nuevo = generar(filas)
+        guardar_codigos(existentes, ruta=ruta)
+        total_antes = len(cargar_codigos(ruta))
+
+        inicio = time.perf_counter()
+        diferencias = comparar_codigos(nuevo, ruta=ruta)
+        t_comparar = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        agregados, actualizados, total = fusionar_codigos(diferencias["nuevos"], diferencias["cambios"], ruta=ruta)
+        t_fusionar = time.perf_counter() - inicio
+
+        assert agregados == filas // 2 and total == total_antes + agregados
+        assert actualizados == len(diferencias["cambios"]) >= filas // 4
+        assert diferencias["sin_cambios"] + len(diferencias["cambios"]) == filas // 2
+        muestra = obtener_codigos([PRIMER_ITEM + filas // 2], ruta=ruta)
+        assert muestra[0][1] == 'OBSERVACION NUEVA'
+
+        print(f"Archivo de {filas} ITEMS: {agregados} nuevos, {len(diferencias['cambios'])} con otra "
+              f"OBSERVACION, {diferencias['sin_cambios']} sin cambios")
+        print(f"comparar: {t_comparar:.2f} s   fusionar: {t_fusionar:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
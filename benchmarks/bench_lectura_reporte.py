@@ -0,0 +1,61 @@
+"""
+Benchmark de la lectura del REPORTE DE MERCANCIA: pd.read_excel completo (como antes)
+contra Procesamiento.leer_reporte, que lee primero los encabezados y después solo las
+columnas que usa el proceso, con openpyxl y con calamine (si python-calamine está instalado).
+
+Verifica que los ITEMS y la tabla de primeras apariciones (NORMA, DESCRIPCION, CRITERIO)
+sean iguales con todas las lecturas.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_lectura_reporte [filas]
+"""
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.datos_sinteticos import encabezados, generar_reporte, medir
+from Procesamiento import MOTOR_EXCEL, detectar_columnas, extraer_primeras_ocurrencias, leer_reporte
+
+# Un reporte FH real trae varias decenas de columnas; el proceso usa cuatro
+COLUMNAS_EXTRA = 36
+
+
+def resumir(df):
+    columnas = detectar_columnas(df.columns)
+    items = pd.to_numeric(df[columnas['num_parte']], errors='coerce').dropna().astype(int).unique()
+    primeras = extraer_primeras_ocurrencias(
+        df, columnas['num_parte'], columnas['norma'], columnas['descripcion'], columnas['criterio']
+    )
+    return items, primeras
+
+
+def main(filas=20_000):
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "REPORTE.xlsx")
+        generar_reporte(ruta, filas, columnas_extra=COLUMNAS_EXTRA)
+
+        lecturas = [("read_excel completo", lambda: pd.read_excel(ruta)),
+                    ("columnas (openpyxl)", lambda: leer_reporte(ruta, motor=None))]
+        if MOTOR_EXCEL == "calamine":
+            lecturas.append(("columnas (calamine)", lambda: leer_reporte(ruta, motor="calamine")))
+        else:
+            print("python-calamine no está instalado; solo se compara con openpyxl")
+
+        referencia = None
+        print(f"Reporte de {filas} filas x {len(encabezados('FH')) + COLUMNAS_EXTRA} columnas")
+        for nombre, leer in lecturas:
+            segundos, df = medir(leer)
+            items, primeras = resumir(df)
+            if referencia is None:
+                referencia = (items, primeras)
+            else:
+                np.testing.assert_array_equal(items, referencia[0])
+                pd.testing.assert_frame_equal(primeras, referencia[1])
+            print(f"{nombre:>22}: {segundos:6.2f} s  ({df.shape[1]} columnas leídas)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
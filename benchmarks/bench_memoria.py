@@ -0,0 +1,140 @@
+"""
+Benchmark de memoria del esquema tipado (Esquema): catálogo, codigos_cumple, sus índices y el
+TIPO DE PROCESO, contra las tablas de objetos que devolvían antes los cargadores (EAN e ITEM como
+texto, enumeraciones como un str por fila).
+
+La memoria es la que queda retenida por cada estructura (tracemalloc, después de gc); la de los
+índices incluye su tabla hash, que pandas construye en el primer cruce. Trabaja en una carpeta
+temporal; no toca resources/.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_memoria
+    python -m benchmarks.bench_memoria --catalogo 1000000 --items 200000
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import Almacen
+import BaseDatos
+import Esquema
+from benchmarks.bench_pipeline import preparar_carpeta
+from benchmarks.datos_sinteticos import CRITERIOS, NORMAS, generar_catalogo, generar_codigos, items_reporte
+from Procesamiento import aplicar_reglas, indexar_catalogo, indexar_criterio, resolver_items
+
+
+# --- Cargadores e índices anteriores (tablas de objetos, llaves como texto) ---
+def catalogo_anterior(df_base):
+    """Como leía Almacen el catálogo: EAN como texto (un str por fila) y CODIGO FORMATO como objetos."""
+    return pd.DataFrame({
+        'EAN': np.array([str(v) for v in df_base['EAN']], dtype=object),
+        'CODIGO FORMATO': Esquema.objetos(df_base['CODIGO FORMATO']),
+    })
+
+
+def indice_catalogo_anterior(df_base):
+    indice = pd.Series(df_base['CODIGO FORMATO'].to_numpy(dtype=object), index=df_base['EAN'].astype(str))
+    return indice[~indice.index.duplicated(keep='first')]
+
+
+def indice_criterio_anterior(df_codigos_cumple):
+    obs = df_codigos_cumple['OBSERVACIONES'].map(str).str.upper().str.strip()
+    criterio = df_codigos_cumple['CRITERIO'].map(str).str.strip()
+    criterio = criterio.where(~obs.str.contains('CUMPLE', regex=False), 'CUMPLE')
+    indice = pd.Series(criterio.to_numpy(dtype=object), index=df_codigos_cumple['ITEM'].astype(str))
+    return indice[~indice.index.duplicated(keep='first')]
+
+
+def resultado_tipado(df_cruces):
+    return Esquema.aplicar(aplicar_reglas(df_cruces))
+
+
+# --- Medición ---
+def retenida(funcion, *args):
+    """(resultado, MB que quedan en memoria mientras se conserva el resultado)."""
+    gc.collect()
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    resultado = funcion(*args)
+    gc.collect()
+    despues = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return resultado, (despues - antes) / 2 ** 20
+
+
+def con_tabla_hash(indexar):
+    """El índice ya con su tabla hash (la construye el primer get_indexer)."""
+    def construir(df):
+        indice = indexar(df)
+        indice.index.get_indexer(indice.index[:1])
+        return indice
+    return construir
+
+
+def primeras_sinteticas(items, semilla=0):
+    """Tabla de primeras apariciones (ITEM -> NORMA, DESCRIPCION, CRITERIO) sin pasar por Excel."""
+    rng = np.random.default_rng(semilla)
+    distintos = pd.unique(items)
+    return pd.DataFrame({
+        'NORMA': rng.choice(NORMAS, len(distintos)),
+        'DESCRIPCION': [f"ARTICULO DEPORTIVO {i}" for i in distintos],
+        'CRITERIO': rng.choice(CRITERIOS, len(distintos)),
+    }, index=pd.Index(distintos, name='ITEM'))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memoria del esquema tipado contra las tablas de objetos.")
+    parser.add_argument("--catalogo", type=int, default=500_000, help="Filas del catálogo (por defecto 500000)")
+    parser.add_argument("--items", type=int, default=100_000, help="Filas del reporte (por defecto 100000)")
+    args = parser.parse_args(argv)
+
+    items = items_reporte(args.items)
+    with tempfile.TemporaryDirectory() as raiz:
+        preparar_carpeta(os.path.join(raiz, "datos"), generar_catalogo(items, args.catalogo), generar_codigos(items))
+
+        filas = []
+        df_base, m_base = retenida(Almacen.cargar_tabla, "base_general")
+        df_base_ant, m_base_ant = retenida(catalogo_anterior, df_base)
+        filas.append(("catálogo", len(df_base), m_base_ant, m_base))
+
+        indice, m_indice = retenida(con_tabla_hash(indexar_catalogo), df_base)
+        _, m_indice_ant = retenida(con_tabla_hash(indice_catalogo_anterior), df_base_ant)
+        filas.append(("índice EAN", len(indice), m_indice_ant, m_indice))
+
+        df_codigos, m_codigos = retenida(BaseDatos.cargar_codigos, None, False, True)
+        df_codigos_ant, m_codigos_ant = retenida(BaseDatos.cargar_codigos)
+        filas.append(("codigos_cumple", len(df_codigos), m_codigos_ant, m_codigos))
+
+        criterio, m_criterio = retenida(con_tabla_hash(indexar_criterio), df_codigos)
+        _, m_criterio_ant = retenida(con_tabla_hash(indice_criterio_anterior), df_codigos_ant)
+        filas.append(("índice ITEM", len(criterio), m_criterio_ant, m_criterio))
+
+        # Mismos cruces para los dos: solo cambia el tipo de las columnas del resultado
+        primeras = primeras_sinteticas(items)
+        df_cruces = pd.DataFrame({
+            'ITEM': primeras.index.to_numpy(),
+            'TIPO DE PROCESO': resolver_items(primeras.index, indice),
+            'NORMA': primeras['NORMA'].to_numpy(dtype=object),
+            'CRITERIO': resolver_items(primeras.index, criterio),
+            'DESCRIPCION': primeras['DESCRIPCION'].to_numpy(dtype=object),
+        })
+        df_result, m_result = retenida(resultado_tipado, df_cruces)
+        _, m_result_ant = retenida(aplicar_reglas, df_cruces)
+        filas.append(("TIPO DE PROCESO", len(df_result), m_result_ant, m_result))
+
+    total = ("total", None, sum(f[2] for f in filas), sum(f[3] for f in filas))
+    print(f"{'':<16} {'filas':>9} {'anterior (MB)':>14} {'tipado (MB)':>12} {'reducción':>10}")
+    for nombre, n, anterior, tipado in filas + [total]:
+        reduccion = f"{100 * (1 - tipado / anterior):9.0f}%" if anterior else f"{'-':>10}"
+        print(f"{nombre:<16} {'' if n is None else n:>9} {anterior:14.1f} {tipado:12.1f} {reduccion}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
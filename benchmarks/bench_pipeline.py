@@ -0,0 +1,193 @@
+"""
+Benchmark completo del TIPO DE PROCESO con datos sintéticos (sin interfaz y sin tocar resources/).
+
+Por cada formato (FH, MIMPO) y tamaño de reporte mide por separado cada etapa de procesar_reporte:
+carga de referencias (catálogo + codigos_cumple), lectura del reporte, primeras apariciones,
+cruces contra las referencias, reglas, exportar_excel y actualización del HISTORIAL; además la
+clasificación con la caché vacía y con la caché llena (con menos de Procesamiento.MINIMO_CACHE
+ITEMS la caché no se usa y las dos miden la clasificación directa). Verifica que el resultado por
+etapas sea igual al de generar_tipo_proceso.
+
+Los resultados se escriben en JSON (con el commit, versiones y parámetros) para comparar
+entre versiones; con --comparar se muestra la razón contra un archivo anterior.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_pipeline
+    python -m benchmarks.bench_pipeline --filas 1000 10000 100000 1000000 --duplicados 0.7
+    python -m benchmarks.bench_pipeline --salida nuevo.json --comparar anterior.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+import Almacen
+import BaseDatos
+import Esquema
+import Procesamiento
+from benchmarks.datos_sinteticos import generar_catalogo, generar_codigos, generar_reporte
+from Formato import exportar_excel
+from Procesamiento import (
+    aplicar_reglas, cargar_referencias, clasificar_con_cache, generar_tipo_proceso, leer_reporte,
+    primeras_ocurrencias, resolver_items
+)
+
+ETAPAS = ["carga_referencias", "lectura_reporte", "primeras_ocurrencias", "cruces", "reglas",
+          "exportar_excel", "historial", "cache_fria", "cache_caliente"]
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def preparar_carpeta(carpeta, df_catalogo, df_codigos):
+    """Apunta Almacen y BaseDatos a una carpeta vacía y guarda ahí el catálogo y codigos_cumple."""
+    os.makedirs(carpeta)
+    Almacen.RUTA_RECURSOS = carpeta
+    Almacen.FUENTES_EXCEL = {}
+    BaseDatos.RUTA_BD = os.path.join(carpeta, "procesos.db")
+    for nombre in ("HISTORIAL_EXCEL", "CODIGOS_EXCEL", "CODIGOS_JSON"):
+        setattr(BaseDatos, nombre, os.path.join(carpeta, "no_existe"))
+    Almacen.guardar_referencia(df_catalogo, "base_general")
+    BaseDatos.guardar_codigos(df_codigos)
+    # Que la carga de referencias se mida en frío
+    Almacen.invalidar("base_general")
+    Procesamiento._indices.clear()
+
+
+def medir_etapas(ruta_reporte, carpeta):
+    """Una corrida completa, etapa por etapa. Devuelve ({etapa: segundos}, df_result)."""
+    tiempos = {}
+
+    def medir(etapa, funcion, *args, **kwargs):
+        inicio = time.perf_counter()
+        resultado = funcion(*args, **kwargs)
+        tiempos[etapa] = time.perf_counter() - inicio
+        return resultado
+
+    referencias = medir("carga_referencias", cargar_referencias)
+    df_reporte = medir("lectura_reporte", leer_reporte, ruta_reporte)
+    primeras = medir("primeras_ocurrencias", primeras_ocurrencias, df_reporte)
+
+    def cruces():
+        items = primeras.index.to_numpy()
+        return pd.DataFrame({
+            'ITEM': items,
+            'TIPO DE PROCESO': resolver_items(items, referencias.indice_catalogo),
+            'NORMA': primeras['NORMA'].to_numpy(dtype=object),
+            'CRITERIO': resolver_items(items, referencias.indice_criterio),
+            'DESCRIPCION': primeras['DESCRIPCION'].to_numpy(dtype=object),
+        })
+
+    df_cruces = medir("cruces", cruces)
+    df_result = medir("reglas", lambda df: Esquema.aplicar(aplicar_reglas(df)), df_cruces)
+    medir("exportar_excel", exportar_excel, df_result, os.path.join(carpeta, "TIPO DE PROCESO.xlsx"))
+    medir("historial", BaseDatos.registrar_historial, df_result)
+
+    df_fria, _ = medir("cache_fria", clasificar_con_cache, primeras, referencias)
+    df_caliente, _ = medir("cache_caliente", clasificar_con_cache, primeras, referencias)
+
+    esperado = generar_tipo_proceso(df_reporte, referencias, usar_cache=False)
+    for df in (df_result, df_fria, df_caliente):
+        pd.testing.assert_frame_equal(df, esperado)
+    return tiempos, df_result
+
+
+def correr(formatos, tamanos, duplicados, repeticiones, semilla=0):
+    resultados = []
+    with tempfile.TemporaryDirectory() as raiz:
+        for formato in formatos:
+            for filas in tamanos:
+                ruta = os.path.join(raiz, f"REPORTE {formato} {filas}.xlsx")
+                items = generar_reporte(ruta, filas, formato, duplicados, semilla=semilla)
+                df_catalogo = generar_catalogo(items, filas, semilla=semilla)
+                df_codigos = generar_codigos(items, semilla=semilla)
+
+                # De cada etapa se queda la corrida más rápida
+                mejores = {}
+                for repeticion in range(repeticiones):
+                    carpeta = os.path.join(raiz, f"{formato}-{filas}-{repeticion}")
+                    preparar_carpeta(carpeta, df_catalogo, df_codigos)
+                    tiempos, df_result = medir_etapas(ruta, carpeta)
+                    for etapa, segundos in tiempos.items():
+                        mejores[etapa] = min(segundos, mejores.get(etapa, segundos))
+
+                resultado = {
+                    "formato": formato,
+                    "filas": filas,
+                    "duplicados": duplicados,
+                    "items": len(df_result),
+                    "catalogo": len(df_catalogo),
+                    "codigos_cumple": len(df_codigos),
+                    "etapas": {etapa: round(mejores[etapa], 6) for etapa in ETAPAS},
+                }
+                resultados.append(resultado)
+                imprimir(resultado)
+    return resultados
+
+
+def imprimir(resultado):
+    etapas = resultado["etapas"]
+    print(f"{resultado['formato']:<6} {resultado['filas']:>8} filas ({resultado['items']} ITEMS)  "
+          + "  ".join(f"{etapa} {segundos:.3f}" for etapa, segundos in etapas.items()))
+
+
+def comparar(resultados, ruta_anterior):
+    """Razón nuevo / anterior por etapa para los casos (formato, filas, duplicados) que estén en ambos archivos."""
+    with open(ruta_anterior, "r", encoding="utf-8") as f:
+        anterior = json.load(f)
+    casos = {(r["formato"], r["filas"], r["duplicados"]): r["etapas"] for r in anterior["resultados"]}
+    print(f"\nContra {ruta_anterior} (commit {anterior.get('commit')}); >1 es más lento:")
+    for resultado in resultados:
+        previas = casos.get((resultado["formato"], resultado["filas"], resultado["duplicados"]))
+        if previas is None:
+            continue
+        razones = [f"{etapa} x{segundos / previas[etapa]:.2f}"
+                   for etapa, segundos in resultado["etapas"].items() if previas.get(etapa)]
+        print(f"{resultado['formato']:<6} {resultado['filas']:>8}  " + "  ".join(razones))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark por etapas del TIPO DE PROCESO con datos sintéticos.")
+    parser.add_argument("--filas", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                        help="Tamaños de reporte (filas); también es el tamaño del catálogo")
+    parser.add_argument("--formatos", nargs="+", default=["FH", "MIMPO"], help="Formatos de reporte")
+    parser.add_argument("--duplicados", type=float, default=0.5,
+                        help="Fracción de filas con un ITEM repetido (0 a <1, por defecto 0.5)")
+    parser.add_argument("--repeticiones", type=int, default=1, help="Corridas por caso (se toma la mejor)")
+    parser.add_argument("--salida", default="resultados_pipeline.json", help="Archivo JSON de resultados")
+    parser.add_argument("--comparar", metavar="JSON_ANTERIOR", help="Resultados anteriores para comparar")
+    args = parser.parse_args(argv)
+
+    resultados = correr(args.formatos, args.filas, args.duplicados, args.repeticiones)
+    datos = {
+        "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "motor_excel": Procesamiento.MOTOR_EXCEL or "openpyxl",
+        "parametros": {"duplicados": args.duplicados, "repeticiones": args.repeticiones},
+        "resultados": resultados,
+    }
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(datos, f, ensure_ascii=False, indent=2)
+    print(f"\nResultados: {args.salida}")
+
+    if args.comparar:
+        comparar(resultados, args.comparar)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
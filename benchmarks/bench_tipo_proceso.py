@@ -0,0 +1,53 @@
+"""
+Benchmark de la etapa 2. TIPO DE PROCESO.
+
+Compara el recorrido anterior (una máscara sobre todo el catálogo por ITEM)
+contra el índice EAN -> CODIGO FORMATO con cruce por lotes.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_tipo_proceso
+"""
+from benchmarks.datos_sinteticos import generar_catalogo, items_reporte, medir
+from Procesamiento import indexar_catalogo, resolver_items
+
+
+def metodo_anterior(items, df_base):
+    df_base = df_base.copy()
+    df_base['EAN'] = df_base['EAN'].astype(str)
+    tipo_proceso = []
+    for item in items:
+        match = df_base[df_base['EAN'] == str(item)]
+        tipo = match.iloc[0]['CODIGO FORMATO'] if not match.empty else ''
+        tipo_proceso.append(tipo)
+    return tipo_proceso
+
+
+def metodo_indexado(items, df_base):
+    return resolver_items(items, indexar_catalogo(df_base))
+
+
+def main():
+    # La mitad de los ITEMS están en el catálogo; lo completan hasta 200 mil filas EAN de otros artículos
+    df_base = generar_catalogo(items_reporte(200_000, duplicados=0), 200_000, cobertura=0.5)
+
+    t_indice, indice = medir(indexar_catalogo, df_base)
+    print(f"Índice del catálogo ({len(df_base)} filas): {t_indice:.4f} s\n")
+
+    print(f"{'ITEMS':>8} {'anterior (s)':>14} {'indexado (s)':>14} {'cruce (s)':>12} {'ms / 1k items':>14}")
+    for total in (500, 1_000, 2_000, 10_000, 50_000, 100_000):
+        items = items_reporte(total, semilla=1)
+        t_nuevo, nuevo = medir(metodo_indexado, items, df_base)
+        t_cruce, _ = medir(resolver_items, items, indice)
+
+        if total <= 2_000:
+            t_anterior, anterior = medir(metodo_anterior, items, df_base)
+            assert list(nuevo) == anterior, "El índice no coincide con el método anterior"
+            anterior_txt = f"{t_anterior:14.3f}"
+        else:
+            anterior_txt = f"{'-':>14}"
+
+        print(f"{total:>8} {anterior_txt} {t_nuevo:14.4f} {t_cruce:12.4f} {t_cruce / total * 1e6:14.3f}")
+
+
+if __name__ == "__main__":
+    main()
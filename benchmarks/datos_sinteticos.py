@@ -0,0 +1,156 @@
+"""
+Datos sintéticos para los benchmarks: REPORTES DE MERCANCIA (FH y MIMPO), catálogo
+BASE DECATHLON y codigos_cumple con el tamaño y la proporción de ITEMS repetidos que se pida,
+y medir() para tomar los tiempos. Todos los benchmarks generan sus datos aquí, así que
+miden la misma forma de datos.
+
+Los encabezados de los reportes se toman del registro de formatos (Procesamiento.cargar_formatos),
+así que cualquier formato registrado ahí se puede generar.
+"""
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+from Procesamiento import cargar_formatos
+
+ITEM_INICIAL = 1_000_000
+
+# Valores reales de NORMA (incluye los que disparan cada regla) y de CODIGO FORMATO
+NORMAS = np.array(['004', 'NOM-004-SE-2021', 'NOM-050-SCFI-2004', 'NOM-015-SCFI-2007', '015', '020',
+                   'NOM004TEXX', 'NOM-020-SCFI-1997', '024', '235', '0', 'N/D', '', np.nan], dtype=object)
+CODIGOS_FORMATO = np.array(['NOM004', 'NOM004TEXX', 'NOM020INS', 'NOM050', 'NOM015', 'SIN NORMA', '', None],
+                           dtype=object)
+OBSERVACIONES = np.array(['CUMPLE', 'NO CUMPLE', 'REVISAR ETIQUETA', None], dtype=object)
+CRITERIOS = np.array(['', 'C', 'NO CUMPLE', 'ETIQUETA', None], dtype=object)
+# Columnas del BASE DECATHLON real que el motor no usa (solo se exportan)
+COLUMNAS_CATALOGO = ["DESCRIPCION", "MARCA", "PAIS ORIGEN", "FRACCION", "PESO", "PRECIO", "PROVEEDOR", "DEPORTE"]
+
+
+def encabezados(formato):
+    """Columnas (num_parte, descripcion, norma, criterio) del formato, con el primer nombre de cada campo."""
+    for registrado in cargar_formatos():
+        if registrado['nombre'] == formato:
+            return [registrado[campo][0] for campo in ('num_parte', 'descripcion', 'norma', 'criterio')]
+    raise ValueError(f"Formato de reporte no registrado: {formato}")
+
+
+def items_reporte(filas, duplicados=0.5, semilla=0):
+    """
+    ITEMS de un reporte: filas * (1 - duplicados) ITEMS distintos y el resto repeticiones
+    de ellos, en orden aleatorio. duplicados=0 da un ITEM por fila.
+    """
+    if not 0 <= duplicados < 1:
+        raise ValueError("duplicados debe estar entre 0 y 1 (sin incluir 1)")
+    rng = np.random.default_rng(semilla)
+    unicos = max(1, round(filas * (1 - duplicados)))
+    distintos = np.arange(ITEM_INICIAL, ITEM_INICIAL + unicos, dtype=np.int64)
+    items = np.concatenate([distintos, rng.choice(distintos, filas - unicos)])
+    rng.shuffle(items)
+    return items
+
+
+def generar_reporte(ruta, filas, formato="FH", duplicados=0.5, columnas_extra=8, semilla=0):
+    """
+    Escribe un REPORTE DE MERCANCIA del formato indicado y devuelve sus ITEMS.
+    Las columnas del proceso van en medio de columnas_extra columnas que el proceso no usa.
+    """
+    rng = np.random.default_rng(semilla)
+    items = items_reporte(filas, duplicados, semilla)
+    normas = rng.choice(NORMAS, filas)
+    criterios = rng.choice(CRITERIOS, filas)
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Reporte")
+    antes = columnas_extra // 2
+    ws.append([f"CAMPO {i}" for i in range(antes)] + encabezados(formato)
+              + [f"CAMPO {i}" for i in range(antes, columnas_extra)])
+    relleno_antes = [f"VALOR {i}" for i in range(antes)]
+    for i in range(filas):
+        norma = normas[i]
+        ws.append(relleno_antes + [int(items[i]), f"ARTICULO DEPORTIVO {items[i]}",
+                                   None if pd.isna(norma) else norma, criterios[i]]
+                  + [i * 1.5] * (columnas_extra - antes))
+    wb.save(ruta)
+    return items
+
+
+def generar_catalogo(items, filas=None, cobertura=0.9, semilla=0):
+    """
+    Catálogo EAN / CODIGO FORMATO con filas renglones: una fracción cobertura de los ITEMS
+    indicados (el EAN es el ITEM) y el resto EAN que no están en el reporte.
+    """
+    rng = np.random.default_rng(semilla)
+    distintos = np.unique(items)
+    cubiertos = rng.choice(distintos, round(len(distintos) * cobertura), replace=False)
+    filas = len(cubiertos) if filas is None else max(filas, len(cubiertos))
+    otros = np.arange(10 ** 12, 10 ** 12 + filas - len(cubiertos), dtype=np.int64)
+    eans = np.concatenate([cubiertos, otros])
+    rng.shuffle(eans)
+    return pd.DataFrame({'EAN': eans.astype(str), 'CODIGO FORMATO': rng.choice(CODIGOS_FORMATO, len(eans))})
+
+
+def completar_catalogo(df_catalogo, semilla=0):
+    """Agrega al catálogo las COLUMNAS_CATALOGO, como en el BASE DECATHLON real."""
+    rng = np.random.default_rng(semilla)
+    filas = len(df_catalogo)
+    posiciones = np.arange(filas)
+    return df_catalogo.assign(**{
+        "DESCRIPCION": [f"ARTICULO DEPORTIVO {i}" for i in range(filas)],
+        "MARCA": "DECATHLON",
+        "PAIS ORIGEN": rng.choice(["CHINA", "VIETNAM", "INDIA", "MEXICO"], filas),
+        "FRACCION": "61091001",
+        "PESO": (posiciones % 500) / 10,
+        "PRECIO": rng.random(filas) * 1000,
+        "PROVEEDOR": [f"PROV {i % 300}" for i in range(filas)],
+        "DEPORTE": "RUNNING",
+    })
+
+
+def escribir_catalogo(ruta, df_catalogo):
+    """
+    Escribe el catálogo como el Excel que se importa con ACTUALIZAR CATALOGO: algunos EAN
+    vacíos o como texto, igual que en el archivo real, y el resto como número.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Hoja1")
+    ws.append(list(df_catalogo.columns))
+    for i, fila in enumerate(df_catalogo.itertuples(index=False)):
+        ean = None if i % 997 == 0 else (str(fila[0]) if i % 101 == 0 else int(fila[0]))
+        ws.append([ean] + [None if pd.isna(v) else v for v in fila[1:]])
+    wb.save(ruta)
+
+
+def generar_codigos(items, fraccion=0.3, semilla=0):
+    """codigos_cumple con una fracción de los ITEMS distintos indicados."""
+    rng = np.random.default_rng(semilla)
+    distintos = np.unique(items)
+    elegidos = np.sort(rng.choice(distintos, round(len(distintos) * fraccion), replace=False))
+    return pd.DataFrame({
+        'ITEM': elegidos,
+        'OBSERVACIONES': rng.choice(OBSERVACIONES, len(elegidos)),
+        'CRITERIO': rng.choice(CRITERIOS, len(elegidos)),
+    })
+
+
+def medir(funcion, *args, repeticiones=1, **kwargs):
+    """Mejor tiempo (s) de repeticiones corridas de funcion y el resultado de la última."""
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion(*args, **kwargs)
+        segundos = time.perf_counter() - inicio
+        mejor = segundos if mejor is None else min(mejor, segundos)
+    return mejor, resultado
+
+
+def medir_memoria(funcion, *args, **kwargs):
+    """Memoria máxima (MB) de una corrida con tracemalloc, que la hace más lenta: se mide aparte del tiempo."""
+    tracemalloc.start()
+    try:
+        funcion(*args, **kwargs)
+        return tracemalloc.get_traced_memory()[1] / 2 ** 20
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,156 @@
+"""
+Verificación de salida dorada para Procesamiento.aplicar_reglas.
+
+Ejecuta las reglas anteriores (apply por fila + iterrows) y las reglas por
+columnas sobre los mismos datos y compara el resultado fila por fila.
+También mide el tiempo de ambas.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.verificar_reglas
+"""
+import itertools
+import time
+
+import numpy as np
+import pandas as pd
+
+from Procesamiento import (
+    NORMAS_ADHERIBLE, NORMAS_COSTURA, NORMAS_VALIDAS, aplicar_reglas
+)
+
+TIPOS = ['', 'NOM004', 'NOM004TEXX', 'NOM020INS', 'NOM015', 'NOM050', 'NOM024', '0',
+         'CUMPLE', np.nan, None]
+NORMAS = ['', '0', 0, 'N/D', '004', 'NOM-004-SE-2021', 'NOM-004-TEXX', '020', 'NOM-020-SCFI-1997',
+          '015', 'NOM-015-SCFI-2007', '050', 'NOM-050-SCFI-2004', 'NOM-024-SCFI-2013', '141',
+          'NOM-141-SSA1/SCFI-2012', '003', '235', ' 015 ', 'NOM-999', np.nan, None]
+CRITERIOS = ['', 'CUMPLE', 'NO CUMPLE', 'cumple', 'C', 'N/D', 'nan', 'REVISADO', 'IMPORTADOR',
+             ' no cumple ', 'DENOMINACION', np.nan]
+
+
+def reglas_anteriores(df_result):
+    """Copia literal de las reglas fila por fila de procesar_reporte."""
+    df_result = df_result.copy()
+
+    def contiene_numero(texto, lista_numeros):
+        texto = str(texto)
+        return any(n in texto for n in lista_numeros)
+
+    def modificar_tipo_proceso(row):
+        norma_val = str(row['NORMA'])
+        tipo = str(row['TIPO DE PROCESO'])
+        if 'NOM004TEXX' in tipo or 'TEXX' in norma_val:
+            return 'ADHERIBLE'
+        if 'NOM004' in tipo or '004' in norma_val:
+            return 'COSTURA'
+        if 'NOM020INS' in tipo or 'NOM-020-SCFI-1997' in norma_val:
+            return 'ADHERIBLE'
+        if contiene_numero(norma_val, NORMAS_ADHERIBLE):
+            return 'ADHERIBLE'
+        if contiene_numero(norma_val, NORMAS_COSTURA):
+            return 'COSTURA'
+        if norma_val == '0':
+            return 'SIN NORMA'
+        if norma_val == 'N/D':
+            return ''
+        return tipo
+
+    df_result['TIPO DE PROCESO'] = df_result.apply(modificar_tipo_proceso, axis=1)
+
+    def modificar_norma(norma_val):
+        if str(norma_val) == '0':
+            return 'SIN NORMA'
+        elif str(norma_val) == 'N/D':
+            return ''
+        return norma_val
+    df_result['NORMA'] = df_result['NORMA'].apply(modificar_norma)
+
+    def modificar_criterio(crit_val):
+        crit = str(crit_val).strip().upper()
+        if 'NO CUMPLE' in crit:
+            return crit_val
+        if any(palabra in crit for palabra in ['CUMPLE', 'C']):
+            return 'CUMPLE'
+        return crit_val
+    df_result['CRITERIO'] = df_result['CRITERIO'].apply(modificar_criterio)
+
+    for idx, row in df_result.iterrows():
+        tipo = str(row['TIPO DE PROCESO']).strip() if not pd.isna(row['TIPO DE PROCESO']) else ''
+        norma_val = str(row['NORMA']).strip() if not pd.isna(row['NORMA']) else ''
+        criterio_val = str(row['CRITERIO']).strip().upper() if not pd.isna(row['CRITERIO']) else ''
+
+        if norma_val not in NORMAS_VALIDAS:
+            df_result.at[idx, 'TIPO DE PROCESO'] = 'SIN NORMA'
+            if norma_val in ['', '0']:
+                df_result.at[idx, 'NORMA'] = 'SIN NORMA'
+
+        if tipo == '' or (tipo == '0' and norma_val == '0') or (tipo == '' and norma_val == ''):
+            df_result.at[idx, 'TIPO DE PROCESO'] = 'SIN NORMA'
+            df_result.at[idx, 'NORMA'] = 'SIN NORMA'
+
+        if 'CUMPLE' in criterio_val:
+            df_result.at[idx, 'TIPO DE PROCESO'] = 'CUMPLE'
+            df_result.at[idx, 'CRITERIO'] = ''
+        elif criterio_val not in ['', 'N/D']:
+            df_result.at[idx, 'CRITERIO'] = 'REVISADO'
+
+        if norma_val in ['NOM-050-SCFI-2004', 'NOM-015-SCFI-2007'] and 'CUMPLE' not in criterio_val:
+            df_result.at[idx, 'TIPO DE PROCESO'] = 'ADHERIBLE'
+
+    return df_result
+
+
+def combinaciones():
+    """Todas las combinaciones de TIPO, NORMA y CRITERIO de prueba."""
+    filas = list(itertools.product(TIPOS, NORMAS, CRITERIOS))
+    return pd.DataFrame({
+        'ITEM': np.arange(len(filas)),
+        'TIPO DE PROCESO': [f[0] for f in filas],
+        'NORMA': [f[1] for f in filas],
+        'CRITERIO': [f[2] for f in filas],
+        'DESCRIPCION': 'X',
+    })
+
+
+def aleatorio(total, semilla=0):
+    rng = np.random.default_rng(semilla)
+    base = combinaciones()
+    return base.iloc[rng.integers(0, len(base), total)].reset_index(drop=True).assign(ITEM=np.arange(total))
+
+
+def iguales(a, b):
+    if a is b or (pd.isna(a) and pd.isna(b)):
+        return True
+    return type(a) is type(b) and a == b
+
+
+def comparar(df_entrada):
+    esperado = reglas_anteriores(df_entrada)
+    obtenido = aplicar_reglas(df_entrada)
+    assert list(esperado.columns) == list(obtenido.columns)
+    for col in esperado.columns:
+        for idx, (a, b) in enumerate(zip(esperado[col], obtenido[col])):
+            assert iguales(a, b), (
+                f"Fila {idx}, columna {col}: esperado {a!r}, obtenido {b!r}\n"
+                f"{df_entrada.iloc[idx].to_dict()}"
+            )
+
+
+def main():
+    df = combinaciones()
+    comparar(df)
+    print(f"Salida dorada: {len(df)} combinaciones idénticas")
+
+    for total in (10_000, 100_000):
+        df = aleatorio(total)
+        inicio = time.perf_counter()
+        esperado = reglas_anteriores(df)
+        t_anterior = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        obtenido = aplicar_reglas(df)
+        t_nuevo = time.perf_counter() - inicio
+        assert esperado.astype(str).equals(obtenido.astype(str))
+        print(f"{total:>8} filas: anterior {t_anterior:8.3f} s, por columnas {t_nuevo:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()